@@ -0,0 +1,100 @@
+"""
+Measure latency of small programs run by the command line interpreter and by the interpreter daemon.
+
+Every program is run as a fresh interpret.py process (cold), through interpret_client.py connected to a running
+interpret_daemon.py (client), and as a request sent directly to the daemon from this process (request), which is
+the latency of the daemon without the start of the client process.
+
+Usage: python -m bench.daemon [--runs N] [--workers N]
+"""
+from argparse import ArgumentParser
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+from bench.programs import arith_loop, fib, straight_line, assemble
+from lib.protocol import PROGRAM, INPUT, EXIT_CODE, send_frame, recv_frame
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SMALL_WORKLOADS: Dict[str, Callable[[], str]] = {
+    'arith_loop': lambda: arith_loop(100),
+    'fib': lambda: fib(8),
+    'straight_line': lambda: straight_line(200),
+}
+
+
+def request(socket_path: str, program: bytes) -> int:
+    """
+    Send the program to the daemon and wait for its exit code.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        send_frame(connection, PROGRAM, program)
+        send_frame(connection, INPUT, b'')
+        while True:
+            kind, payload = recv_frame(connection)
+            if kind == EXIT_CODE:
+                return int.from_bytes(payload, 'big', signed=True)
+
+
+def measure(run: Callable[[], None], runs: int) -> List[float]:
+    times: List[float] = []
+    for _ in range(runs):
+        start: float = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def wait_for_socket(socket_path: str, timeout: float = 10.0) -> None:
+    deadline: float = time.monotonic() + timeout
+    while not os.path.exists(socket_path):
+        if time.monotonic() > deadline:
+            raise TimeoutError("Daemon did not start.")
+        time.sleep(0.05)
+
+
+def main() -> None:
+    arg_parser: ArgumentParser = ArgumentParser(description="Latency of the command line interpreter vs the daemon.")
+    arg_parser.add_argument('--runs', type=int, default=20, help="Number of runs of every program.")
+    arg_parser.add_argument('--workers', type=int, default=2, help="Number of daemon workers.")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path: str = os.path.join(directory, 'interpret.sock')
+        daemon: subprocess.Popen = subprocess.Popen([sys.executable, os.path.join(ROOT, 'interpret_daemon.py'),
+                                                     f'--socket={socket_path}', f'--workers={args.workers}'])
+        try:
+            wait_for_socket(socket_path)
+            print(f"{'workload':<15}{'mode':>8}{'median ms':>12}{'p95 ms':>10}")
+            for name, generator in SMALL_WORKLOADS.items():
+                source_path: str = os.path.join(directory, f'{name}.xml')
+                program: bytes = assemble(generator()).encode()
+                with open(source_path, 'wb') as file:
+                    file.write(program)
+                command: List[str] = [f'--source={source_path}', '--input=/dev/null']
+                modes: Dict[str, Callable[[], None]] = {
+                    'cold': lambda: subprocess.run([sys.executable, os.path.join(ROOT, 'interpret.py')] + command,
+                                                   stdout=subprocess.DEVNULL, check=True),
+                    'client': lambda: subprocess.run([sys.executable, os.path.join(ROOT, 'interpret_client.py'),
+                                                      f'--socket={socket_path}'] + command,
+                                                     stdout=subprocess.DEVNULL, check=True),
+                    'request': lambda: request(socket_path, program),
+                }
+                for mode, run in modes.items():
+                    times: List[float] = measure(run, args.runs)
+                    p95: float = statistics.quantiles(times, n=20)[-1] if len(times) > 1 else times[0]
+                    print(f"{name:<15}{mode:>8}{statistics.median(times):>12.2f}{p95:>10.2f}")
+                    sys.stdout.flush()
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+
+if __name__ == '__main__':
+    main()
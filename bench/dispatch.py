@@ -0,0 +1,94 @@
+"""
+Measure dispatch overhead per executed instruction.
+
+Every workload is run twice on the same decoded program: once with the per-step factory lookup the interpreter
+used before handlers were bound at load time, and once with the handler table. The difference of the time per
+executed instruction is the dispatch cost saved.
+
+Usage: python -m bench.dispatch [--repeat N]
+"""
+from argparse import ArgumentParser
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, List
+from bench.programs import WORKLOADS, assemble
+from lib.interpret_class import Interpret
+from lib.op_factory import OperationFactory
+from lib.frame import Frame
+from lib.errors import ProgramExit
+
+
+def reset(context: Interpret) -> None:
+    context.op_cnt = 0
+    context.global_frame = Frame(len(context.global_names))
+    context.local_frame = []
+    context.tmp_frame = None
+    context.stack = []
+    context.call_stack = []
+
+
+def factory_loop(context: Interpret) -> None:
+    """
+    Dispatch as done before the handler table, factory lookup with upper() per executed instruction.
+    """
+    factory: OperationFactory = OperationFactory()
+    while context.op_cnt < len(context.operation_list):
+        factory.create_operation(context.operation_list[context.op_cnt].opcode).execute(context)
+
+
+def count_loop(context: Interpret) -> int:
+    handlers: List[Callable] = context.handlers
+    executed: int = 0
+    try:
+        while context.op_cnt < len(handlers):
+            executed += 1
+            handlers[context.op_cnt](context)
+    except ProgramExit:
+        pass
+    return executed
+
+
+def run(context: Interpret, loops: List[Callable[[Interpret], None]], repeat: int) -> List[float]:
+    """
+    Run the loops interleaved, so both of them are equally affected by noise, and return the best time of each.
+    """
+    best: List[float] = [float('inf')] * len(loops)
+    for _ in range(repeat):
+        for loop_cnt, loop in enumerate(loops):
+            reset(context)
+            start: float = time.perf_counter()
+            try:
+                loop(context)
+            except ProgramExit:
+                pass
+            best[loop_cnt] = min(best[loop_cnt], time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    arg_parser: ArgumentParser = ArgumentParser(description="Dispatch overhead per instruction, factory vs handler table.")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Number of runs, the best one is reported.")
+    args = arg_parser.parse_args()
+
+    context: Interpret = Interpret()
+    print(f"{'workload':<15}{'instructions':>14}{'factory ns':>12}{'table ns':>12}{'saved ns':>12}")
+    for name, generator in WORKLOADS.items():
+        with tempfile.NamedTemporaryFile('w', suffix='.xml', delete=False) as file:
+            file.write(assemble(generator()))
+        try:
+            context.load_program(file.name)
+        finally:
+            os.unlink(file.name)
+        reset(context)
+        executed: int = count_loop(context)
+        factory_time, table_time = run(context, [factory_loop, Interpret.execute_operations], args.repeat)
+        factory_ns: float = factory_time / executed * 1e9
+        table_ns: float = table_time / executed * 1e9
+        print(f"{name:<15}{executed:>14}{factory_ns:>12.1f}{table_ns:>12.1f}{factory_ns - table_ns:>12.1f}")
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
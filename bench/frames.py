@@ -0,0 +1,60 @@
+"""
+Compare CALL-heavy recursion with and without reuse of released frames.
+
+Naive recursive Fibonacci (bench/programs.py) is run at every optimization level with the default frame pool and
+with a pool which keeps no frames, the runs are interleaved, so both are equally affected by noise. The best time
+and the number of frames allocated by the last run are reported for both, the pool is kept between the runs.
+
+Usage: python -m bench.frames [--n N] [--repeat N]
+"""
+from argparse import ArgumentParser
+from io import BytesIO
+import sys
+import time
+from typing import Dict, List
+from bench.programs import fib, assemble
+from bench.suite import NullOutput
+from lib.interpret_class import Interpret
+from lib.frame import FramePool
+from lib.optimizer import MAX_OPT_LEVEL
+
+
+def load(source: str, level: int, pool: FramePool) -> Interpret:
+    interpret: Interpret = Interpret()
+    interpret.opt_level = level
+    interpret.frame_pool = pool
+    interpret.load_program(BytesIO(assemble(source).encode()))
+    return interpret
+
+
+def main() -> None:
+    arg_parser: ArgumentParser = ArgumentParser(description="Recursion with and without the frame pool.")
+    arg_parser.add_argument('--n', type=int, default=20, help="Argument of the Fibonacci function.")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Number of runs, the best one is reported.")
+    args = arg_parser.parse_args()
+
+    source: str = fib(args.n)
+    print(f"{'level':<8}{'pool':<8}{'time s':>10}{'frames':>10}")
+    for level in range(MAX_OPT_LEVEL + 1):
+        interprets: Dict[str, Interpret] = {'off': load(source, level, FramePool(0)),
+                                            'on': load(source, level, FramePool())}
+        outputs: List[str] = []
+        best: Dict[str, float] = {name: float('inf') for name in interprets}
+        frames: Dict[str, int] = {}
+        for _ in range(args.repeat):
+            for name, interpret in interprets.items():
+                allocated: int = interpret.frame_pool.allocated
+                start: float = time.perf_counter()
+                result = interpret.run(interpret.program, '', None, NullOutput())
+                best[name] = min(best[name], time.perf_counter() - start)
+                frames[name] = interpret.frame_pool.allocated - allocated
+                outputs.append(f"{result.exit_code}: {result.stdout}")
+        if len(set(outputs)) != 1:
+            sys.exit(f"Error: the runs differ at level {level}: {sorted(set(outputs))}")
+        for name in interprets:
+            print(f"{level:<8}{name:<8}{best[name]:>10.3f}{frames[name]:>10}")
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
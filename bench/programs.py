@@ -0,0 +1,272 @@
+from typing import Dict, Callable
+from xml.sax.saxutils import escape
+
+LABEL_OPCODES = ('LABEL', 'JUMP', 'CALL', 'JUMPIFEQ', 'JUMPIFNEQ', 'JUMPIFEQS', 'JUMPIFNEQS')
+
+
+def assemble(source: str) -> str:
+    """
+    Translate IPPcode23 source to the XML representation, simplified version of parse.php used for benchmarks.
+    :param source: IPPcode23 source code, one instruction per line
+    :return: XML program
+    """
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<program language="IPPcode23">']
+    order: int = 0
+    for line in source.splitlines():
+        line = line.split('#')[0].strip()
+        if not line or line.startswith('.'):
+            continue
+        parts = line.split()
+        opcode: str = parts[0].upper()
+        order += 1
+        lines.append(f'  <instruction order="{order}" opcode="{opcode}">')
+        for arg_cnt, arg in enumerate(parts[1:], 1):
+            if arg_cnt == 1 and opcode in LABEL_OPCODES:
+                arg_type, value = 'label', arg
+            elif arg_cnt == 2 and opcode == 'READ':
+                arg_type, value = 'type', arg
+            elif arg.split('@')[0] in ('GF', 'LF', 'TF'):
+                arg_type, value = 'var', arg
+            else:
+                arg_type, value = arg.split('@', 1)
+            lines.append(f'    <arg{arg_cnt} type="{arg_type}">{escape(value)}</arg{arg_cnt}>')
+        lines.append('  </instruction>')
+    lines.append('</program>')
+    return '\n'.join(lines) + '\n'
+
+
+def arith_loop(iterations: int) -> str:
+    """
+    Tight counting loop with integer arithmetic.
+    """
+    return f"""
+DEFVAR GF@i
+DEFVAR GF@acc
+MOVE GF@i int@0
+MOVE GF@acc int@0
+LABEL loop
+ADD GF@acc GF@acc GF@i
+MUL GF@acc GF@acc int@3
+IDIV GF@acc GF@acc int@2
+ADD GF@i GF@i int@1
+JUMPIFNEQ loop GF@i int@{iterations}
+"""
+
+
+def fib(n: int) -> str:
+    """
+    Naive recursive Fibonacci using CALL/RETURN and local frames.
+    """
+    return f"""
+DEFVAR GF@r
+CREATEFRAME
+DEFVAR TF@n
+MOVE TF@n int@{n}
+PUSHFRAME
+CALL fib
+POPFRAME
+POPS GF@r
+EXIT int@0
+LABEL fib
+DEFVAR LF@a
+DEFVAR LF@b
+LT LF@a LF@n int@2
+JUMPIFEQ base LF@a bool@true
+SUB LF@a LF@n int@1
+CREATEFRAME
+DEFVAR TF@n
+MOVE TF@n LF@a
+PUSHFRAME
+CALL fib
+POPFRAME
+SUB LF@a LF@n int@2
+CREATEFRAME
+DEFVAR TF@n
+MOVE TF@n LF@a
+PUSHFRAME
+CALL fib
+POPFRAME
+POPS LF@a
+POPS LF@b
+ADD LF@a LF@a LF@b
+PUSHS LF@a
+RETURN
+LABEL base
+PUSHS LF@n
+RETURN
+"""
+
+
+def stack_loop(iterations: int) -> str:
+    """
+    PUSHS/POPS heavy loop.
+    """
+    return f"""
+DEFVAR GF@i
+DEFVAR GF@x
+MOVE GF@i int@0
+LABEL loop
+PUSHS GF@i
+PUSHS string@abc
+PUSHS bool@true
+PUSHS nil@nil
+POPS GF@x
+POPS GF@x
+POPS GF@x
+POPS GF@x
+ADD GF@i GF@i int@1
+JUMPIFNEQ loop GF@i int@{iterations}
+"""
+
+
+def string_loop(iterations: int) -> str:
+    """
+    CONCAT/GETCHAR/SETCHAR/STRLEN processing of a short string.
+    """
+    return f"""
+DEFVAR GF@i
+DEFVAR GF@s
+DEFVAR GF@c
+DEFVAR GF@len
+MOVE GF@i int@0
+LABEL loop
+MOVE GF@s string@hello\\032world
+CONCAT GF@s GF@s string@!
+STRLEN GF@len GF@s
+GETCHAR GF@c GF@s int@4
+SETCHAR GF@s int@0 GF@c
+ADD GF@i GF@i int@1
+JUMPIFNEQ loop GF@i int@{iterations}
+"""
+
+
+def string_build(length: int) -> str:
+    """
+    String built one character at a time by CONCAT, then every character is replaced by SETCHAR.
+    """
+    return f"""
+DEFVAR GF@i
+DEFVAR GF@s
+DEFVAR GF@len
+MOVE GF@i int@0
+MOVE GF@s string@
+LABEL build
+CONCAT GF@s GF@s string@a
+ADD GF@i GF@i int@1
+JUMPIFNEQ build GF@i int@{length}
+LABEL edit
+SUB GF@i GF@i int@1
+SETCHAR GF@s GF@i string@b
+JUMPIFNEQ edit GF@i int@0
+STRLEN GF@len GF@s
+WRITE GF@len
+"""
+
+
+def read_loop() -> str:
+    """
+    READ heavy loop summing integers from the input until its end, every line is also read as a string and a bool.
+    """
+    return """
+DEFVAR GF@x
+DEFVAR GF@s
+DEFVAR GF@b
+DEFVAR GF@sum
+MOVE GF@sum int@0
+LABEL loop
+READ GF@x int
+JUMPIFEQ end GF@x nil@nil
+ADD GF@sum GF@sum GF@x
+READ GF@s string
+READ GF@b bool
+JUMP loop
+LABEL end
+WRITE GF@sum
+"""
+
+
+def read_input(lines: int) -> str:
+    """
+    Input for read_loop.
+    """
+    return ''.join(f'{cnt}\nline {cnt}\ntrue\n' for cnt in range(lines))
+
+
+def straight_line(instructions: int) -> str:
+    """
+    Huge program without jumps, every instruction is executed once.
+    """
+    lines = ['DEFVAR GF@a', 'DEFVAR GF@s', 'MOVE GF@a int@0', 'MOVE GF@s string@']
+    for cnt in range(instructions // 4):
+        lines.append('ADD GF@a GF@a int@1')
+        lines.append(f'LABEL l{cnt}')
+        lines.append('CONCAT GF@s string@a\\032b string@c')
+        lines.append('MOVE GF@s GF@a')
+    return '\n'.join(lines)
+
+
+def expr_vars(iterations: int) -> str:
+    """
+    Loop summing (i * i - 3 * i) // 7 with temporary variables, as a compiler without the STACK extension emits it.
+    """
+    return f"""
+DEFVAR GF@i
+DEFVAR GF@acc
+DEFVAR GF@t
+DEFVAR GF@u
+MOVE GF@i int@0
+MOVE GF@acc int@0
+LABEL loop
+MUL GF@t GF@i GF@i
+MUL GF@u GF@i int@3
+SUB GF@t GF@t GF@u
+IDIV GF@t GF@t int@7
+ADD GF@acc GF@acc GF@t
+ADD GF@i GF@i int@1
+LT GF@t GF@i int@{iterations}
+JUMPIFEQ loop GF@t bool@true
+WRITE GF@acc
+"""
+
+
+def expr_stack(iterations: int) -> str:
+    """
+    The same computation as expr_vars compiled to the STACK extension, the sum and the temporaries stay on the stack.
+    """
+    return f"""
+DEFVAR GF@i
+DEFVAR GF@acc
+MOVE GF@i int@0
+PUSHS int@0
+LABEL loop
+PUSHS GF@i
+PUSHS GF@i
+MULS
+PUSHS GF@i
+PUSHS int@3
+MULS
+SUBS
+PUSHS int@7
+IDIVS
+ADDS
+ADD GF@i GF@i int@1
+PUSHS GF@i
+PUSHS int@{iterations}
+LTS
+PUSHS bool@true
+JUMPIFEQS loop
+POPS GF@acc
+WRITE GF@acc
+"""
+
+
+WORKLOADS: Dict[str, Callable[[], str]] = {
+    'arith_loop': lambda: arith_loop(50000),
+    'fib': lambda: fib(16),
+    'stack_loop': lambda: stack_loop(20000),
+    'string_loop': lambda: string_loop(20000),
+    'string_build': lambda: string_build(50000),
+    'straight_line': lambda: straight_line(100000),
+    'expr_vars': lambda: expr_vars(20000),
+    'expr_stack': lambda: expr_stack(20000),
+}
@@ -0,0 +1,53 @@
+"""
+Compare the same program compiled with temporary variables and with the STACK extension.
+
+Both versions of the expression loop (bench/programs.py) are run at every optimization level, the runs are
+interleaved, so both versions are equally affected by noise, and the best time of each is reported together with
+the ratio of the stack version to the variable version.
+
+Usage: python -m bench.stack [--iterations N] [--repeat N]
+"""
+from argparse import ArgumentParser
+from io import BytesIO
+import sys
+import time
+from typing import Dict, List
+from bench.programs import expr_vars, expr_stack, assemble
+from bench.suite import NullOutput
+from lib.interpret_class import Interpret
+from lib.optimizer import MAX_OPT_LEVEL
+
+
+def load(source: str, level: int) -> Interpret:
+    interpret: Interpret = Interpret()
+    interpret.opt_level = level
+    interpret.load_program(BytesIO(assemble(source).encode()))
+    return interpret
+
+
+def main() -> None:
+    arg_parser: ArgumentParser = ArgumentParser(description="Stack-compiled vs variable-compiled program.")
+    arg_parser.add_argument('--iterations', type=int, default=20000, help="Iterations of the expression loop.")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Number of runs, the best one is reported.")
+    args = arg_parser.parse_args()
+
+    sources: Dict[str, str] = {'vars': expr_vars(args.iterations), 'stack': expr_stack(args.iterations)}
+    print(f"{'level':<8}{'vars s':>10}{'stack s':>10}{'stack/vars':>12}")
+    for level in range(MAX_OPT_LEVEL + 1):
+        interprets: List[Interpret] = [load(source, level) for source in sources.values()]
+        outputs: List[str] = []
+        best: List[float] = [float('inf')] * len(interprets)
+        for _ in range(args.repeat):
+            for cnt, interpret in enumerate(interprets):
+                start: float = time.perf_counter()
+                result = interpret.run(interpret.program, '', None, NullOutput())
+                best[cnt] = min(best[cnt], time.perf_counter() - start)
+                outputs.append(f"{result.exit_code}: {result.stdout}")
+        if len(set(outputs)) != 1:
+            sys.exit(f"Error: the versions differ at level {level}: {sorted(set(outputs))}")
+        print(f"{level:<8}{best[0]:>10.3f}{best[1]:>10.3f}{best[1] / best[0]:>12.2f}")
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
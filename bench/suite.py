@@ -0,0 +1,171 @@
+"""
+Benchmark suite of representative IPPcode23 workloads.
+
+Every benchmark runs in its own process, so its peak RSS is not affected by the other ones. The process loads the
+program (parse time), runs it once counting the executed instructions and then runs it --repeat times, the best
+run gives instructions per second. Results are stored as JSON and can be compared against a saved baseline, the
+suite fails when instructions per second drop or parse time grows by more than the threshold.
+
+Usage: python -m bench.suite [--only NAME ...] [--repeat N] [--output FILE] [--baseline FILE] [--threshold RATIO]
+"""
+from argparse import ArgumentParser, SUPPRESS
+from io import BytesIO, StringIO
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from bench.programs import WORKLOADS, assemble, read_loop, read_input
+from bench.dispatch import count_loop
+from lib.interpret_class import Interpret
+from lib.input_source import StreamLineSource
+from lib.output import OutputBuffer
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+XML_DIR: str = os.path.join(ROOT, 'bench', 'xml')
+# shorter parse times are dominated by noise and are not compared with the baseline
+MIN_PARSE_SECONDS: float = 0.01
+
+
+def hand_written(name: str) -> Callable[[], bytes]:
+    def load() -> bytes:
+        with open(os.path.join(XML_DIR, name), 'rb') as file:
+            return file.read()
+    return load
+
+
+def generated(generator: Callable[[], str]) -> Callable[[], bytes]:
+    return lambda: assemble(generator()).encode()
+
+
+# name: (XML program, input)
+BENCHMARKS: Dict[str, Tuple[Callable[[], bytes], Callable[[], str]]] = {
+    **{name: (generated(generator), lambda: '') for name, generator in WORKLOADS.items()},
+    'read_loop': (generated(read_loop), lambda: read_input(20000)),
+    'bubble_sort': (hand_written('bubble_sort.xml'), lambda: ''),
+}
+
+
+class NullOutput:
+    """
+    Output of the benchmarked programs, it is thrown away.
+    """
+    def write(self, string: str) -> int:
+        return len(string)
+
+    def flush(self) -> None:
+        pass
+
+
+def run_benchmark(name: str, repeat: int) -> Dict[str, float]:
+    """
+    Run one benchmark in this process.
+    :param name: name of the benchmark
+    :param repeat: number of timed runs
+    :return: measured values
+    """
+    program_factory, input_factory = BENCHMARKS[name]
+    program: bytes = program_factory()
+    input_data: str = input_factory()
+    interpret: Interpret = Interpret()
+
+    start: float = time.perf_counter()
+    interpret.load_program(BytesIO(program))
+    parse_time: float = time.perf_counter() - start
+
+    interpret.output = OutputBuffer(NullOutput())
+    interpret.input_source = StreamLineSource(StringIO(input_data))
+    interpret.reset()
+    executed: int = count_loop(interpret)
+
+    best: float = float('inf')
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        interpret.run(interpret.program, input_data, NullOutput(), NullOutput())
+        best: float = min(best, time.perf_counter() - start)
+    return {
+        'instructions': executed,
+        'seconds': best,
+        'ips': executed / best,
+        'parse_seconds': parse_time,
+        'program_bytes': len(program),
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def run_in_process(name: str, repeat: int) -> Dict[str, float]:
+    """
+    Run one benchmark in a new process.
+    """
+    completed: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, '-m', 'bench.suite', '--child', name, '--repeat', str(repeat)],
+        stdout=subprocess.PIPE, check=True, cwd=ROOT)
+    return json.loads(completed.stdout)
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """
+    Print the comparison with the baseline.
+    :return: list of regressions
+    """
+    regressions: List[str] = []
+    print(f"\n{'benchmark':<15}{'ips change':>12}{'parse change':>14}")
+    for name, result in results.items():
+        base: Optional[Dict[str, float]] = baseline.get(name)
+        if base is None:
+            continue
+        ips_change: float = result['ips'] / base['ips'] - 1
+        parse_change: float = result['parse_seconds'] / base['parse_seconds'] - 1
+        print(f"{name:<15}{ips_change:>+12.1%}{parse_change:>+14.1%}")
+        if ips_change < -threshold:
+            regressions.append(f"{name}: instructions per second dropped by {-ips_change:.1%}")
+        if parse_change > threshold and base['parse_seconds'] >= MIN_PARSE_SECONDS:
+            regressions.append(f"{name}: parse time grew by {parse_change:.1%}")
+    return regressions
+
+
+def main() -> None:
+    arg_parser: ArgumentParser = ArgumentParser(description="Benchmark suite of IPPcode23 workloads.")
+    arg_parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help="Run only the given benchmarks.")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="Number of timed runs, the best one is reported.")
+    arg_parser.add_argument('--output', type=str, help="Store the results to the JSON file.")
+    arg_parser.add_argument('--baseline', type=str, help="Compare the results with the JSON file.")
+    arg_parser.add_argument('--threshold', type=float, default=0.1,
+                            help="Allowed relative regression against the baseline.")
+    arg_parser.add_argument('--child', type=str, help=SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.child is not None:
+        json.dump(run_benchmark(args.child, args.repeat), sys.stdout)
+        return
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'benchmark':<15}{'instructions':>14}{'Minstr/s':>10}{'run s':>9}{'parse s':>9}{'peak RSS MB':>13}")
+    for name in args.only or BENCHMARKS:
+        result: Dict[str, float] = run_in_process(name, args.repeat)
+        results[name] = result
+        print(f"{name:<15}{result['instructions']:>14}{result['ips'] / 1e6:>10.2f}{result['seconds']:>9.3f}"
+              f"{result['parse_seconds']:>9.3f}{result['peak_rss_kb'] / 1024:>13.1f}")
+        sys.stdout.flush()
+
+    if args.output is not None:
+        with open(args.output, 'w') as file:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(), 'results': results},
+                      file, indent=2)
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as file:
+            baseline: Dict[str, Dict[str, float]] = json.load(file)['results']
+        regressions: List[str] = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
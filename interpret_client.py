@@ -0,0 +1,99 @@
+"""
+Thin client of interpret_daemon.py, it takes the same arguments as interpret.py and behaves the same way.
+The socket of the daemon is given by --socket=<path> or by the IPP_INTERPRET_SOCKET environment variable.
+Arguments which the client doesn't handle itself, unreadable files and unavailable daemon make it run interpret.py,
+so the result is always the same as of the command line interpreter.
+"""
+import os
+import sys
+# the socket module imports enum and selectors, the builtin module is enough for the client
+import _socket
+from lib.protocol import PROGRAM, INPUT, STDOUT, STDERR, EXIT_CODE, send_frame, recv_frame
+
+SOCKET_ENV: str = 'IPP_INTERPRET_SOCKET'
+
+
+def run_interpret(args: list) -> None:
+    """
+    Replace the client by the command line interpreter.
+    :param args: Arguments of the client without --socket
+    """
+    script: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'interpret.py')
+    sys.stdout.flush()
+    os.execv(sys.executable, [sys.executable, script] + args)
+
+
+def parse_args(argv: list) -> tuple:
+    """
+    Split arguments to the paths and arguments for interpret.py.
+    :param argv: Command line arguments
+    :return: Tuple of dictionary of paths, arguments for interpret.py and False if any argument is not supported
+    """
+    paths: dict = {'--socket': os.environ.get(SOCKET_ENV), '--source': None, '--input': None}
+    args: list = []
+    supported: bool = True
+    arg_cnt: int = 0
+    while arg_cnt < len(argv):
+        name, separator, value = argv[arg_cnt].partition('=')
+        if name not in paths:
+            args.append(argv[arg_cnt])
+            supported: bool = False
+        elif separator or arg_cnt + 1 < len(argv):
+            if not separator:
+                arg_cnt += 1
+                value: str = argv[arg_cnt]
+            paths[name] = value
+            if name != '--socket':
+                args.append(f'{name}={value}')
+        else:
+            args.append(argv[arg_cnt])
+            supported: bool = False
+        arg_cnt += 1
+    return paths, args, supported
+
+
+def main() -> None:
+    paths, args, supported = parse_args(sys.argv[1:])
+    socket_path, source_path, input_path = paths['--socket'], paths['--source'], paths['--input']
+    if not supported or socket_path is None or (source_path is None and input_path is None):
+        run_interpret(args)
+
+    connection = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+    except OSError:
+        run_interpret(args)
+    try:
+        # both files are opened before the standard input is read, so it is still available to interpret.py
+        source_file = open(source_path, 'rb') if source_path is not None else sys.stdin.buffer
+        input_file = open(input_path, 'rb') if input_path is not None else sys.stdin.buffer
+    except OSError:
+        # the interpreter reports the error with the right message and return code
+        run_interpret(args)
+    with source_file:
+        program: bytes = source_file.read()
+    with input_file:
+        input_data: bytes = input_file.read()
+
+    send_frame(connection, PROGRAM, program)
+    send_frame(connection, INPUT, input_data)
+    while True:
+        frame: tuple = recv_frame(connection)
+        if frame is None:
+            sys.stdout.flush()
+            print("Error: Connection to the interpreter daemon was lost.", file=sys.stderr)
+            sys.exit(99)
+        kind, payload = frame
+        if kind == STDOUT:
+            sys.stdout.buffer.write(payload)
+        elif kind == STDERR:
+            sys.stdout.flush()
+            sys.stderr.buffer.write(payload)
+            sys.stderr.flush()
+        elif kind == EXIT_CODE:
+            sys.stdout.flush()
+            sys.exit(int.from_bytes(payload, 'big', signed=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+from argparse import ArgumentParser
+from lib.server import Server, DEFAULT_WORKERS
+
+if __name__ == "__main__":
+    arg_parser: ArgumentParser = ArgumentParser(description="Daemon running programs sent by interpret_client.py.")
+    arg_parser.add_argument('--socket', type=str, metavar='<path>', required=True,
+                            help="Path of the Unix domain socket.")
+    arg_parser.add_argument('--workers', type=int, metavar='<count>', default=DEFAULT_WORKERS,
+                            help="Number of worker processes.")
+    args = arg_parser.parse_args()
+    Server(args.socket, max(args.workers, 1)).serve()
@@ -0,0 +1,171 @@
+import gc
+import glob
+import json
+import multiprocessing
+import os
+import traceback
+from typing import Dict, List, Optional, TextIO, Union
+from lib.errors import InputFileError
+from lib.input_source import LineSource, open_line_source
+from lib.utils import exit_with_code
+
+DEFAULT_JOBS: int = os.cpu_count() or 1
+
+# runner of the current batch, the forked workers inherit it together with the loaded program
+_runner: Optional['BatchRunner'] = None
+
+
+def expand_inputs(pattern: Optional[str], list_path: Optional[str]) -> List[str]:
+    """
+    Get the input files of the batch.
+    :param pattern: glob pattern of the input files, ** matches any number of directories
+    :param list_path: path to the file with one input file per line
+    :return: paths of the input files
+    """
+    if pattern is not None:
+        return sorted(glob.glob(pattern, recursive=True))
+    try:
+        with open(list_path, 'r') as file:
+            return [line.strip() for line in file if line.strip()]
+    except FileNotFoundError:
+        exit_with_code(11, "Error: Input list does not exist.")
+    except PermissionError:
+        exit_with_code(11, "Error: Input list is not readable.")
+
+
+def _run_input(input_path: str) -> Dict[str, Union[str, int, None]]:
+    return _runner.run_input(input_path)
+
+
+class BatchRunner:
+    """
+    Run the loaded program once for every input file.
+    The program is loaded by the parent process only, the pool is forked afterwards, so the workers share the decoded
+    program copy-on-write and every input is run by the interpreter of one of the workers. Only pages which a worker
+    doesn't use stay shared, executing an instruction changes reference counts of it and its operands, so the pages
+    holding the executed part of the program are copied to the worker.
+    Result of every input is one JSON line on the stream, with the results directory the output, error output
+    and return code are written to <name>.out, <name>.err and <name>.rc files in it instead.
+    """
+    def __init__(self, context, jobs: int = DEFAULT_JOBS, results_dir: Optional[str] = None):
+        self.context = context
+        self.jobs: int = jobs
+        self.results_dir: Optional[str] = results_dir
+
+    def run(self, input_paths: List[str], stream: TextIO) -> None:
+        """
+        Run all the inputs and write the results in the order of the inputs.
+        :param input_paths: paths of the input files
+        :param stream: stream for the JSON lines
+        """
+        if self.results_dir is not None:
+            names: List[str] = [self.__result_name(input_path) for input_path in input_paths]
+            if len(set(names)) != len(names):
+                exit_with_code(10, "Error: Input files with the same name can't share the results directory.")
+            try:
+                os.makedirs(self.results_dir, exist_ok=True)
+            except OSError:
+                exit_with_code(12, "Error: Results directory can't be created.")
+
+        global _runner
+        _runner = self
+        if self.jobs == 1 or len(input_paths) < 2:
+            for result in map(_run_input, input_paths):
+                stream.write(json.dumps(result) + '\n')
+            return
+
+        # objects tracked by the garbage collector are moved to the permanent generation, so collections in
+        # the workers don't write to the pages of the shared program, reference counts still change whenever
+        # a worker uses an instruction or operand, so the pages of the executed instructions are copied anyway
+        gc.collect()
+        gc.freeze()
+        try:
+            chunk_size: int = max(1, min(64, len(input_paths) // (self.jobs * 4)))
+            with multiprocessing.get_context('fork').Pool(self.jobs) as pool:
+                for result in pool.imap(_run_input, input_paths, chunk_size):
+                    stream.write(json.dumps(result) + '\n')
+        finally:
+            gc.unfreeze()
+
+    def run_input(self, input_path: str) -> Dict[str, Union[str, int, None]]:
+        """
+        Run the program with one input file, an internal error of the interpreter is the result of the input
+        with return code 99, so it doesn't stop the other inputs.
+        :param input_path: path of the input file
+        :return: result, output is included only if there is no results directory
+        """
+        try:
+            return self.__run_input(input_path)
+        except Exception as error:
+            return self.__internal_error(input_path, f"Error: Internal error ({error!r}).\n{traceback.format_exc()}")
+
+    def __run_input(self, input_path: str) -> Dict[str, Union[str, int, None]]:
+        result: Dict[str, Union[str, int, None]] = {'input': input_path}
+        output: Optional[TextIO] = None
+        error_output: Optional[TextIO] = None
+        if self.results_dir is not None:
+            path: str = os.path.join(self.results_dir, self.__result_name(input_path))
+            output: TextIO = open(path + '.out', 'w')
+            error_output: TextIO = open(path + '.err', 'w')
+        try:
+            try:
+                input_source: LineSource = open_line_source(input_path, self.context.input_mmap)
+            except FileNotFoundError:
+                exit_code, stdout, stderr = self.__input_error(InputFileError("Error: Input file does not exist."),
+                                                               error_output)
+            except PermissionError:
+                exit_code, stdout, stderr = self.__input_error(InputFileError("Error: Input file is not readable."),
+                                                               error_output)
+            else:
+                try:
+                    run_result = self.context.run(self.context.program, input_source, output, error_output)
+                finally:
+                    input_source.close()
+                exit_code, stdout, stderr = run_result.exit_code, run_result.stdout, run_result.stderr
+        finally:
+            if output is not None:
+                output.close()
+                error_output.close()
+        result['exit_code'] = exit_code
+        if self.results_dir is None:
+            result['stdout'] = stdout
+            result['stderr'] = stderr
+        else:
+            with open(os.path.join(self.results_dir, self.__result_name(input_path)) + '.rc', 'w') as file:
+                file.write(f'{exit_code}\n')
+        return result
+
+    def __internal_error(self, input_path: str, message: str) -> Dict[str, Union[str, int, None]]:
+        """
+        Create the result of an input whose run failed by an internal error, the message replaces the error output.
+        :param input_path: path of the input file
+        :param message: error message with the traceback
+        :return: result with return code 99
+        """
+        result: Dict[str, Union[str, int, None]] = {'input': input_path, 'exit_code': 99}
+        if self.results_dir is None:
+            result['stdout'] = ''
+            result['stderr'] = message
+            return result
+        path: str = os.path.join(self.results_dir, self.__result_name(input_path))
+        try:
+            with open(path + '.err', 'w') as file:
+                file.write(message)
+            with open(path + '.rc', 'w') as file:
+                file.write('99\n')
+        except OSError:
+            # the result is still reported on the stream
+            result['stderr'] = message
+        return result
+
+    @staticmethod
+    def __input_error(error: InputFileError, error_output: Optional[TextIO]) -> tuple:
+        message: str = error.message + '\n'
+        if error_output is not None:
+            error_output.write(message)
+            return error.code, None, None
+        return error.code, '', message
+
+    @staticmethod
+    def __result_name(input_path: str) -> str:
+        return os.path.splitext(os.path.basename(input_path))[0]
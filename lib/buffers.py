@@ -0,0 +1,81 @@
+from typing import Dict, List, Set, Tuple, Union
+from lib.program import Var, Const, Instruction
+from lib.typeinfer import untyped, operands
+
+# suffix of the opcode of an operation variant which accepts a string buffer
+BUFFER_SUFFIX: str = ':buffer'
+# operations which only read the string in arg2, the buffer is used as it is
+BUFFER_READS: Tuple[str, ...] = ('STRLEN', 'GETCHAR')
+
+
+def buffer_slot(var: Var) -> Tuple[bool, int]:
+    """
+    Get slot of the variable, LF and TF variables with the same name share the slot, pushed TF becomes LF.
+    :param var: variable operand
+    :return: whether the variable is global and its slot
+    """
+    return var.frame == 'GF', var.slot
+
+
+def builds(instruction: Instruction) -> bool:
+    """
+    Decide whether the instruction changes the string in its variable, CONCAT appending to the variable itself
+    or SETCHAR. Instructions which read the variable in the other operands as well are left as they are.
+    """
+    opcode: str = untyped(instruction.opcode)
+    var: Union[Var, Const, None] = instruction.arg1
+    if not isinstance(var, Var) or instruction.arg3 is var:
+        return False
+    if opcode == 'CONCAT':
+        return instruction.arg2 is var
+    return opcode == 'SETCHAR' and instruction.arg2 is not var
+
+
+class StringBuffers:
+    """
+    Strings built in a variable by CONCAT appending to the variable or edited by SETCHAR are kept in a mutable buffer
+    (StringBuffer in lib/values.py), so appending or replacing a character doesn't copy the whole string and building
+    a string by characters takes linear time. These instructions become buffered variants, STRLEN and GETCHAR read
+    the buffer as it is, every other instruction reading a variable whose slot can hold a buffer is preceded by
+    MATERIALIZE, which replaces the buffer by its string, so no other operation ever sees a buffer.
+    MATERIALIZE follows the LABEL of its instruction, so jumps and returns to the instruction execute it as well.
+    """
+    name: str = 'buffers'
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+
+    def run(self, instructions: List[Instruction]) -> List[Instruction]:
+        """
+        Choose the buffered variants and add MATERIALIZE instructions.
+        :param instructions: copies of the instructions, they are changed in place
+        :return: optimized instructions
+        """
+        buffered: Set[Tuple[bool, int]] = {buffer_slot(instruction.arg1) for instruction in instructions
+                                           if builds(instruction)}
+        if not buffered:
+            return instructions
+        optimized: List[Instruction] = []
+        for instruction in instructions:
+            opcode: str = untyped(instruction.opcode)
+            reads: List[Union[Var, Const]] = operands(instruction.copy(opcode))
+            target: Union[Var, Const, None] = None
+            if builds(instruction):
+                target: Var = instruction.arg1
+            elif opcode in BUFFER_READS and isinstance(instruction.arg2, Var) and \
+                    buffer_slot(instruction.arg2) in buffered:
+                target: Var = instruction.arg2
+            if target is not None:
+                instruction.opcode = opcode + BUFFER_SUFFIX
+                self.__count(instruction.opcode)
+            for var in dict.fromkeys(reads):
+                if isinstance(var, Var) and var is not target and buffer_slot(var) in buffered:
+                    materialize: Instruction = Instruction('MATERIALIZE', instruction.order)
+                    materialize.arg1 = var
+                    optimized.append(materialize)
+                    self.__count('MATERIALIZE')
+            optimized.append(instruction)
+        return optimized
+
+    def __count(self, name: str) -> None:
+        self.counts[name] = self.counts.get(name, 0) + 1
@@ -0,0 +1,188 @@
+import hashlib
+import marshal
+import os
+import tempfile
+from typing import BinaryIO, Dict, List, Tuple, Union, Optional
+from lib.program import Var, Const, LabelRef, Instruction, Program, PROGRAM_VERSION
+from lib.values import NIL
+
+MAGIC: bytes = b'IPPC'
+# the marshal data are preceded by their SHA-256 digest, so a corrupted entry is never decoded
+DIGEST_SIZE: int = hashlib.sha256().digest_size
+DEFAULT_CACHE_SIZE: int = 64 * 1024 * 1024
+HASH_CHUNK_SIZE: int = 1024 * 1024
+
+Operand = Union[Var, Const, LabelRef]
+
+
+def encode_program(program: Program) -> bytes:
+    """
+    Serialize the decoded program to marshal data.
+    Operands are stored once in a table and instructions refer to them by index, so sharing of operands is kept.
+    :param program: Decoded program
+    :return: Serialized program
+    """
+    operand_index: Dict[int, int] = {}
+    operands: List[Tuple] = []
+
+    def ref(operand: Optional[Operand]) -> int:
+        if operand is None:
+            return -1
+        index: Optional[int] = operand_index.get(id(operand))
+        if index is None:
+            index: int = len(operands)
+            operand_index[id(operand)] = index
+            if isinstance(operand, Var):
+                operands.append(('var', operand.frame, operand.name, operand.slot))
+            elif isinstance(operand, LabelRef):
+                operands.append(('label', operand.name, operand.target))
+            else:
+                operands.append((operand.type, None if operand.value is NIL else operand.value, operand.index))
+        return index
+
+    instructions: List[Tuple] = [(instruction.opcode, instruction.order, instruction.frame_size,
+                                  ref(instruction.arg1), ref(instruction.arg2), ref(instruction.arg3))
+                                 for instruction in program.instructions]
+    constants: List[int] = [ref(const) for const in program.constants]
+    data: bytes = marshal.dumps((PROGRAM_VERSION, operands, instructions, constants, program.label_dict,
+                                 program.global_names, program.local_names))
+    return MAGIC + hashlib.sha256(data).digest() + data
+
+
+def decode_program(data: bytes) -> Program:
+    """
+    Rebuild the decoded program from data created by encode_program.
+    :param data: Serialized program
+    :return: Decoded program
+    :raise ValueError: if the data are not a program of this version or they are corrupted
+    """
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a cached program")
+    digest: bytes = data[len(MAGIC):len(MAGIC) + DIGEST_SIZE]
+    data: bytes = data[len(MAGIC) + DIGEST_SIZE:]
+    if hashlib.sha256(data).digest() != digest:
+        raise ValueError("corrupted cached program")
+    version, operand_data, instruction_data, constant_refs, label_dict, global_names, local_names = \
+        marshal.loads(data)
+    if version != PROGRAM_VERSION:
+        raise ValueError("cached program of different version")
+
+    operands: List[Operand] = []
+    for operand in operand_data:
+        if operand[0] == 'var':
+            operands.append(Var(operand[1], operand[2], operand[3]))
+        elif operand[0] == 'label':
+            label: LabelRef = LabelRef(operand[1])
+            label.target = operand[2]
+            operands.append(label)
+        else:
+            operands.append(Const(operand[0], NIL if operand[0] == 'nil' else operand[1], operand[2]))
+
+    instructions: List[Instruction] = []
+    for opcode, order, frame_size, arg1, arg2, arg3 in instruction_data:
+        instruction: Instruction = Instruction(opcode, order)
+        instruction.frame_size = frame_size
+        instruction.arg1 = operands[arg1] if arg1 >= 0 else None
+        instruction.arg2 = operands[arg2] if arg2 >= 0 else None
+        instruction.arg3 = operands[arg3] if arg3 >= 0 else None
+        instructions.append(instruction)
+    return Program(instructions, label_dict, [operands[ref] for ref in constant_refs], global_names, local_names)
+
+
+class ProgramCache:
+    """
+    On-disk cache of decoded programs keyed by the hash of the XML source and the program format version.
+    Entries are written to a temporary file and renamed, so parallel runs never see a partially written entry.
+    When the cache grows over its size limit, the least recently used entries are removed.
+    """
+    def __init__(self, directory: str, max_size: int = DEFAULT_CACHE_SIZE):
+        self.directory: str = directory
+        self.max_size: int = max_size
+
+    @staticmethod
+    def key(source: BinaryIO) -> str:
+        """
+        Compute cache key of the XML source.
+        :param source: Binary stream of the XML source
+        :return: Hexadecimal key
+        """
+        digest = hashlib.sha256(f'ippcode23-v{PROGRAM_VERSION}\n'.encode())
+        for chunk in iter(lambda: source.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.ippc')
+
+    def load(self, key: str) -> Optional[Program]:
+        """
+        Load program from the cache.
+        :param key: Cache key
+        :return: Program or None if it is not cached or the entry can't be used
+        """
+        path: str = self.__path(key)
+        try:
+            with open(path, 'rb') as file:
+                data: bytes = file.read()
+        except OSError:
+            return None
+        try:
+            program: Program = decode_program(data)
+        except Exception:
+            # an entry which can't be decoded is a miss, it is removed and the program is stored again
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            return None
+        try:
+            # the modification time marks the last use for the eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return program
+
+    def store(self, key: str, program: Program) -> None:
+        """
+        Store program to the cache, errors are ignored, the cache is only an optimization.
+        :param key: Cache key
+        :param program: Decoded program
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-', suffix='.ippc')
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    file.write(encode_program(program))
+                os.replace(tmp_path, self.__path(key))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self.evict()
+        except OSError:
+            pass
+
+    def evict(self) -> None:
+        """
+        Remove least recently used entries until the cache fits into its size limit.
+        """
+        entries: List[Tuple[float, int, str]] = []
+        with os.scandir(self.directory) as directory:
+            for entry in directory:
+                if not entry.name.endswith('.ippc') or entry.name.startswith('.tmp-'):
+                    continue
+                try:
+                    stat: os.stat_result = entry.stat()
+                except FileNotFoundError:
+                    # removed by another process in the meantime
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total_size: int = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
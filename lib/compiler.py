@@ -0,0 +1,478 @@
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+from lib.program import Var, Const, LabelRef, Instruction
+from lib.frame import UNDEFINED
+from lib.values import NIL, Nil, StringBuffer, buffer_concat
+from lib.utils import exit_with_code, get_var_value, store_val_to_var, materialize_var
+from lib.typeinfer import untyped
+
+# number of entries of a basic block after which its region is compiled
+HOT_THRESHOLD: int = 50
+# maximal number of basic blocks compiled into one function
+MAX_REGION_BLOCKS: int = 16
+
+# operations after which the basic block ends, the next instruction is chosen by the operation
+TERMINATORS: Tuple[str, ...] = ('JUMP', 'JUMPIFEQ', 'JUMPIFNEQ', 'LT+JUMPIF', 'GT+JUMPIF', 'EQ+JUMPIF', 'CALL',
+                                'RETURN', 'EXIT', 'CREATEFRAME+PUSHFRAME+CALL', 'PUSHFRAME+CALL', 'JUMPIFEQS',
+                                'JUMPIFNEQS')
+# terminators compiled inline, their successors can be part of the region
+JUMPS: Tuple[str, ...] = ('JUMP', 'JUMPIFEQ', 'JUMPIFNEQ', 'LT+JUMPIF', 'GT+JUMPIF', 'EQ+JUMPIF', 'JUMPIFEQS',
+                          'JUMPIFNEQS')
+# operations of the STACK extension compiled inline by the operation with the same result
+STACK_OPERATIONS: Dict[str, str] = {
+    'ADDS': 'ADD', 'SUBS': 'SUB', 'MULS': 'MUL', 'IDIVS': 'IDIV', 'LTS': 'LT', 'GTS': 'GT', 'EQS': 'EQ',
+    'ANDS': 'AND', 'ORS': 'OR', 'NOTS': 'NOT',
+}
+NO_DATA: str = '"Error: No data to pop."'
+
+UNINITIALIZED: str = '"Error: Variable uninitialized."'
+WRONG_TYPES: str = '"Error: Wrong types."'
+# type checks of the operands by the opcode, a and b are the values of the operands
+TYPE_CHECKS: Dict[str, str] = {
+    'ADD': 'type(a) is not int or type(b) is not int',
+    'SUB': 'type(a) is not int or type(b) is not int',
+    'MUL': 'type(a) is not int or type(b) is not int',
+    'IDIV': 'type(a) is not int or type(b) is not int',
+    'LT': 'type(a) is not type(b) or a is NIL',
+    'GT': 'type(a) is not type(b) or a is NIL',
+    'EQ': 'type(a) is not type(b) and a is not NIL and b is not NIL',
+    'AND': 'type(a) is not bool or type(b) is not bool',
+    'OR': 'type(a) is not bool or type(b) is not bool',
+    'NOT': 'type(a) is not bool',
+    'CONCAT': 'type(a) is not str or type(b) is not str',
+    'STRLEN': 'type(a) is not str',
+    'CONCAT:buffer': 'type(a) is not str and type(a) is not StringBuffer or type(b) is not str',
+    'STRLEN:buffer': 'type(a) is not str and type(a) is not StringBuffer',
+}
+# operand types for which the type check passes for sure
+OPERAND_TYPES: Dict[str, Tuple[type, ...]] = {
+    'ADD': (int, int), 'SUB': (int, int), 'MUL': (int, int), 'IDIV': (int, int), 'AND': (bool, bool),
+    'OR': (bool, bool), 'NOT': (bool,), 'CONCAT': (str, str), 'STRLEN': (str,), 'CONCAT:buffer': (str, str),
+    'STRLEN:buffer': (str,),
+}
+# types of the results, None if the result can be a string buffer
+RESULT_TYPES: Dict[str, Optional[type]] = {
+    'ADD': int, 'SUB': int, 'MUL': int, 'IDIV': int, 'LT': bool, 'GT': bool, 'EQ': bool, 'AND': bool, 'OR': bool,
+    'NOT': bool, 'CONCAT': str, 'STRLEN': int, 'CONCAT:buffer': None, 'STRLEN:buffer': int,
+}
+RESULTS: Dict[str, str] = {
+    'ADD': 'a + b',
+    'SUB': 'a - b',
+    'MUL': 'a * b',
+    'IDIV': 'a // b',
+    'LT': 'a < b',
+    'GT': 'a > b',
+    'EQ': 'a == b',
+    'AND': 'a and b',
+    'OR': 'a or b',
+    'NOT': 'not a',
+    'CONCAT': 'a + b',
+    'STRLEN': 'len(a)',
+    'CONCAT:buffer': 'buffer_concat(a, b)',
+    'STRLEN:buffer': 'len(a)',
+}
+
+
+class BlockCounter:
+    """
+    Handler of the first instruction of a basic block until the block is hot, it counts entries of the block.
+    """
+    __slots__ = ('compiler', 'leader', 'count', 'handler')
+
+    def __init__(self, compiler: 'BlockCompiler', leader: int, handler: Callable):
+        self.compiler: BlockCompiler = compiler
+        self.leader: int = leader
+        self.count: int = 0
+        self.handler: Callable = handler
+
+    def execute(self, context) -> None:
+        self.count += 1
+        if self.count < HOT_THRESHOLD:
+            self.handler(context)
+            return
+        context.handlers[self.leader] = self.compiler.compile(self.leader)
+        context.handlers[self.leader](context)
+
+
+class BlockCompiler:
+    """
+    Second tier of the execution, hot regions of the program are translated to Python functions.
+    The first instruction of every basic block gets a BlockCounter, when the block is entered HOT_THRESHOLD times,
+    the block and the blocks reachable from it by jumps (the region) are compiled by compile() into one function,
+    which replaces the handler of the block. The function keeps the position in a local variable and runs
+    the blocks of the region until the execution leaves the region, so a loop runs without the interpreter loop.
+    Common operations are generated inline with the same checks in the same order as their execute(), other
+    operations call their handler with op_cnt set to their position, so errors, output written before them and
+    BREAK are the same as in the interpreter.
+    """
+    def __init__(self, operation_list: List[Instruction], handlers: List[Callable]):
+        self.operation_list: List[Instruction] = operation_list
+        self.handlers: List[Callable] = list(handlers)
+        self.blocks: Dict[int, int] = self.__find_blocks()
+        self.compiled: int = 0
+
+    def install(self, handlers: List[Callable]) -> None:
+        """
+        Replace handlers of the first instructions of the blocks by counters.
+        :param handlers: handler list of the interpreter, changed in place
+        """
+        for leader in self.blocks:
+            handlers[leader] = BlockCounter(self, leader, self.handlers[leader]).execute
+
+    def __find_blocks(self) -> Dict[int, int]:
+        """
+        Split the program into basic blocks, they start at the first instruction, at targets of labels and after
+        terminators.
+        :return: end position of every block by its first position
+        """
+        leaders: Set[int] = {0} if self.operation_list else set()
+        for op_cnt, instruction in enumerate(self.operation_list):
+            for arg in (instruction.arg1, instruction.arg2, instruction.arg3):
+                if isinstance(arg, LabelRef) and arg.target is not None and arg.target < len(self.operation_list):
+                    leaders.add(arg.target)
+            if untyped(instruction.opcode) in TERMINATORS and op_cnt + 1 < len(self.operation_list):
+                leaders.add(op_cnt + 1)
+        ordered: List[int] = sorted(leaders)
+        return {leader: end for leader, end in zip(ordered, ordered[1:] + [len(self.operation_list)])}
+
+    def __successors(self, leader: int) -> List[int]:
+        end: int = self.blocks[leader]
+        opcode: str = untyped(self.operation_list[end - 1].opcode)
+        if opcode not in TERMINATORS:
+            return [end]
+        if opcode not in JUMPS:
+            return []
+        label: LabelRef = self.operation_list[end - 1].arg1
+        targets: List[int] = [] if label.target is None else [label.target]
+        return targets if opcode == 'JUMP' else targets + [end]
+
+    def region(self, leader: int) -> List[int]:
+        """
+        Find the blocks of the region starting at the block.
+        :param leader: first position of the hot block
+        :return: first positions of the blocks of the region
+        """
+        region: List[int] = [leader]
+        pending: List[int] = self.__successors(leader)
+        while pending and len(region) < MAX_REGION_BLOCKS:
+            block: int = pending.pop(0)
+            if block in self.blocks and block not in region:
+                region.append(block)
+                pending.extend(self.__successors(block))
+        return region
+
+    def compile(self, leader: int) -> Callable:
+        """
+        Compile the region starting at the block.
+        :param leader: first position of the hot block
+        :return: function executing the region
+        """
+        generator: RegionGenerator = RegionGenerator(self.operation_list, self.handlers, self.blocks)
+        source: str = generator.generate(self.region(leader))
+        namespace: Dict[str, object] = dict(generator.names)
+        exec(compile(source, f'<region {leader}>', 'exec'), namespace)
+        self.compiled += 1
+        return namespace['region']
+
+
+class RegionGenerator:
+    """
+    Python source of one region, objects used by the source are passed in names.
+    """
+    def __init__(self, operation_list: List[Instruction], handlers: List[Callable], blocks: Dict[int, int]):
+        self.operation_list: List[Instruction] = operation_list
+        self.handlers: List[Callable] = handlers
+        self.blocks: Dict[int, int] = blocks
+        self.names: Dict[str, object] = {
+            'UNDEFINED': UNDEFINED, 'NIL': NIL, 'err': exit_with_code, 'get_var_value': get_var_value,
+            'store': store_val_to_var, 'StringBuffer': StringBuffer, 'buffer_concat': buffer_concat,
+            'materialize': materialize_var,
+        }
+        self.__ids: Dict[int, str] = {}
+        self.lines: List[str] = []
+        # GF variables checked to exist and types of initialized variables in the block, None if the type is unknown
+        self.defined: Set[Var] = set()
+        self.types: Dict[Var, Optional[type]] = {}
+        # top of the data stack pushed in the block and kept in local variables, expressions and types of the values,
+        # they are pushed to the real stack before anything else can see it
+        self.pushed: List[Tuple[str, Optional[type]]] = []
+        self.__temps: int = 0
+
+    def __name(self, obj: object, prefix: str) -> str:
+        name: Optional[str] = self.__ids.get(id(obj))
+        if name is None:
+            name: str = f'{prefix}{len(self.__ids)}'
+            self.__ids[id(obj)] = name
+            self.names[name] = obj
+        return name
+
+    def __emit(self, line: str) -> None:
+        self.lines.append('            ' + line)
+
+    def generate(self, region: List[int]) -> str:
+        """
+        Generate the function, region blocks are selected by the position in a loop.
+        :param region: first positions of the blocks, the first one is the entry of the region
+        :return: source of the function named region
+        """
+        self.lines: List[str] = [
+            'def region(context):',
+            '    gf = context.global_frame.values',
+            '    stack = context.stack',
+            '    write = context.output.write',
+            '    pc = context.op_cnt',
+            '    while True:',
+        ]
+        for number, leader in enumerate(region):
+            self.lines.append(f'        {"if" if number == 0 else "elif"} pc == {leader}:')
+            end: int = self.blocks[leader]
+            # the block can be entered from anywhere, so nothing is known about the variables at its start
+            self.defined.clear()
+            self.types.clear()
+            for op_cnt in range(leader, end):
+                self.__instruction(op_cnt)
+            if untyped(self.operation_list[end - 1].opcode) not in TERMINATORS:
+                self.__flush()
+                self.__emit(f'pc = {end}')
+        self.lines += [
+            '        else:',
+            '            context.op_cnt = pc',
+            '            return',
+        ]
+        return '\n'.join(self.lines) + '\n'
+
+    def __read(self, symb: Union[Var, Const], target: str) -> Tuple[str, Optional[type], bool]:
+        """
+        Emit reading of the symbol.
+        :param symb: operand
+        :param target: name of the local variable for the value of a variable
+        :return: expression of the value, its type if it is known and whether it is known to be initialized
+        """
+        if isinstance(symb, Const):
+            return self.__name(symb.value, 'k'), type(symb.value), True
+        if symb.frame == 'GF':
+            self.__emit(f'{target} = gf[{symb.slot}]')
+            if symb not in self.defined:
+                self.__emit(f'if {target} is UNDEFINED: err(54, "Error: Variable doesn\'t exist.")')
+                self.defined.add(symb)
+        else:
+            self.__emit(f'{target} = get_var_value({self.__name(symb, "v")}, context)')
+        return target, self.types.get(symb), symb in self.types
+
+    def __store(self, var: Var, value: str, value_type: Optional[type]) -> None:
+        if var.frame == 'GF':
+            if var not in self.defined:
+                self.__emit(f'if gf[{var.slot}] is UNDEFINED: err(54, "Error: Variable doesn\'t exist.")')
+                self.defined.add(var)
+            self.__emit(f'gf[{var.slot}] = {value}')
+        else:
+            self.__emit(f'store({self.__name(var, "v")}, {value}, context)')
+        self.types[var] = value_type
+
+    def __check_initialized(self, values: List[Tuple[str, Optional[type], bool]],
+                            message: str = UNINITIALIZED) -> None:
+        """
+        Emit check of values which are not known to be initialized.
+        """
+        checked: List[str] = [f'{value} is None' for value, _, initialized in values if not initialized]
+        if checked:
+            self.__emit(f'if {" or ".join(checked)}: err(56, {message})')
+
+    def __initialized(self, symb: Union[Var, Const, None], value_type: Optional[type] = None) -> None:
+        """
+        Remember that the variable passed the checks, it is initialized and of the type if the type is given.
+        """
+        if isinstance(symb, Var) and (value_type is not None or symb not in self.types):
+            self.types[symb] = value_type
+
+    @staticmethod
+    def __types_pass(opcode: str, type1: Optional[type], type2: Optional[type]) -> bool:
+        """
+        Decide whether the type check of the operation passes for sure with the known types of the operands.
+        """
+        if opcode in ('LT', 'GT'):
+            return type1 is not None and type1 is type2 and type1 is not Nil
+        if opcode == 'EQ':
+            return type1 is not None and type1 is type2
+        return all(operand_type is expected for operand_type, expected in zip((type1, type2), OPERAND_TYPES[opcode]))
+
+    def __operands(self, opcode: str, symb1: Union[Var, Const], symb2: Union[Var, Const, None],
+                   checked: bool = True) -> None:
+        """
+        Emit reading and checks of the operands of an arithmetic, relational, logical or string operation,
+        the values are stored to the local variables a and b. Checks which pass for sure are left out, typed variants
+        (not checked) don't check initialization and types at all.
+        """
+        value1: Tuple[str, Optional[type], bool] = self.__read(symb1, 'a')
+        value2: Tuple[str, Optional[type], bool] = self.__read(symb2, 'b') if symb2 is not None else ('b', None, True)
+        if checked:
+            self.__check_initialized([value1, value2])
+        if value1[0] != 'a':
+            self.__emit(f'a = {value1[0]}')
+        if value2[0] != 'b':
+            self.__emit(f'b = {value2[0]}')
+        if checked and not self.__types_pass(opcode, value1[1], value2[1]):
+            self.__emit(f'if {TYPE_CHECKS[opcode]}: err(53, {WRONG_TYPES})')
+        expected: Tuple[Optional[type], ...] = OPERAND_TYPES.get(opcode, (None, None))
+        for symb, value_type in zip((symb1, symb2), expected):
+            self.__initialized(symb, value_type)
+
+    def __flush(self) -> None:
+        """
+        Push the values kept in local variables to the real stack.
+        """
+        for value, _ in self.pushed:
+            self.__emit(f'stack.append({value})')
+        self.pushed.clear()
+
+    def __push(self, value: str, value_type: Optional[type]) -> None:
+        """
+        Keep the pushed value in a local variable, constants are kept as they are.
+        """
+        if not value.startswith('k'):
+            temp: str = f's{self.__temps}'
+            self.__temps += 1
+            self.__emit(f'{temp} = {value}')
+            value: str = temp
+        self.pushed.append((value, value_type))
+
+    def __stack_operation(self, operation: str) -> None:
+        """
+        Emit operation of the STACK extension, operands kept in local variables are used directly and the result
+        is kept as well, otherwise the operation works on the real stack.
+        """
+        count: int = 1 if operation == 'NOT' else 2
+        if count == 2 and len(self.pushed) == 1:
+            # the first operand is on the real stack, the result replaces it there
+            self.__emit(f'if not stack: err(56, {NO_DATA})')
+            self.__emit(f'b = {self.pushed.pop()[0]}')
+        elif len(self.pushed) < count:
+            self.__flush()
+            if count == 1:
+                self.__emit(f'if not stack: err(56, {NO_DATA})')
+            else:
+                self.__emit(f'if len(stack) < 2: err(56, {NO_DATA})')
+                self.__emit('b = stack.pop()')
+        else:
+            value2: Tuple[str, Optional[type]] = self.pushed.pop() if count == 2 else ('b', None)
+            value1: Tuple[str, Optional[type]] = self.pushed.pop()
+            self.__emit(f'a = {value1[0]}')
+            if count == 2:
+                self.__emit(f'b = {value2[0]}')
+            if not self.__types_pass(operation, value1[1], value2[1]):
+                self.__emit(f'if {TYPE_CHECKS[operation]}: err(53, {WRONG_TYPES})')
+            if operation == 'IDIV':
+                self.__emit('if b == 0: err(57, "Error: Division by zero.")')
+            self.__push(RESULTS[operation], RESULT_TYPES[operation])
+            return
+        self.__emit('a = stack[-1]')
+        self.__emit(f'if {TYPE_CHECKS[operation]}: err(53, {WRONG_TYPES})')
+        if operation == 'IDIV':
+            self.__emit('if b == 0: err(57, "Error: Division by zero.")')
+        self.__emit(f'stack[-1] = {RESULTS[operation]}')
+
+    def __jump(self, label: LabelRef, condition: Optional[str], op_cnt: int) -> None:
+        self.__flush()
+        if label.target is None:
+            self.__emit('err(52, "Error: Label does not exist.")')
+        elif condition is None:
+            self.__emit(f'pc = {label.target}')
+        else:
+            self.__emit(f'pc = {label.target} if {condition} else {op_cnt + 1}')
+
+    def __instruction(self, op_cnt: int) -> None:
+        """
+        Emit one instruction, unknown operations call their handler.
+        """
+        instruction: Instruction = self.operation_list[op_cnt]
+        opcode: str = untyped(instruction.opcode)
+        checked: bool = opcode == instruction.opcode
+        if opcode == 'MOVE':
+            value: Tuple[str, Optional[type], bool] = self.__read(instruction.arg2, 'a')
+            self.__check_initialized([value], '"Error: Variable not initialized."')
+            self.__initialized(instruction.arg2)
+            self.__store(instruction.arg1, value[0], value[1])
+        elif opcode in RESULTS:
+            self.__operands(opcode, instruction.arg2, instruction.arg3, checked)
+            if opcode == 'IDIV' and not (isinstance(instruction.arg3, Const) and instruction.arg3.value != 0):
+                self.__emit('if b == 0: err(57, "Error: Division by zero.")')
+            self.__store(instruction.arg1, RESULTS[opcode], RESULT_TYPES[opcode])
+        elif opcode == 'WRITE':
+            value, value_type, initialized = self.__read(instruction.arg1, 'a')
+            self.__check_initialized([(value, value_type, initialized)])
+            self.__initialized(instruction.arg1)
+            if value_type is bool:
+                self.__emit(f"write('true' if {value} else 'false')")
+            elif value_type is int:
+                self.__emit(f'write(str({value}))')
+            elif value_type is str:
+                self.__emit(f'write({value})')
+            else:
+                self.__emit(f"write('true' if {value} is True else 'false' if {value} is False else "
+                            f"'' if {value} is NIL else str({value}))")
+        elif opcode == 'PUSHS':
+            value: Tuple[str, Optional[type], bool] = self.__read(instruction.arg1, 'a')
+            self.__check_initialized([value])
+            self.__initialized(instruction.arg1)
+            self.__push(value[0], value[1])
+        elif opcode == 'POPS':
+            if self.pushed:
+                value, value_type = self.pushed.pop()
+                self.__store(instruction.arg1, value, value_type)
+            else:
+                self.__emit(f'if not stack: err(56, {NO_DATA})')
+                self.__store(instruction.arg1, 'stack.pop()', None)
+        elif opcode == 'PUSHS+POPS':
+            value: Tuple[str, Optional[type], bool] = self.__read(instruction.arg2, 'a')
+            self.__check_initialized([value])
+            self.__initialized(instruction.arg2)
+            self.__store(instruction.arg1, value[0], value[1])
+        elif opcode in STACK_OPERATIONS:
+            self.__stack_operation(STACK_OPERATIONS[opcode])
+        elif opcode in ('JUMPIFEQS', 'JUMPIFNEQS'):
+            if len(self.pushed) >= 2:
+                value2: Tuple[str, Optional[type]] = self.pushed.pop()
+                value1: Tuple[str, Optional[type]] = self.pushed.pop()
+                self.__emit(f'a = {value1[0]}')
+                self.__emit(f'b = {value2[0]}')
+                if not self.__types_pass('EQ', value1[1], value2[1]):
+                    self.__emit(f'if {TYPE_CHECKS["EQ"]}: err(53, {WRONG_TYPES})')
+            else:
+                if self.pushed:
+                    self.__emit(f'if not stack: err(56, {NO_DATA})')
+                    self.__emit(f'b = {self.pushed.pop()[0]}')
+                else:
+                    self.__emit(f'if len(stack) < 2: err(56, {NO_DATA})')
+                    self.__emit('b = stack.pop()')
+                self.__emit('a = stack.pop()')
+                self.__emit(f'if {TYPE_CHECKS["EQ"]}: err(53, {WRONG_TYPES})')
+            self.__jump(instruction.arg1, 'a == b' if opcode == 'JUMPIFEQS' else 'a != b', op_cnt)
+        elif opcode == 'CLEARS':
+            self.pushed.clear()
+            self.__emit('stack.clear()')
+        elif opcode == 'MATERIALIZE':
+            var: Var = instruction.arg1
+            if var.frame == 'GF':
+                self.__emit(f'a = gf[{var.slot}]')
+                self.__emit(f'if type(a) is StringBuffer: gf[{var.slot}] = a.materialize()')
+            else:
+                self.__emit(f'materialize({self.__name(var, "v")}, context)')
+        elif opcode == 'JUMP':
+            self.__jump(instruction.arg1, None, op_cnt)
+        elif opcode in ('JUMPIFEQ', 'JUMPIFNEQ'):
+            self.__operands('EQ', instruction.arg2, instruction.arg3, checked)
+            self.__jump(instruction.arg1, 'a == b' if opcode == 'JUMPIFEQ' else 'a != b', op_cnt)
+        elif opcode in ('LT+JUMPIF', 'GT+JUMPIF', 'EQ+JUMPIF'):
+            compare: str = opcode.split('+')[0]
+            self.__operands(compare, instruction.arg2, instruction.arg3, checked)
+            var, jump_when = instruction.extra
+            self.__emit(f'r = {RESULTS[compare]}')
+            self.__store(var, 'r', bool)
+            self.__jump(instruction.arg1, 'r' if jump_when else 'not r', op_cnt)
+        else:
+            self.__flush()
+            self.__emit(f'context.op_cnt = {op_cnt}')
+            self.__emit(f'{self.__name(self.handlers[op_cnt], "h")}(context)')
+            # the operation may change any variable and the frames, only defined GF variables stay defined
+            self.types.clear()
+            if opcode in TERMINATORS:
+                self.__emit('pc = context.op_cnt')
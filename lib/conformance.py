@@ -0,0 +1,178 @@
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+from typing import List, Optional, Sequence, Tuple
+from lib.interpret_class import Interpret, RunResult
+
+DEFAULT_JOBS: int = os.cpu_count() or 1
+# time limit of one test case in seconds
+DEFAULT_TIMEOUT: float = 10.0
+
+# interpreter of the worker process, created by the pool initializer and reused for all its test cases
+_interpret: Optional[Interpret] = None
+# time limit of the test cases run by the worker process, 0 means no limit
+_timeout: float = 0.0
+
+
+class CaseTimeout(Exception):
+    """
+    Raised by the timer signal in the worker when the test case runs longer than the time limit.
+    """
+
+
+class TestCase:
+    """
+    Test case made of <name>.src with the XML program and optional <name>.in, <name>.out and <name>.rc files.
+    Missing .in and .out files mean empty input and output, missing .rc file means return code 0.
+    """
+    __slots__ = ('name', 'path')
+
+    def __init__(self, name: str, path: str):
+        self.name: str = name
+        self.path: str = path
+
+    def read(self, extension: str, default: str, newline: Optional[str] = None) -> str:
+        """
+        Read file of the test case with given extension, newlines are translated to '\\n' unless newline is given,
+        so the input is read the same way as --input of the interpreter.
+        :param extension: extension of the file
+        :param default: content if the file doesn't exist
+        :param newline: newline mode of open(), '' keeps the newlines as they are
+        :return: content of the file
+        """
+        try:
+            with open(self.path + extension, 'r', newline=newline) as file:
+                return file.read()
+        except FileNotFoundError:
+            return default
+
+
+class TestResult:
+    """
+    Result of one test case, reason describes the difference when the test failed.
+    """
+    __slots__ = ('name', 'passed', 'reason', 'time')
+
+    def __init__(self, name: str, passed: bool, reason: str, run_time: float):
+        self.name: str = name
+        self.passed: bool = passed
+        self.reason: str = reason
+        self.time: float = run_time
+
+
+def discover(directory: str) -> List[TestCase]:
+    """
+    Find test cases in the directory and all its subdirectories.
+    :param directory: root directory of the tests
+    :return: test cases sorted by name
+    """
+    cases: List[TestCase] = []
+    for root, _, files in os.walk(directory):
+        for file in files:
+            if file.endswith('.src'):
+                path: str = os.path.join(root, file[:-len('.src')])
+                cases.append(TestCase(os.path.relpath(path, directory), path))
+    cases.sort(key=lambda case: case.name)
+    return cases
+
+
+def _on_timeout(signum: int, frame) -> None:
+    raise CaseTimeout()
+
+
+def _init_worker(timeout: float) -> None:
+    global _interpret, _timeout
+    _interpret = Interpret()
+    _timeout = timeout
+    signal.signal(signal.SIGALRM, _on_timeout)
+
+
+def run_case(case: TestCase, opt_level: Optional[int] = None) -> TestResult:
+    """
+    Run the test case by the interpreter of the worker and compare the return code and the output.
+    The output is compared only when the expected return code is 0, as in the official tests. The interpreter is
+    interrupted by a timer signal when the test case runs longer than the time limit, so a program which never ends
+    fails the test case instead of blocking the worker.
+    :param case: test case
+    :param opt_level: optimization level of the run, it is added to the name of the result, None for the default
+    :return: result of the test case
+    """
+    name: str = case.name if opt_level is None else f"{case.name} [opt {opt_level}]"
+    start: float = time.perf_counter()
+    try:
+        with open(case.path + '.src', 'rb') as file:
+            program: bytes = file.read()
+        if opt_level is not None:
+            _interpret.opt_level = opt_level
+        signal.setitimer(signal.ITIMER_REAL, _timeout)
+        try:
+            result: RunResult = _interpret.run(program, case.read('.in', ''))
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    except CaseTimeout:
+        run_time: float = time.perf_counter() - start
+        return TestResult(name, False, f"timeout after {run_time:.2f} s", run_time)
+    except Exception:
+        return TestResult(name, False, "internal error\n" + traceback.format_exc(), time.perf_counter() - start)
+    run_time: float = time.perf_counter() - start
+
+    expected_rc: int = int(case.read('.rc', '0').strip() or 0)
+    if result.exit_code != expected_rc:
+        reason: str = f"return code {result.exit_code}, expected {expected_rc}"
+        if result.stderr:
+            reason += f"\n{result.stderr.rstrip()}"
+        return TestResult(name, False, reason, run_time)
+    if expected_rc == 0:
+        # the output is compared with its newlines as they are, WRITE doesn't translate them
+        expected_out: str = case.read('.out', '', newline='')
+        if result.stdout != expected_out:
+            reason: str = f"output differs\nexpected: {expected_out!r}\nactual:   {result.stdout!r}"
+            return TestResult(name, False, reason, run_time)
+    return TestResult(name, True, '', run_time)
+
+
+def run_tests(cases: List[TestCase], jobs: int = DEFAULT_JOBS, timeout: float = DEFAULT_TIMEOUT,
+              opt_levels: Optional[Sequence[int]] = None) -> List[TestResult]:
+    """
+    Run the test cases in a pool of processes, every process has one interpreter.
+    With more optimization levels every case is run at each of them against the same expected output,
+    so the optimized programs are checked to behave the same as the unoptimized one.
+    :param cases: test cases
+    :param jobs: number of processes
+    :param timeout: time limit of one test case in seconds, 0 means no limit
+    :param opt_levels: optimization levels of the runs, None runs the cases once at the default level
+    :return: results in the order of the test cases, the runs of one case are ordered by the level
+    """
+    runs: List[Tuple[TestCase, Optional[int]]] = [(case, level) for case in cases
+                                                  for level in (opt_levels or (None,))]
+    if jobs == 1 or len(runs) < 2:
+        _init_worker(timeout)
+        return [run_case(case, level) for case, level in runs]
+    chunk_size: int = max(1, min(32, len(runs) // (jobs * 8)))
+    with multiprocessing.get_context('fork').Pool(jobs, _init_worker, (timeout,)) as pool:
+        return pool.starmap(run_case, runs, chunk_size)
+
+
+def report(results: List[TestResult], wall_time: float, slowest: int) -> Tuple[int, int]:
+    """
+    Print failed tests, the slowest tests and the summary.
+    :param results: results of the tests
+    :param wall_time: time of the whole run in seconds
+    :param slowest: number of the slowest tests to print, all of them if 0
+    :return: number of passed and of all tests
+    """
+    failed: List[TestResult] = [result for result in results if not result.passed]
+    for result in failed:
+        print(f"FAIL {result.name}: {result.reason}")
+    by_time: List[TestResult] = sorted(results, key=lambda result: result.time, reverse=True)
+    if slowest > 0:
+        by_time: List[TestResult] = by_time[:slowest]
+    if by_time:
+        print(f"\n{'time ms':>10}  test")
+        for result in by_time:
+            print(f"{result.time * 1000:>10.2f}  {result.name}{'' if result.passed else ' (FAIL)'}")
+    passed: int = len(results) - len(failed)
+    print(f"\n{passed}/{len(results)} tests passed in {wall_time:.2f} s")
+    return passed, len(results)
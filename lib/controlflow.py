@@ -0,0 +1,165 @@
+from typing import Dict, List, Optional, Set, Tuple
+from lib.program import Const, LabelRef, Instruction
+from lib.values import NIL
+
+# operations after which the execution never continues with the next instruction
+NO_FALLTHROUGH: Tuple[str, ...] = ('JUMP', 'RETURN', 'EXIT')
+CONDITIONAL_JUMPS: Tuple[str, ...] = ('JUMPIFEQ', 'JUMPIFNEQ')
+
+
+def label_of(instruction: Instruction) -> Optional[LabelRef]:
+    """
+    Get label operand of an instruction which transfers control to the label.
+    :param instruction: instruction
+    :return: label operand or None
+    """
+    if instruction.opcode != 'LABEL':
+        for arg in (instruction.arg1, instruction.arg2, instruction.arg3):
+            if isinstance(arg, LabelRef):
+                return arg
+    return None
+
+
+class ControlFlow:
+    """
+    Cleanup of the control flow graph, the blocks of the graph start at LABELs and end after jumps.
+    Jumps with both operands constant become JUMP or are removed, jumps to a JUMP are threaded to its final target,
+    JUMPs to the next instruction are removed and instructions which can't be reached from the first instruction
+    are removed, the steps repeat until nothing changes.
+    Only labels which exist are used as new targets, a jump to a missing label keeps failing with 52 where it did.
+    """
+    name: str = 'controlflow'
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+
+    def run(self, instructions: List[Instruction]) -> List[Instruction]:
+        """
+        Clean up the control flow of the program.
+        :param instructions: copies of the instructions, they are changed in place
+        :return: optimized instructions
+        """
+        changed: bool = True
+        while changed:
+            count: int = len(instructions)
+            instructions, changed = self.__fold_jumps(instructions)
+            positions: Dict[str, int] = self.__positions(instructions)
+            changed: bool = self.__thread_jumps(instructions, positions) or changed
+            instructions: List[Instruction] = self.__remove_noop_jumps(instructions, positions)
+            instructions: List[Instruction] = self.__remove_unreachable(instructions)
+            changed: bool = changed or len(instructions) != count
+        return instructions
+
+    def __count(self, name: str) -> None:
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    @staticmethod
+    def __positions(instructions: List[Instruction]) -> Dict[str, int]:
+        return {instruction.arg1.name: op_cnt for op_cnt, instruction in enumerate(instructions)
+                if instruction.opcode == 'LABEL' and isinstance(instruction.arg1, LabelRef)}
+
+    @staticmethod
+    def __skip_labels(instructions: List[Instruction], op_cnt: int) -> int:
+        """
+        Get position of the first instruction from the position which is not LABEL.
+        """
+        while op_cnt < len(instructions) and instructions[op_cnt].opcode == 'LABEL':
+            op_cnt += 1
+        return op_cnt
+
+    def __fold_jumps(self, instructions: List[Instruction]) -> Tuple[List[Instruction], bool]:
+        """
+        Decide conditional jumps comparing two constants, jumps which would fail are kept.
+        :return: instructions and whether any jump was decided
+        """
+        positions: Dict[str, int] = self.__positions(instructions)
+        kept: List[Instruction] = []
+        changed: bool = False
+        for instruction in instructions:
+            label: Optional[LabelRef] = label_of(instruction)
+            if instruction.opcode not in CONDITIONAL_JUMPS or label is None or label.name not in positions or \
+                    not isinstance(instruction.arg2, Const) or not isinstance(instruction.arg3, Const):
+                kept.append(instruction)
+                continue
+            symb1_val, symb2_val = instruction.arg2.value, instruction.arg3.value
+            if type(symb1_val) is not type(symb2_val) and symb1_val is not NIL and symb2_val is not NIL:
+                kept.append(instruction)
+                continue
+            if (symb1_val == symb2_val) == (instruction.opcode == 'JUMPIFEQ'):
+                jump: Instruction = instruction.copy('JUMP')
+                jump.arg2 = jump.arg3 = None
+                kept.append(jump)
+            self.__count('constant jumps')
+            changed: bool = True
+        return kept, changed
+
+    def __thread_jumps(self, instructions: List[Instruction], positions: Dict[str, int]) -> bool:
+        """
+        Point jumps and calls landing on JUMP to the final target of the chain.
+        """
+        changed: bool = False
+        for instruction in instructions:
+            label: Optional[LabelRef] = label_of(instruction)
+            if label is None or label.name not in positions:
+                continue
+            target: LabelRef = label
+            seen: Set[str] = {target.name}
+            while True:
+                landing: int = self.__skip_labels(instructions, positions[target.name])
+                if landing == len(instructions) or instructions[landing].opcode != 'JUMP':
+                    break
+                following: Optional[LabelRef] = label_of(instructions[landing])
+                if following is None or following.name not in positions:
+                    break
+                if following.name in seen:
+                    # jumps in a cycle, the chain has no final target
+                    target: LabelRef = label
+                    break
+                seen.add(following.name)
+                target: LabelRef = following
+            if target is not label:
+                for slot in ('arg1', 'arg2', 'arg3'):
+                    if getattr(instruction, slot) is label:
+                        setattr(instruction, slot, target)
+                self.__count('threaded jumps')
+                changed: bool = True
+        return changed
+
+    def __remove_noop_jumps(self, instructions: List[Instruction], positions: Dict[str, int]) -> List[Instruction]:
+        """
+        Remove JUMPs to the instruction which follows them anyway.
+        """
+        kept: List[Instruction] = []
+        for op_cnt, instruction in enumerate(instructions):
+            label: Optional[LabelRef] = label_of(instruction)
+            if instruction.opcode == 'JUMP' and label is not None and label.name in positions and \
+                    self.__skip_labels(instructions, positions[label.name]) == \
+                    self.__skip_labels(instructions, op_cnt + 1):
+                self.__count('no-op jumps')
+                continue
+            kept.append(instruction)
+        return kept
+
+    def __remove_unreachable(self, instructions: List[Instruction]) -> List[Instruction]:
+        """
+        Remove instructions which can't be reached from the first instruction.
+        Instruction after CALL is reachable, the called code can return to it.
+        """
+        positions: Dict[str, int] = self.__positions(instructions)
+        reachable: List[bool] = [False] * len(instructions)
+        pending: List[int] = [0] if instructions else []
+        while pending:
+            op_cnt: int = pending.pop()
+            if op_cnt >= len(instructions) or reachable[op_cnt]:
+                continue
+            reachable[op_cnt] = True
+            instruction: Instruction = instructions[op_cnt]
+            label: Optional[LabelRef] = label_of(instruction)
+            if label is not None and label.name in positions:
+                pending.append(positions[label.name])
+            if instruction.opcode not in NO_FALLTHROUGH:
+                pending.append(op_cnt + 1)
+        kept: List[Instruction] = [instruction for op_cnt, instruction in enumerate(instructions) if reachable[op_cnt]]
+        if len(kept) != len(instructions):
+            self.counts['unreachable'] = self.counts.get('unreachable', 0) + len(instructions) - len(kept)
+        return kept
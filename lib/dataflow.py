@@ -0,0 +1,204 @@
+from typing import Dict, List, Set, Tuple, Union
+from lib.program import Var, Const, Instruction
+from lib.frame import Frame
+from lib.values import Value, type_name
+from lib.errors import InterpretError
+
+# operations storing their result to the variable in arg1, SETCHAR reads the variable as well
+WRITES: Tuple[str, ...] = ('MOVE', 'ADD', 'SUB', 'MUL', 'IDIV', 'LT', 'GT', 'EQ', 'AND', 'OR', 'NOT', 'INT2CHAR',
+                           'STRI2INT', 'READ', 'CONCAT', 'STRLEN', 'GETCHAR', 'SETCHAR', 'TYPE', 'POPS')
+# operations whose result depends only on their operands, they are computed at load time when the operands are known
+FOLDABLE: Tuple[str, ...] = ('ADD', 'SUB', 'MUL', 'IDIV', 'LT', 'GT', 'EQ', 'AND', 'OR', 'NOT', 'INT2CHAR', 'STRI2INT',
+                             'CONCAT', 'STRLEN', 'GETCHAR', 'TYPE')
+# operations reading the symbol in arg1
+READS_ARG1: Tuple[str, ...] = ('WRITE', 'PUSHS', 'EXIT', 'DPRINT')
+# operations after which the basic block ends
+BLOCK_ENDS: Tuple[str, ...] = ('JUMP', 'JUMPIFEQ', 'JUMPIFNEQ', 'JUMPIFEQS', 'JUMPIFNEQS', 'CALL', 'RETURN', 'EXIT')
+# operations which change the frames behind LF and TF variables
+FRAME_CHANGES: Tuple[str, ...] = ('CREATEFRAME', 'PUSHFRAME', 'POPFRAME')
+# operations which can see all variables
+OBSERVERS: Tuple[str, ...] = ('BREAK',)
+
+# variable of the fold context, the result of the folded operation is stored to it
+RESULT: Var = Var('GF', '', 0)
+
+
+class FoldContext:
+    """
+    Minimal interpreter state for computing one operation with constant operands at load time.
+    """
+    __slots__ = ('operation_list', 'op_cnt', 'global_frame', 'local_frame', 'tmp_frame')
+
+    def __init__(self, instruction: Instruction):
+        self.operation_list: List[Instruction] = [instruction]
+        self.op_cnt: int = 0
+        self.global_frame: Frame = Frame(1)
+        self.global_frame.define(0)
+        self.local_frame: List[Frame] = []
+        self.tmp_frame: None = None
+
+
+def source_slots(instruction: Instruction) -> Tuple[str, ...]:
+    """
+    Get operand slots of the instruction which are read as symbols.
+    :param instruction: instruction
+    :return: names of the slots
+    """
+    if instruction.opcode in WRITES:
+        return () if instruction.opcode in ('READ', 'POPS') else ('arg2', 'arg3')
+    if instruction.opcode in READS_ARG1:
+        return ('arg1',)
+    if instruction.opcode in ('JUMPIFEQ', 'JUMPIFNEQ'):
+        return ('arg2', 'arg3')
+    return ()
+
+
+class Dataflow:
+    """
+    Constant folding, copy propagation and dead store elimination in basic blocks.
+    Variables with a known constant value or copied from another variable are replaced by the constant or
+    by the source variable, operations with constant operands are computed by their own execute() and replaced by
+    MOVE of the result, MOVEs to variables which are written again in the block before they are read are removed.
+    Values are known only after a successful store in the same block, so a replaced variable is always defined and
+    initialized, and facts about LF and TF variables are forgotten when the frames change. An operation which would
+    fail is never folded and only MOVEs which can't fail are removed, so all errors stay where they were.
+    """
+    name: str = 'dataflow'
+
+    def __init__(self, operations: Dict):
+        self.operations: Dict = operations
+        self.counts: Dict[str, int] = {}
+
+    def run(self, instructions: List[Instruction]) -> List[Instruction]:
+        """
+        Optimize every basic block of the program.
+        :param instructions: copies of the instructions, they are changed in place
+        :return: optimized instructions
+        """
+        removed: Set[int] = set()
+        start: int = 0
+        for op_cnt, instruction in enumerate(instructions):
+            if instruction.opcode == 'LABEL' and start < op_cnt:
+                removed |= self.__optimize_block(instructions, start, op_cnt)
+                start: int = op_cnt
+            elif instruction.opcode in BLOCK_ENDS:
+                removed |= self.__optimize_block(instructions, start, op_cnt + 1)
+                start: int = op_cnt + 1
+        removed |= self.__optimize_block(instructions, start, len(instructions))
+        return [instruction for op_cnt, instruction in enumerate(instructions) if op_cnt not in removed]
+
+    def __count(self, name: str) -> None:
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def __optimize_block(self, instructions: List[Instruction], start: int, end: int) -> Set[int]:
+        """
+        Propagate and fold forward through the block, then find dead stores backward.
+        :return: positions of the removed instructions
+        """
+        known: Dict[Var, Const] = {}
+        copies: Dict[Var, Var] = {}
+        defined: Set[Var] = set()
+        initialized: Set[Var] = set()
+        removable: Set[int] = set()
+        for op_cnt in range(start, end):
+            instruction: Instruction = instructions[op_cnt]
+            for slot in source_slots(instruction):
+                arg: Union[Var, Const, None] = getattr(instruction, slot)
+                if isinstance(arg, Var):
+                    replacement: Union[Var, Const, None] = known.get(arg) or copies.get(arg)
+                    if replacement is not None:
+                        setattr(instruction, slot, replacement)
+                        self.__count('propagated')
+            if instruction.opcode in FOLDABLE:
+                self.__fold(instruction)
+
+            if instruction.opcode in FRAME_CHANGES:
+                self.__forget_frames(known, copies, defined, initialized)
+                continue
+            if instruction.opcode == 'MOVE' and instruction.arg1 in defined and \
+                    (isinstance(instruction.arg2, Const) or instruction.arg2 in initialized):
+                removable.add(op_cnt)
+            # the instruction accesses all its variables, so they are defined after it
+            for arg in (instruction.arg1, instruction.arg2, instruction.arg3):
+                if isinstance(arg, Var):
+                    defined.add(arg)
+            if instruction.opcode == 'DEFVAR':
+                self.__forget(instruction.arg1, known, copies)
+                initialized.discard(instruction.arg1)
+            elif instruction.opcode in WRITES:
+                var: Var = instruction.arg1
+                self.__forget(var, known, copies)
+                if instruction.opcode == 'MOVE':
+                    if isinstance(instruction.arg2, Const):
+                        known[var] = instruction.arg2
+                    elif instruction.arg2 is not var:
+                        copies[var] = instruction.arg2
+                initialized.add(var)
+        return self.__dead_stores(instructions, start, end, removable)
+
+    @staticmethod
+    def __forget(var: Var, known: Dict[Var, Const], copies: Dict[Var, Var]) -> None:
+        known.pop(var, None)
+        copies.pop(var, None)
+        for copy in [copy for copy, source in copies.items() if source is var]:
+            del copies[copy]
+
+    @staticmethod
+    def __forget_frames(known: Dict[Var, Const], copies: Dict[Var, Var], defined: Set[Var],
+                        initialized: Set[Var]) -> None:
+        """
+        Forget everything about LF and TF variables, the frames behind them changed.
+        """
+        for facts in (known, copies):
+            for var in [var for var, value in facts.items()
+                        if var.frame != 'GF' or isinstance(value, Var) and value.frame != 'GF']:
+                del facts[var]
+        for facts in (defined, initialized):
+            facts.difference_update([var for var in facts if var.frame != 'GF'])
+
+    def __fold(self, instruction: Instruction) -> None:
+        """
+        Compute the operation if all its operands are constants and replace it by MOVE of the result.
+        """
+        operands: List[Union[Var, Const, None]] = [instruction.arg2, instruction.arg3]
+        if not all(isinstance(arg, Const) or arg is None for arg in operands):
+            return
+        probe: Instruction = instruction.copy()
+        probe.arg1 = RESULT
+        context: FoldContext = FoldContext(probe)
+        try:
+            self.operations[instruction.opcode].execute(context)
+        except InterpretError:
+            return
+        result: Value = context.global_frame.values[0]
+        instruction.opcode = 'MOVE'
+        instruction.arg2 = Const(type_name(result), result)
+        instruction.arg3 = None
+        self.__count('folded')
+
+    def __dead_stores(self, instructions: List[Instruction], start: int, end: int, removable: Set[int]) -> Set[int]:
+        """
+        Find MOVEs to variables which are written again before they are read.
+        :param removable: positions of MOVEs which can't fail
+        :return: positions of the dead MOVEs
+        """
+        removed: Set[int] = set()
+        overwritten: Set[Var] = set()
+        for op_cnt in range(end - 1, start - 1, -1):
+            instruction: Instruction = instructions[op_cnt]
+            if instruction.opcode in FRAME_CHANGES or instruction.opcode in OBSERVERS or \
+                    instruction.opcode in BLOCK_ENDS:
+                overwritten.clear()
+            if instruction.opcode in WRITES and instruction.opcode != 'SETCHAR':
+                var: Var = instruction.arg1
+                if op_cnt in removable and var in overwritten:
+                    removed.add(op_cnt)
+                    self.__count('removed')
+                    continue
+                overwritten.add(var)
+                reads: Tuple = (instruction.arg2, instruction.arg3)
+            else:
+                reads: Tuple = (instruction.arg1, instruction.arg2, instruction.arg3)
+            for arg in reads:
+                overwritten.discard(arg)
+        return removed
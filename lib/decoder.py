@@ -0,0 +1,152 @@
+from operator import attrgetter
+from typing import Dict, List, Set, Union, Optional, Tuple, Iterable
+from lib.program import Var, Const, LabelRef, Instruction, Program
+from lib.utils import exit_with_code, remove_escape_seq, parse_int
+from lib.values import Value, NIL
+from lib.frame import is_sparse
+
+
+class Decoder:
+    """
+    Turn the list of XML operations into the decoded program.
+    Operands are parsed only once here, so the operations don't have to split or convert strings when executed.
+    """
+    def __init__(self):
+        self.__operands: Dict[Tuple[str, Optional[str]], Union[Var, Const, LabelRef]] = {}
+        self.__vars: Dict[Tuple[str, str], Var] = {}
+        self.__labels: Dict[str, LabelRef] = {}
+        self.__constants: List[Const] = []
+        self.__slots: Dict[str, Dict[str, int]] = {'GF': {}, 'LF': {}, 'TF': {}}
+
+    def decode(self, operation_list: Iterable[Dict[str, Union[Tuple[str, Optional[str]], str, int]]]) -> Program:
+        """
+        Decode the operations, sort them by order, register labels and resolve label operands.
+        Operations are decoded one by one as they are read, so only the decoded program is kept in memory.
+        :param operation_list: operations from XMLParser in document order
+        :return: decoded program
+        """
+        # identical XML arguments share one operand object, the cache is keyed by the (type, text) pair
+        operands: Dict[Tuple[str, Optional[str]], Union[Var, Const, LabelRef]] = {}
+        self.__operands = operands
+        self.__vars = {}
+        self.__labels = {}
+        self.__constants = []
+        # LF and TF share the slots, because temporary frame becomes local frame after PUSHFRAME
+        local_slots: Dict[str, int] = {}
+        self.__slots = {'GF': {}, 'LF': local_slots, 'TF': local_slots}
+        instructions: List[Instruction] = []
+        ordered: bool = True
+        last_order: int = 0
+        for op in operation_list:
+            instruction: Instruction = Instruction(op['opcode'].upper(), op['order'])
+            if 'arg1' in op:
+                arg: Tuple[str, Optional[str]] = op['arg1']
+                instruction.arg1 = operands[arg] if arg in operands else self.decode_arg(arg)
+            if 'arg2' in op:
+                arg: Tuple[str, Optional[str]] = op['arg2']
+                instruction.arg2 = operands[arg] if arg in operands else self.decode_arg(arg)
+            if 'arg3' in op:
+                arg: Tuple[str, Optional[str]] = op['arg3']
+                instruction.arg3 = operands[arg] if arg in operands else self.decode_arg(arg)
+            if instruction.order <= last_order:
+                ordered: bool = False
+            last_order: int = instruction.order
+            instructions.append(instruction)
+        # instructions are usually already in order, sorting and the check of duplicates is needed only if not
+        if not ordered:
+            instructions.sort(key=attrgetter('order'))
+            for op_cnt in range(1, len(instructions)):
+                if instructions[op_cnt].order == instructions[op_cnt - 1].order:
+                    exit_with_code(32, "Error: XML file is not well-formed.")
+
+        label_dict: Dict[str, int] = {}
+        for op_cnt, instruction in enumerate(instructions):
+            if instruction.opcode == 'LABEL' and isinstance(instruction.arg1, LabelRef):
+                if label_dict.get(instruction.arg1.name) is not None:
+                    exit_with_code(52, "Error: Label already exists.")
+                label_dict[instruction.arg1.name] = op_cnt
+        for label in self.__labels.values():
+            label.target = label_dict.get(label.name)
+        self.__register_frame_layouts(instructions)
+        return Program(instructions, label_dict, self.__constants,
+                       list(self.__slots['GF'].keys()), list(local_slots.keys()))
+
+    @staticmethod
+    def __register_frame_layouts(instructions: List[Instruction]) -> None:
+        """
+        Find DEFVARs of the temporary frame following each CREATEFRAME, so the frame can be allocated in its full size.
+        Layout which would be mostly empty is not allocated, the frame becomes sparse when the variables are defined.
+        """
+        for op_cnt, instruction in enumerate(instructions):
+            if instruction.opcode != 'CREATEFRAME':
+                continue
+            slots: Set[int] = set()
+            for following_cnt in range(op_cnt + 1, len(instructions)):
+                following: Instruction = instructions[following_cnt]
+                if following.opcode == 'DEFVAR' and isinstance(following.arg1, Var) and following.arg1.frame == 'TF':
+                    slots.add(following.arg1.slot)
+                elif following.opcode not in ('MOVE', 'DEFVAR'):
+                    break
+            size: int = max(slots) + 1 if slots else 0
+            instruction.frame_size = 0 if is_sparse(size, len(slots)) else size
+
+    def decode_arg(self, arg: Tuple[str, Optional[str]]) -> Union[Var, Const, LabelRef]:
+        """
+        Decode one XML argument which was not seen yet and store it to the operand cache.
+        :param arg: XML argument, pair of type and text
+        :return: decoded operand
+        """
+        arg_type, value = arg
+        if arg_type == 'var':
+            var: List[str] = (value or '').strip().split('@', 1)
+            if len(var) != 2:
+                exit_with_code(32, "Error: Wrong variable format.")
+            # variables written with different whitespace are still the same variable
+            key: Tuple[str, str] = (var[0], var[1])
+            if key not in self.__vars:
+                slots: Optional[Dict[str, int]] = self.__slots.get(var[0])
+                slot: int = -1
+                if slots is not None:
+                    slot: int = slots.setdefault(var[1], len(slots))
+                self.__vars[key] = Var(var[0], var[1], slot)
+            operand: Union[Var, Const, LabelRef] = self.__vars[key]
+        elif arg_type in ('int', 'bool', 'string', 'nil'):
+            # every distinct literal is decoded only once and shared through the constant pool
+            operand: Union[Var, Const, LabelRef] = Const(arg_type, self.decode_literal(arg_type, value),
+                                                         len(self.__constants))
+            self.__constants.append(operand)
+        elif arg_type == 'label':
+            operand: Union[Var, Const, LabelRef] = LabelRef(value)
+            self.__labels[value] = operand
+        elif arg_type == 'type':
+            operand: Union[Var, Const, LabelRef] = Const('type', value)
+        else:
+            exit_with_code(32, "Error: Unknown argument type.")
+        self.__operands[arg] = operand
+        return operand
+
+    @staticmethod
+    def decode_literal(arg_type: str, value: Optional[str]) -> Value:
+        """
+        Convert literal from XML to its value.
+        :param arg_type: type of the literal
+        :param value: text of the literal
+        :return: value of the literal
+        """
+        if arg_type == 'int':
+            try:
+                return parse_int(value)
+            except (ValueError, TypeError):
+                exit_with_code(32, "Error: Wrong type of value.")
+        elif arg_type == 'bool':
+            if value == 'true':
+                return True
+            elif value == 'false':
+                return False
+            exit_with_code(32, "Error: Wrong type of value.")
+        elif arg_type == 'string':
+            if value is None:
+                return ''
+            string: str = value.strip().replace('\n', '')
+            return remove_escape_seq(string)
+        return NIL
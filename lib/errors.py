@@ -0,0 +1,89 @@
+from typing import Dict, Type
+
+
+class InterpretError(Exception):
+    """
+    Error of the interpretation, code is the return code defined by the IPPcode23 specification.
+    """
+    code: int = 99
+
+    def __init__(self, message: str, code: int = None):
+        super().__init__(message)
+        self.message: str = message
+        if code is not None:
+            self.code: int = code
+
+
+class ArgumentError(InterpretError):
+    code: int = 10
+
+
+class InputFileError(InterpretError):
+    code: int = 11
+
+
+class OutputFileError(InterpretError):
+    code: int = 12
+
+
+class XMLFormatError(InterpretError):
+    code: int = 31
+
+
+class XMLStructureError(InterpretError):
+    code: int = 32
+
+
+class SemanticError(InterpretError):
+    code: int = 52
+
+
+class OperandTypeError(InterpretError):
+    code: int = 53
+
+
+class VariableError(InterpretError):
+    code: int = 54
+
+
+class FrameError(InterpretError):
+    code: int = 55
+
+
+class MissingValueError(InterpretError):
+    code: int = 56
+
+
+class OperandValueError(InterpretError):
+    code: int = 57
+
+
+class StringError(InterpretError):
+    code: int = 58
+
+
+ERRORS: Dict[int, Type[InterpretError]] = {error.code: error for error in (
+    ArgumentError, InputFileError, OutputFileError, XMLFormatError, XMLStructureError, SemanticError,
+    OperandTypeError, VariableError, FrameError, MissingValueError, OperandValueError, StringError)}
+
+
+def error_for_code(code: int, message: str) -> InterpretError:
+    """
+    Create the error of the given return code.
+    :param code: Return code
+    :param message: Error message
+    :return: Instance of the subclass for the code, InterpretError for unknown codes
+    """
+    error_class: Type[InterpretError] = ERRORS.get(code)
+    if error_class is None:
+        return InterpretError(message, code)
+    return error_class(message)
+
+
+class ProgramExit(Exception):
+    """
+    Raised by EXIT, the program ended with the given return code.
+    """
+    def __init__(self, code: int):
+        super().__init__(code)
+        self.code: int = code
@@ -0,0 +1,142 @@
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from lib.values import Value, StringBuffer
+
+
+class Undefined:
+    """
+    Content of a frame slot whose variable was not defined by DEFVAR.
+    """
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return 'undefined'
+
+
+UNDEFINED: Undefined = Undefined()
+
+# maximal number of released frames kept for reuse
+FRAME_POOL_SIZE: int = 64
+# slots of LF and TF variables are numbered across the whole program, so a frame of a function whose variables have
+# high slots would be mostly empty, an array longer than DENSE_SIZE is used only for at most SPARSE_RATIO slots
+# per defined variable, other frames store only the defined variables
+DENSE_SIZE: int = 32
+SPARSE_RATIO: int = 4
+
+
+def is_sparse(size: int, defined: int) -> bool:
+    """
+    Decide whether the frame should store only its defined variables.
+    :param size: size of the array needed for the highest slot
+    :param defined: number of the defined variables
+    :return: True if the array would be mostly empty
+    """
+    return size > DENSE_SIZE and size > SPARSE_RATIO * defined
+
+
+class SparseValues(dict):
+    """
+    Values of a sparse frame by their slots, slots which are not in the dictionary are not defined.
+    """
+    __slots__ = ()
+
+    def __missing__(self, slot: int) -> 'Undefined':
+        return UNDEFINED
+
+
+class Frame:
+    """
+    Frame of variables stored in a preallocated array indexed by the variable slot resolved by Decoder, or in
+    SparseValues if the array would be mostly empty. Both are indexed the same way, the array raises IndexError
+    for slots behind its end, which are not defined as well.
+    None means the variable is defined but not initialized, UNDEFINED means the variable is not defined.
+    """
+    __slots__ = ('values',)
+
+    def __init__(self, size: int = 0):
+        self.values: Union[List[Union[Value, None, Undefined]], SparseValues] = [UNDEFINED] * size
+
+    def define(self, slot: int) -> bool:
+        """
+        Define variable in the frame, the array grows if the slot is not part of the frame layout, the frame
+        becomes sparse if the grown array would be mostly empty.
+        :param slot: Slot of the variable
+        :return: False if the variable is already defined
+        """
+        values: Union[List[Union[Value, None, Undefined]], SparseValues] = self.values
+        if type(values) is SparseValues:
+            if slot in values:
+                return False
+        elif slot < len(values):
+            if values[slot] is not UNDEFINED:
+                return False
+        elif is_sparse(slot + 1, len(values) - values.count(UNDEFINED) + 1):
+            self.values = SparseValues((index, value) for index, value in enumerate(values) if value is not UNDEFINED)
+            values: SparseValues = self.values
+        else:
+            values.extend([UNDEFINED] * (slot + 1 - len(values)))
+        values[slot] = None
+        return True
+
+    def variables(self, names: List[str]) -> Dict[str, Union[Value, None]]:
+        """
+        Get defined variables of the frame by their names, string buffers are shown as their strings.
+        :param names: Names of the slots
+        :return: Dictionary of variable names and values
+        """
+        values: Iterable[Tuple[int, Union[Value, None, Undefined]]] = sorted(self.values.items()) \
+            if type(self.values) is SparseValues else enumerate(self.values)
+        return {names[slot]: value.materialize() if type(value) is StringBuffer else value
+                for slot, value in values if value is not UNDEFINED}
+
+
+class FramePool:
+    """
+    Released frames kept for reuse by CREATEFRAME. A frame is either the temporary frame or in the stack of local
+    frames, so when the temporary frame is replaced by CREATEFRAME or POPFRAME, nothing refers to it anymore and it is
+    released, popped frame stays the temporary frame until it is replaced as well. All variables of a released frame
+    are undefined, only the frame object and its array (or dictionary of a sparse frame) are reused. Frames are reused
+    in the reverse order of their release, so a recursive call usually gets the array of the previous call, which
+    already has the size of the variables the called function defines. Resetting a frame costs the size of its own
+    array, which is never mostly empty, because such frames are sparse.
+    """
+    __slots__ = ('limit', 'allocated', '__free', '__blank')
+
+    def __init__(self, limit: int = FRAME_POOL_SIZE):
+        self.limit: int = limit
+        self.allocated: int = 0
+        self.__free: List[Frame] = []
+        # values of an empty frame by its size, a released frame is reset by copying them to its array
+        self.__blank: Dict[int, Tuple[Undefined, ...]] = {}
+
+    def acquire(self, size: int) -> Frame:
+        """
+        Get empty frame, the last released one if there is any, its array grows to the size if it is smaller.
+        :param size: size of the frame layout
+        :return: frame without defined variables
+        """
+        if not self.__free:
+            self.allocated += 1
+            return Frame(size)
+        frame: Frame = self.__free.pop()
+        if type(frame.values) is not SparseValues and len(frame.values) < size:
+            frame.values.extend([UNDEFINED] * (size - len(frame.values)))
+        return frame
+
+    def release(self, frame: Optional[Frame]) -> None:
+        """
+        Keep the frame for reuse, its variables are undefined, so the values it holds can be freed.
+        :param frame: replaced temporary frame, None if there was none
+        """
+        if frame is None or len(self.__free) >= self.limit:
+            return
+        if type(frame.values) is SparseValues:
+            frame.values.clear()
+            self.__free.append(frame)
+            return
+        size: int = len(frame.values)
+        blank: Optional[Tuple[Undefined, ...]] = self.__blank.get(size)
+        if blank is None:
+            blank: Tuple[Undefined, ...] = (UNDEFINED,) * size
+            self.__blank[size] = blank
+        frame.values[:] = blank
+        self.__free.append(frame)
@@ -0,0 +1,84 @@
+from abc import ABC, abstractmethod
+import locale
+import mmap
+from typing import BinaryIO, TextIO, Union
+
+
+class LineSource(ABC):
+    """
+    Source of input lines for READ, only the line which is read is held in memory.
+    """
+    @abstractmethod
+    def read_line(self) -> Union[str, None]:
+        """
+        Read next line without the line separator.
+        :return: Line or None at the end of input
+        """
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class StreamLineSource(LineSource):
+    """
+    Lines read one by one from a text stream (input file or standard input).
+    """
+    def __init__(self, stream: TextIO, owned: bool = False):
+        self.__stream: TextIO = stream
+        self.__owned: bool = owned
+
+    def read_line(self) -> Union[str, None]:
+        line: str = self.__stream.readline()
+        if line == '':
+            return None
+        return line.replace('\n', '')
+
+    def close(self) -> None:
+        if self.__owned:
+            self.__stream.close()
+
+
+class MmapLineSource(LineSource):
+    """
+    Lines sliced from a memory-mapped regular file, the pages are loaded by the OS as the lines are read.
+    Lines are separated by '\\n', '\\r' before the separator is removed like in the text mode.
+    """
+    def __init__(self, file: BinaryIO):
+        self.__file: BinaryIO = file
+        self.__map: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__position: int = 0
+        self.__encoding: str = locale.getpreferredencoding(False)
+
+    def read_line(self) -> Union[str, None]:
+        if self.__position >= len(self.__map):
+            return None
+        end: int = self.__map.find(b'\n', self.__position)
+        if end == -1:
+            end: int = len(self.__map)
+        line: bytes = self.__map[self.__position:end]
+        self.__position = end + 1
+        if line.endswith(b'\r'):
+            line: bytes = line[:-1]
+        return line.decode(self.__encoding)
+
+    def close(self) -> None:
+        self.__map.close()
+        self.__file.close()
+
+
+def open_line_source(path: str, use_mmap: bool = False) -> LineSource:
+    """
+    Open input file as a line source.
+    :param path: Path to the input file
+    :param use_mmap: Map the file into memory, used only for non-empty regular files
+    :return: Line source
+    """
+    if use_mmap:
+        file: BinaryIO = open(path, 'rb')
+        try:
+            return MmapLineSource(file)
+        except (ValueError, OSError):
+            # empty files and files which are not regular can't be mapped
+            file.close()
+    return StreamLineSource(open(path, 'r'), owned=True)
@@ -1,67 +1,308 @@
 from argparse import ArgumentParser
+import gc
+from io import BytesIO, StringIO
 import sys
-from typing import Dict, List, Union, AnyStr
+import time
+from typing import Dict, List, Union, Callable, Iterator, Tuple, BinaryIO, TextIO, Optional
 from xml.etree.ElementTree import Element
 from xml.etree import ElementTree
 from lib.op_factory import OperationFactory
 from lib.operations import Operation
+from lib.decoder import Decoder
+from lib.program import Instruction, Program
+from lib.frame import Frame, FramePool
+from lib.values import Value
+from lib.output import OutputBuffer, DEFAULT_BUFFER_SIZE
+from lib.input_source import LineSource, StreamLineSource, open_line_source
+from lib.cache import ProgramCache, DEFAULT_CACHE_SIZE
+from lib.errors import InterpretError, ProgramExit
+from lib.profiler import Profiler, ROOT
+from lib.optimizer import Optimizer, DEFAULT_OPT_LEVEL, MAX_OPT_LEVEL
+from lib.compiler import BlockCompiler
+from lib.typeinfer import TypeInference
+from lib.batch import BatchRunner, DEFAULT_JOBS, expand_inputs
 from lib.utils import exit_with_code
-import re
 
 
-class Singleton(type):
+class RunResult:
     """
-    Singleton metaclass.
-    Ref: https://refactoring.guru/design-patterns/singleton/python/example
+    Result of a program run by Interpret.run().
+    Stdout and stderr are None if they were written to the given streams, error is None if the program didn't fail.
     """
-    _instances = {}
+    def __init__(self, exit_code: int, stdout: Optional[str], stderr: Optional[str],
+                 error: Optional[InterpretError] = None):
+        self.exit_code: int = exit_code
+        self.stdout: Optional[str] = stdout
+        self.stderr: Optional[str] = stderr
+        self.error: Optional[InterpretError] = error
 
-    def __call__(cls, *args, **kwargs):
-        if cls not in cls._instances:
-            cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
-        return cls._instances[cls]
+    def check(self) -> None:
+        """
+        Raise the error of the run if the program failed.
+        :raise InterpretError: error of the run
+        """
+        if self.error is not None:
+            raise self.error
 
 
-class Interpret(metaclass=Singleton):
+class Interpret:
     def __init__(self):
         self.__op_factory: OperationFactory = OperationFactory()
         self.__xml_parser: XMLParser = XMLParser()
-        self.__arg_parser: ArgumentParser = ArgumentParser()
+        self.__decoder: Decoder = Decoder()
 
         self.source_path: None = None
         self.input_path: None = None
-        self.input_lines: None = None
-        self.input_line: int = 0
+        self.output_buffer_size: int = DEFAULT_BUFFER_SIZE
+        self.output: OutputBuffer = OutputBuffer(sys.stdout)
+        self.error: TextIO = sys.stderr
+        self.input_mmap: bool = False
+        self.cache_dir: Optional[str] = None
+        self.cache_size: int = DEFAULT_CACHE_SIZE
+        self.input_paths: Optional[List[str]] = None
+        self.results_dir: Optional[str] = None
+        self.jobs: int = DEFAULT_JOBS
+        self.profile: bool = False
+        self.profile_output: Optional[str] = None
+        self.profile_folded: Optional[str] = None
+        self.opt_level: int = DEFAULT_OPT_LEVEL
+        self.opt_report: bool = False
+        self.type_errors: bool = False
+        self.input_source: LineSource = StreamLineSource(sys.stdin)
         self.op_cnt: int = 0
-        self.global_frame: Dict[str, Dict[str, str]] = {}
-        self.local_frame: List[Dict[str, Dict[str, str]]] = []
+        self.global_frame: Frame = Frame()
+        self.local_frame: List[Frame] = []
         self.tmp_frame: None = None
+        self.frame_pool: FramePool = FramePool()
+        self.global_names: List[str] = []
+        self.local_names: List[str] = []
         self.label_dict: Dict[str, int] = {}
-        self.stack: List[Dict[str, Union[str, int, bool]]] = []
+        self.stack: List[Value] = []
         self.call_stack: List[int] = []
-        self.operation_list: List[Dict[str, Union[Dict[str, str], str]]] = []
+        self.operation_list: List[Instruction] = []
+        self.handlers: List[Callable] = []
+        self.program: Optional[Program] = None
+
+    def interpret(self) -> None:
+        """
+        Run the interpreter from the command line, error of the interpretation is printed and ends the process
+        with its return code.
+        """
+        try:
+            self.__parse_args()
+            self.load_program(self.source_path)
+            if self.input_paths is not None:
+                BatchRunner(self, self.jobs, self.results_dir).run(self.input_paths, sys.stdout)
+                return
+            if self.input_path is not None:
+                self.__parse_input()
+            self.output = OutputBuffer(sys.stdout, self.output_buffer_size)
+            profiler: Optional[Profiler] = Profiler(self.operation_list) if self.profile else None
+            try:
+                if profiler is None:
+                    self.execute_operations()
+                else:
+                    self.execute_operations_profiled(profiler)
+            finally:
+                self.output.flush()
+                self.input_source.close()
+                if profiler is not None:
+                    self.__write_profile(profiler)
+        except InterpretError as error:
+            print(error.message, file=sys.stderr)
+            sys.exit(error.code)
+        except ProgramExit as program_exit:
+            sys.exit(program_exit.code)
+
+    def run(self, program: Union[bytes, Program], input_data: Union[str, TextIO, LineSource, None] = None,
+            output: Optional[TextIO] = None, error_output: Optional[TextIO] = None) -> RunResult:
+        """
+        Run the program in this process, the state is reset before the run, so one instance can run any number
+        of programs one after another.
+        :param program: XML source of the program or program returned by load_program()
+        :param input_data: input for READ, whole input as a string, text stream or line source, None for empty input
+        :param output: stream for the output of the program, None to return the output in the result
+        :param error_output: stream for DPRINT, BREAK and the error message, None to return it in the result
+        :return: result of the run, the error message is part of its stderr same as on the command line
+        """
+        stdout: TextIO = StringIO() if output is None else output
+        stderr: TextIO = StringIO() if error_output is None else error_output
+        self.output = OutputBuffer(stdout, self.output_buffer_size)
+        self.error: TextIO = stderr
+        if isinstance(input_data, LineSource):
+            self.input_source: LineSource = input_data
+        elif input_data is None or isinstance(input_data, str):
+            self.input_source: LineSource = StreamLineSource(StringIO(input_data or ''))
+        else:
+            self.input_source: LineSource = StreamLineSource(input_data)
+        exit_code: int = 0
+        error: Optional[InterpretError] = None
+        try:
+            if program is self.program:
+                # the program is already checked and bound to the operations
+                self.reset()
+            elif isinstance(program, Program):
+                self.set_program(program)
+            else:
+                self.load_program(BytesIO(program))
+            self.execute_operations()
+        except InterpretError as interpret_error:
+            error: InterpretError = interpret_error
+            exit_code: int = error.code
+        except ProgramExit as program_exit:
+            exit_code: int = program_exit.code
+        finally:
+            self.output.flush()
+            self.error: TextIO = sys.stderr
+        if error is not None:
+            print(error.message, file=stderr)
+        return RunResult(exit_code, stdout.getvalue() if output is None else None,
+                         stderr.getvalue() if error_output is None else None, error)
+
+    def reset(self) -> None:
+        """
+        Reset the state of the execution, so the loaded program runs from its beginning.
+        """
+        self.op_cnt: int = 0
+        self.global_frame: Frame = Frame(len(self.global_names))
+        self.local_frame: List[Frame] = []
+        self.tmp_frame: None = None
+        self.stack: List[Value] = []
+        self.call_stack: List[int] = []
+
+    def load_program(self, source_path: Union[str, BinaryIO, None]) -> Program:
+        """
+        Parse, decode and check the program and bind every instruction to its operation.
+        If the cache directory is set, the decoded program is taken from the cache when the same source was seen before.
+        :param source_path: string of the path to the XML file, binary stream or None for standard input
+        :return: loaded program, it can be run again by run() without parsing
+        """
+        cache: Optional[ProgramCache] = None
+        cache_key: Optional[str] = None
+        cached: Optional[Program] = None
+        source: Union[str, BinaryIO, None] = source_path
+        if self.cache_dir is not None:
+            cache: ProgramCache = ProgramCache(self.cache_dir, self.cache_size)
+            source, cache_key = self.__hash_source(source_path)
+            cached: Optional[Program] = cache.load(cache_key)
+
+        # the loaded program creates no reference cycles, collecting while it grows would only rescan it
+        gc_enabled: bool = gc.isenabled()
+        gc.disable()
+        try:
+            program: Program = cached or self.__decoder.decode(self.__xml_parser.parse_xml(source))
+        finally:
+            if gc_enabled:
+                gc.enable()
+        self.set_program(program)
+        # only programs which passed all the static checks are stored
+        if cache is not None and cached is None:
+            cache.store(cache_key, program)
+        return program
+
+    def set_program(self, program: Program) -> None:
+        """
+        Check the decoded program, optimize it, bind every instruction to its operation and reset the state.
+        The optimized program is a copy, the decoded program stays unchanged in self.program.
+        :param program: decoded program
+        """
+        self.program: Program = program
+        self.operation_list: List[Instruction] = program.instructions
+        self.label_dict: Dict[str, int] = program.label_dict
+        self.global_names: List[str] = program.global_names
+        self.local_names: List[str] = program.local_names
+        self.__check_operations()
+        if self.type_errors:
+            self.__report_type_errors()
+        if self.opt_level > 0:
+            self.__optimize()
+        # compiled regions would hide their instructions from the profiler
+        if self.opt_level >= 3 and not self.profile:
+            BlockCompiler(self.operation_list, self.handlers).install(self.handlers)
+        self.reset()
+
+    def __optimize(self) -> None:
+        """
+        Optimize the checked instructions by the passes of the optimization level and bind the optimized instructions.
+        """
+        optimizer: Optimizer = Optimizer(self.__op_factory.operations, self.opt_level)
+        self.operation_list, self.label_dict = optimizer.optimize(self.program.instructions)
+        self.handlers: List[Callable] = [self.__op_factory.optimized_operation(instruction.opcode).execute
+                                         for instruction in self.operation_list]
+        if self.opt_report:
+            optimizer.write_report(self.error, len(self.program.instructions), len(self.operation_list))
+
+    def __report_type_errors(self) -> None:
+        """
+        Print instructions of the decoded program which fail whenever they are executed, found by the type inference.
+        """
+        failures: List[Tuple[Instruction, str]] = TypeInference().diagnose(self.program.instructions)
+        print(f"Type errors: {len(failures)} instructions always fail", file=self.error)
+        for instruction, reason in failures:
+            print(f"{instruction.order:>8}  {instruction.opcode:<12}{reason}", file=self.error)
 
-    def interpret(self):
-        self.__parse_args()
-        self.operation_list: List[Dict[str, Union[Dict[str, str], str]]] = self.__xml_parser.parse_xml(self.source_path)
-        if self.input_path is not None:
-            self.__parse_input()
-        self.__register_labels()
-        self.__execute_operations()
+    @staticmethod
+    def __hash_source(source_path: Union[str, BinaryIO, None]) -> Tuple[Union[str, BinaryIO], str]:
+        """
+        Compute cache key of the source, streams are read to memory, so they can be parsed after hashing.
+        :param source_path: string of the path to the XML file, binary stream or None for standard input
+        :return: source to be parsed on cache miss and the cache key
+        """
+        if not isinstance(source_path, str):
+            source: BinaryIO = BytesIO((source_path or sys.stdin.buffer).read())
+            key: str = ProgramCache.key(source)
+            source.seek(0)
+            return source, key
+        try:
+            with open(source_path, 'rb') as file:
+                return source_path, ProgramCache.key(file)
+        except FileNotFoundError:
+            exit_with_code(11, "Error: Source file does not exist.")
+        except PermissionError:
+            exit_with_code(11, "Error: Source file is not readable.")
 
     def __parse_args(self) -> None:
         if '-h' in sys.argv[1:] or '--help' in sys.argv[1:]:
             if len(sys.argv) > 2:
                 exit_with_code(10, "Error: Wrong number of arguments.")
-        self.__arg_parser.description = "Python script for interpreting XML file which is generated from IPPcode23."
-        self.__arg_parser.add_argument('--source', type=str, metavar='<file>', help="Specify the source file.")
-        self.__arg_parser.add_argument('--input', type=str, metavar='<file>', help="Specify the input file.")
+        arg_parser: ArgumentParser = ArgumentParser()
+        arg_parser.description = "Python script for interpreting XML file which is generated from IPPcode23."
+        arg_parser.add_argument('--source', type=str, metavar='<file>', help="Specify the source file.")
+        arg_parser.add_argument('--input', type=str, metavar='<file>', help="Specify the input file.")
+        arg_parser.add_argument('--output-buffer', type=int, metavar='<size>', default=DEFAULT_BUFFER_SIZE,
+                                help="Size of the output buffer in characters, 0 disables buffering.")
+        arg_parser.add_argument('--input-mmap', action='store_true',
+                                help="Read the input file through a memory map instead of a buffered stream.")
+        arg_parser.add_argument('--cache-dir', type=str, metavar='<dir>',
+                                help="Directory for caching decoded programs between runs.")
+        arg_parser.add_argument('--cache-size', type=int, metavar='<size>', default=DEFAULT_CACHE_SIZE,
+                                help="Maximal size of the program cache in bytes.")
+        arg_parser.add_argument('--profile', action='store_true',
+                                help="Measure executed instructions and print the profile to standard error output.")
+        arg_parser.add_argument('--profile-output', type=str, metavar='<file>',
+                                help="Measure executed instructions and write the profile to the JSON file.")
+        arg_parser.add_argument('--profile-folded', type=str, metavar='<file>',
+                                help="Measure executed instructions and write call stacks for flame graph tools.")
+        arg_parser.add_argument('--opt-level', type=int, metavar='<level>', default=DEFAULT_OPT_LEVEL,
+                                help=f"Optimization level from 0 to {MAX_OPT_LEVEL}, 0 disables the optimizer.")
+        arg_parser.add_argument('--opt-report', action='store_true',
+                                help="Print the optimizations of the program to standard error output.")
+        arg_parser.add_argument('--type-errors', action='store_true',
+                                help="Print instructions which always fail to standard error output.")
+        arg_parser.add_argument('--input-glob', type=str, metavar='<pattern>',
+                                help="Run the program for every input file matching the pattern.")
+        arg_parser.add_argument('--input-list', type=str, metavar='<file>',
+                                help="Run the program for every input file listed in the file, one per line.")
+        arg_parser.add_argument('--results-dir', type=str, metavar='<dir>',
+                                help="Write output, errors and return code of every input to the directory.")
+        arg_parser.add_argument('--jobs', type=int, metavar='<count>', default=DEFAULT_JOBS,
+                                help="Number of processes running the inputs in parallel.")
 
-        args = self.__arg_parser.parse_args()
+        args = arg_parser.parse_args()
 
-        if not args.source and not args.input:
+        if not args.source and not args.input and not args.input_glob and not args.input_list:
             print("Error: At least one of --source or --input must be specified.")
-            self.__arg_parser.print_help()
+            arg_parser.print_help()
             sys.exit(10)
 
         if args.source:
@@ -70,46 +311,159 @@ class Interpret(metaclass=Singleton):
         if args.input:
             self.input_path: str = args.input
 
-    def __register_labels(self) -> None:
-        op_cnt: int = 0
-        for op in self.operation_list:
-            if op['opcode'] == 'LABEL':
-                label_name: int = self.label_dict.get(op['arg1']['value'])
-                if label_name is not None:
-                    exit_with_code(52, "Error: Label already exists.")
-                self.label_dict[op['arg1']['value']] = op_cnt
-            op_cnt += 1
+        if args.output_buffer < 0:
+            exit_with_code(10, "Error: Output buffer size must not be negative.")
+        self.output_buffer_size: int = args.output_buffer
+        self.input_mmap: bool = args.input_mmap
+        if args.cache_size < 0:
+            exit_with_code(10, "Error: Cache size must not be negative.")
+        self.cache_dir: Optional[str] = args.cache_dir
+        self.cache_size: int = args.cache_size
+        self.profile: bool = args.profile or args.profile_output is not None or args.profile_folded is not None
+        self.profile_output: Optional[str] = args.profile_output
+        self.profile_folded: Optional[str] = args.profile_folded
+        if not 0 <= args.opt_level <= MAX_OPT_LEVEL:
+            exit_with_code(10, f"Error: Optimization level must be from 0 to {MAX_OPT_LEVEL}.")
+        self.opt_level: int = args.opt_level
+        self.opt_report: bool = args.opt_report
+        self.type_errors: bool = args.type_errors
+
+        if args.input_glob or args.input_list:
+            if args.input or (args.input_glob and args.input_list):
+                exit_with_code(10, "Error: Only one of --input, --input-glob or --input-list can be specified.")
+            if args.jobs < 1:
+                exit_with_code(10, "Error: Number of jobs must be positive.")
+            self.input_paths: List[str] = expand_inputs(args.input_glob, args.input_list)
+            self.results_dir: Optional[str] = args.results_dir
+            self.jobs: int = args.jobs
+        elif args.results_dir:
+            exit_with_code(10, "Error: --results-dir requires --input-glob or --input-list.")
+
+    def __check_operations(self) -> None:
+        """
+        Statically check opcodes and arguments of all operations, so they don't have to be checked when executed.
+        Execute method of each operation is stored to the handler list, which is parallel to the operation list.
+        """
+        self.handlers: List[Callable] = []
+        for instruction in self.operation_list:
+            operation: Operation = self.__op_factory.create_operation(instruction.opcode)
+            operation.check_args(instruction)
+            self.handlers.append(operation.execute)
 
     def __parse_input(self) -> None:
         try:
-            with open(self.input_path, 'r') as file:
-                self.input_lines = file.readlines()
+            self.input_source: LineSource = open_line_source(self.input_path, self.input_mmap)
         except FileNotFoundError:
             exit_with_code(11, "Error: Input file does not exist.")
         except PermissionError:
             exit_with_code(11, "Error: Input file is not readable.")
 
-    def __execute_operations(self) -> None:
-        while self.op_cnt < len(self.operation_list):
-            operation: Operation = self.__op_factory.create_operation(self.operation_list[self.op_cnt]['opcode'])
-            operation.check_args(self.operation_list[self.op_cnt])
-            operation.execute(self)
+    def execute_operations(self) -> None:
+        handlers: List[Callable] = self.handlers
+        op_total: int = len(handlers)
+        while self.op_cnt < op_total:
+            handlers[self.op_cnt](self)
+
+    def execute_operations_profiled(self, profiler: Profiler) -> None:
+        """
+        Execute operations same as execute_operations() and measure every executed instruction.
+        The measuring is done only by this separate loop, so the normal loop doesn't pay anything for it.
+        Labels called by CALL are tracked as a stack, which is changed whenever the call stack grows or shrinks.
+        :param profiler: profiler for the counts and times
+        """
+        handlers: List[Callable] = self.handlers
+        counts: List[int] = profiler.counts
+        times: List[float] = profiler.times
+        edges: Dict[Tuple[int, int], int] = profiler.edges
+        clock: Callable[[], float] = time.perf_counter
+        path: Tuple[str, ...] = (ROOT,)
+        path_totals: List[Union[float, int]] = profiler.path_totals(path)
+        call_depth: int = len(self.call_stack)
+        op_total: int = len(handlers)
+        while self.op_cnt < op_total:
+            op_cnt: int = self.op_cnt
+            start: float = clock()
+            try:
+                handlers[op_cnt](self)
+            finally:
+                elapsed: float = clock() - start
+                times[op_cnt] += elapsed
+                counts[op_cnt] += 1
+                path_totals[0] += elapsed
+                path_totals[1] += 1
+            if self.op_cnt <= op_cnt:
+                edge: Tuple[int, int] = (op_cnt, self.op_cnt)
+                edges[edge] = edges.get(edge, 0) + 1
+            if len(self.call_stack) != call_depth:
+                if len(self.call_stack) > call_depth:
+                    label: str = profiler.call_label(self.operation_list[op_cnt])
+                    profiler.calls[label] = profiler.calls.get(label, 0) + 1
+                    path: Tuple[str, ...] = path + (label,)
+                else:
+                    path: Tuple[str, ...] = path[:-1]
+                call_depth: int = len(self.call_stack)
+                path_totals: List[Union[float, int]] = profiler.path_totals(path)
+
+    def __write_profile(self, profiler: Profiler) -> None:
+        try:
+            if self.profile_folded is not None:
+                with open(self.profile_folded, 'w') as file:
+                    profiler.write_folded(file)
+            if self.profile_output is not None:
+                with open(self.profile_output, 'w') as file:
+                    profiler.write_json(file)
+            elif self.profile_folded is None:
+                profiler.write_report(sys.stderr)
+        except OSError:
+            exit_with_code(12, "Error: Profile can't be written.")
+
 
+class XMLParser:
+    ARG_TAGS: Tuple[str, str, str] = ('arg1', 'arg2', 'arg3')
+    CHUNK_SIZE: int = 65536
 
-class XMLParser(metaclass=Singleton):
-    def parse_xml(self, source_path: str) -> List[Dict[str, Union[Dict[str, str], str]]]:
+    def parse_xml(self, source_path: Union[str, BinaryIO, None]) \
+            -> Iterator[Dict[str, Union[Tuple[str, Optional[str]], str, int]]]:
         """
-        Go through the XML element tree, check if the XML file is well-formed and return the list of operations.
-        :param source_path: string of the path to the XML file
-        :return: list of operations
+        Go through the XML file incrementally, check if it is well-formed and yield the operations in document order.
+        The file is fed to the parser in chunks, instructions completed so far are processed and removed from the root,
+        so the whole element tree is never held in memory.
+        :param source_path: string of the path to the XML file, binary stream or None for standard input
+        :return: iterator of operations
         """
         try:
-            if source_path is not None:
-                tree: ElementTree = ElementTree.parse(source_path)
-                root: Element = tree.getroot()
+            if isinstance(source_path, str):
+                source: BinaryIO = open(source_path, 'rb')
             else:
-                stdin: AnyStr = sys.stdin.read()
-                root: Element = ElementTree.fromstring(stdin)
+                source: BinaryIO = source_path if source_path is not None else sys.stdin.buffer
+            # the file opened here is closed even when parsing fails or the iterator is not exhausted
+            try:
+                # only start events are reported, the first one is the root element
+                parser: ElementTree.XMLPullParser = ElementTree.XMLPullParser(events=('start',))
+                root: Union[Element, None] = None
+                while True:
+                    chunk: bytes = source.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    parser.feed(chunk)
+                    for event, child in parser.read_events():
+                        if root is None:
+                            root: Element = child
+                    # the last child of the root may not be complete yet
+                    if root is not None and len(root) > 1:
+                        completed: List[Element] = root[:-1]
+                        del root[:-1]
+                        for child in completed:
+                            yield self.__parse_instruction(child)
+                parser.close()
+                for event, child in parser.read_events():
+                    if root is None:
+                        root: Element = child
+                for child in root:
+                    yield self.__parse_instruction(child)
+            finally:
+                if isinstance(source_path, str):
+                    source.close()
         except ElementTree.ParseError:
             exit_with_code(31, "Error: XML file is not well-formed.")
         except FileNotFoundError:
@@ -117,31 +471,26 @@ class XMLParser(metaclass=Singleton):
         except PermissionError:
             exit_with_code(11, "Error: Source file is not readable.")
 
-        op_dict: Dict = {}
-        for child in root:
-            opcode: str = child.attrib.get('opcode')
-            order: str = child.attrib.get('order')
-            if opcode is None or order is None:
-                exit_with_code(32, "Error: XML file is not well-formed.")
-            order: str = order.strip()
-            if child.tag != 'instruction':
-                exit_with_code(32, "Error: XML file is not well-formed.")
-            if order in op_dict.keys():
-                exit_with_code(32, "Error: XML file is not well-formed.")
-            if not order.isdecimal() or int(order) <= 0:
+    def __parse_instruction(self, child: Element) -> Dict[str, Union[Tuple[str, Optional[str]], str, int]]:
+        """
+        Check the instruction element and its arguments.
+        :param child: instruction element
+        :return: operation, arguments are pairs of type and text
+        """
+        opcode: str = child.get('opcode')
+        order: str = child.get('order')
+        if opcode is None or order is None:
+            exit_with_code(32, "Error: XML file is not well-formed.")
+        order: str = order.strip()
+        if child.tag != 'instruction':
+            exit_with_code(32, "Error: XML file is not well-formed.")
+        if not order.isdecimal() or int(order) <= 0:
+            exit_with_code(32, "Error: XML file is not well-formed.")
+        operation: Dict[str, Union[Tuple[str, Optional[str]], str, int]] = {"opcode": opcode, "order": int(order)}
+
+        for child2 in child:
+            arg_type: Optional[str] = child2.get('type')
+            if arg_type is None or child2.tag not in self.ARG_TAGS or child2.tag in operation:
                 exit_with_code(32, "Error: XML file is not well-formed.")
-            op_dict[order]: Dict[str, str] = {"opcode": opcode}
-
-            for child2 in child:
-                arg_type = child2.attrib.get('type')
-                if arg_type is None:
-                    exit_with_code(32, "Error: XML file is not well-formed.")
-                if re.match(r'^arg[1-3]$', child2.tag) is None:
-                    exit_with_code(32, "Error: XML file is not well-formed.")
-                if child2.tag in op_dict[order].keys():
-                    exit_with_code(32, "Error: XML file is not well-formed.")
-                arg: Dict[str, str] = {"type": arg_type, "value": child2.text}
-                op_dict[order][child2.tag]: Dict[str, Dict[str, str] | str] = arg
-        # sort the dictionary by the order of the operations
-        op_dict: Dict[str, Dict[str, str] | str] = {key: value for key, value in sorted(op_dict.items(), key=lambda item: int(item[0]))}
-        return list(op_dict.values())
+            operation[child2.tag] = (arg_type, child2.text)
+        return operation
@@ -1,3 +1,4 @@
+from typing import Optional
 from lib.operations import *
 
 
@@ -42,7 +43,60 @@ class OperationFactory:
             "JUMPIFNEQ": Jumpifneq(),
             "EXIT": Exit(),
             "DPRINT": Dprint(),
-            "BREAK": Break()
+            "BREAK": Break(),
+            "CLEARS": Clears(),
+            "ADDS": Adds(),
+            "SUBS": Subs(),
+            "MULS": Muls(),
+            "IDIVS": IDivs(),
+            "LTS": Lts(),
+            "GTS": Gts(),
+            "EQS": Eqs(),
+            "ANDS": Ands(),
+            "ORS": Ors(),
+            "NOTS": Nots(),
+            "INT2CHARS": Int2chars(),
+            "STRI2INTS": Stri2ints(),
+            "JUMPIFEQS": Jumpifeqs(),
+            "JUMPIFNEQS": Jumpifneqs()
+        }
+        # superinstructions created by the peephole optimizer, they can't be used in the XML program
+        self.fused_operations: Dict[str, Operation] = {
+            "LT+JUMPIF": LtJumpif(),
+            "GT+JUMPIF": GtJumpif(),
+            "EQ+JUMPIF": EqJumpif(),
+            "DEFVAR+MOVE": DefvarMove(),
+            "PUSHS+POPS": PushsPops(),
+            "CREATEFRAME+PUSHFRAME+CALL": CreateframeCall(),
+            "PUSHFRAME+CALL": PushframeCall()
+        }
+        # typed variants chosen by the type inference, they don't check initialization and types of the operands
+        self.typed_operations: Dict[str, Operation] = {
+            "ADD:typed": AddTyped(),
+            "SUB:typed": SubTyped(),
+            "MUL:typed": MulTyped(),
+            "IDIV:typed": IDivTyped(),
+            "LT:typed": LtTyped(),
+            "GT:typed": GtTyped(),
+            "EQ:typed": EqTyped(),
+            "AND:typed": AndTyped(),
+            "OR:typed": OrTyped(),
+            "NOT:typed": NotTyped(),
+            "CONCAT:typed": ConcatTyped(),
+            "STRLEN:typed": StrlenTyped(),
+            "JUMPIFEQ:typed": JumpifeqTyped(),
+            "JUMPIFNEQ:typed": JumpifneqTyped(),
+            "LT+JUMPIF:typed": LtJumpifTyped(),
+            "GT+JUMPIF:typed": GtJumpifTyped(),
+            "EQ+JUMPIF:typed": EqJumpifTyped()
+        }
+        # variants chosen by the string buffer pass, they accept a string buffer in the built or read variable
+        self.buffered_operations: Dict[str, Operation] = {
+            "CONCAT:buffer": ConcatBuffered(),
+            "SETCHAR:buffer": SetcharBuffered(),
+            "STRLEN:buffer": StrlenBuffered(),
+            "GETCHAR:buffer": GetcharBuffered(),
+            "MATERIALIZE": Materialize()
         }
 
     def create_operation(self, operation: str) -> Operation:
@@ -50,3 +104,14 @@ class OperationFactory:
         if operation is None:
             exit_with_code(32, "Error: Unknown operation.")
         return operation
+
+    def optimized_operation(self, opcode: str) -> Operation:
+        """
+        Get operation of an instruction of the optimized program, it is checked operation, superinstruction,
+        typed or buffered variant.
+        :param opcode: opcode of the instruction
+        :return: operation
+        """
+        operation: Optional[Operation] = self.fused_operations.get(opcode) or self.typed_operations.get(opcode) or \
+            self.buffered_operations.get(opcode)
+        return operation if operation is not None else self.operations[opcode]
@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
 from lib.utils import *
-import sys
-from typing import Dict
+from lib.program import Var, Const, LabelRef, Instruction
+from lib.frame import Frame, FramePool
+from lib.values import Value, NIL, StringBuffer, type_name, buffer_concat, buffer_setchar
+from lib.errors import ProgramExit
+from typing import Dict, List
 
 
 class Operation(ABC):
@@ -10,31 +13,33 @@ class Operation(ABC):
         pass
 
     @abstractmethod
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         pass
 
 
 class Move(Operation):
     def execute(self, context) -> None:
-        data: Dict[str, Dict[str, str]] = context.operation_list[context.op_cnt]
-        arg1: List[str] = data['arg1']['value'].strip().split('@')
-        arg2: Dict[str, str] = data['arg2']
-        val, val_type = get_symb_value(arg2, context)
-        if val_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        arg1: Var = data.arg1
+        arg2: Union[Var, Const] = data.arg2
+        val: Value = get_symb_value(arg2, context)
+        if val is None:
             exit_with_code(56, "Error: Variable not initialized.")
-        store_val_to_var(arg1, val, val_type, context)
+        store_val_to_var(arg1, val, context)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 2)
 
 
 class Createframe(Operation):
     def execute(self, context) -> None:
-        context.tmp_frame = {}
+        frame_pool: FramePool = context.frame_pool
+        frame_pool.release(context.tmp_frame)
+        context.tmp_frame = frame_pool.acquire(context.operation_list[context.op_cnt].frame_size)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 0)
 
 
@@ -46,7 +51,7 @@ class Pushframe(Operation):
         context.tmp_frame = None
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 0)
 
 
@@ -54,49 +59,37 @@ class Popframe(Operation):
     def execute(self, context) -> None:
         if len(context.local_frame) == 0:
             exit_with_code(55, "Error: No frame to pop.")
+        context.frame_pool.release(context.tmp_frame)
         context.tmp_frame = context.local_frame.pop()
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 0)
 
 
 class Defvar(Operation):
     def execute(self, context) -> None:
-        data: Dict[str, Dict[str, str]] = context.operation_list[context.op_cnt]
-        var: Dict[str, None] = {'type': None, 'value': None}
-        arg: List[str] = data['arg1']['value'].strip().split('@')
-        if arg[0] == 'GF':
-            if arg[1] in context.global_frame.keys():
-                exit_with_code(52, "Error: Variable already defined.")
-            context.global_frame[arg[1]] = var
-        elif arg[0] == 'LF':
-            if len(context.local_frame) == 0:
-                exit_with_code(55, "Error: No local frame.")
-            if arg[1] in context.local_frame[-1].keys():
-                exit_with_code(52, "Error: Variable already defined.")
-            context.local_frame[-1][arg[1]] = var
-        elif arg[0] == 'TF':
-            if context.tmp_frame is None:
-                exit_with_code(55, "Error: No temporary frame.")
-            if arg[1] in context.tmp_frame.keys():
-                exit_with_code(52, "Error: Variable already defined.")
-            context.tmp_frame[arg[1]] = var
-        context.op_cnt += 1
-
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        arg: Var = data.arg1
+        frame: Frame = get_frame(arg, context)
+        if not frame.define(arg.slot):
+            exit_with_code(52, "Error: Variable already defined.")
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 1)
 
 
 class Call(Operation):
     def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
         context.call_stack.append(context.op_cnt)
-        label_name: str = context.operation_list[context.op_cnt]['arg1']['value']
-        if label_name not in context.label_dict.keys():
+        label: LabelRef = data.arg1
+        if label.target is None:
             exit_with_code(52, "Error: Label does not exist.")
-        context.op_cnt = context.label_dict[label_name]
+        context.op_cnt = label.target
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 1)
 
 
@@ -106,416 +99,420 @@ class Return(Operation):
             exit_with_code(56, "Error: No function to return.")
         context.op_cnt = context.call_stack.pop() + 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 0)
 
 
 class Pushs(Operation):
     def execute(self, context) -> None:
-        symb_val, symb_type = get_symb_value(context.operation_list[context.op_cnt]['arg1'], context)
-        if symb_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        symb_val: Value = get_symb_value(data.arg1, context)
+        if symb_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        context.stack.append({'type': symb_type, 'value': symb_val})
+        context.stack.append(symb_val)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 1)
 
 
 class Pops(Operation):
     def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
         if len(context.stack) == 0:
             exit_with_code(56, "Error: No data to pop.")
-        data: Dict[str, Union[str, int, bool]] = context.stack.pop()
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].split('@')
-        store_val_to_var(var, data['value'], data['type'], context)
+        var: Var = data.arg1
+        store_val_to_var(var, context.stack.pop(), context)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 1)
 
 
 class Add(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].split('@')
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb2: Dict[str, str] = context.operation_list[context.op_cnt]['arg3']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        symb2_val, symb2_type = get_symb_value(symb2, context)
-        if symb1_type is None or symb2_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb2: Union[Var, Const] = data.arg3
+        symb1_val: Value = get_symb_value(symb1, context)
+        symb2_val: Value = get_symb_value(symb2, context)
+        if symb1_val is None or symb2_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != 'int' or symb2_type != 'int':
+        if type(symb1_val) is not int or type(symb2_val) is not int:
             exit_with_code(53, "Error: Wrong types.")
-        store_val_to_var(var, symb1_val + symb2_val, 'int', context)
+        store_val_to_var(var, symb1_val + symb2_val, context)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 3)
 
 
 class Sub(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].strip().split('@')
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb2: Dict[str, str] = context.operation_list[context.op_cnt]['arg3']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        symb2_val, symb2_type = get_symb_value(symb2, context)
-        if symb1_type is None or symb2_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb2: Union[Var, Const] = data.arg3
+        symb1_val: Value = get_symb_value(symb1, context)
+        symb2_val: Value = get_symb_value(symb2, context)
+        if symb1_val is None or symb2_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != 'int' or symb2_type != 'int':
+        if type(symb1_val) is not int or type(symb2_val) is not int:
             exit_with_code(53, "Error: Wrong types.")
-        store_val_to_var(var, symb1_val - symb2_val, 'int', context)
+        store_val_to_var(var, symb1_val - symb2_val, context)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 3)
 
 
 class Mul(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].strip().split('@')
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb2: Dict[str, str] = context.operation_list[context.op_cnt]['arg3']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        symb2_val, symb2_type = get_symb_value(symb2, context)
-        if symb1_type is None or symb2_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb2: Union[Var, Const] = data.arg3
+        symb1_val: Value = get_symb_value(symb1, context)
+        symb2_val: Value = get_symb_value(symb2, context)
+        if symb1_val is None or symb2_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != 'int' or symb2_type != 'int':
+        if type(symb1_val) is not int or type(symb2_val) is not int:
             exit_with_code(53, "Error: Wrong types.")
-        store_val_to_var(var, symb1_val * symb2_val, 'int', context)
+        store_val_to_var(var, symb1_val * symb2_val, context)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 3)
 
 
 class IDiv(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].strip().split('@')
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb2: Dict[str, str] = context.operation_list[context.op_cnt]['arg3']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        symb2_val, symb2_type = get_symb_value(symb2, context)
-        if symb1_type is None or symb2_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb2: Union[Var, Const] = data.arg3
+        symb1_val: Value = get_symb_value(symb1, context)
+        symb2_val: Value = get_symb_value(symb2, context)
+        if symb1_val is None or symb2_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != 'int' or symb2_type != 'int':
+        if type(symb1_val) is not int or type(symb2_val) is not int:
             exit_with_code(53, "Error: Wrong types.")
         if symb2_val == 0:
             exit_with_code(57, "Error: Division by zero.")
-        store_val_to_var(var, symb1_val // symb2_val, 'int', context)
+        store_val_to_var(var, symb1_val // symb2_val, context)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 3)
 
 
 class Lt(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].strip().split('@')
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb2: Dict[str, str] = context.operation_list[context.op_cnt]['arg3']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        symb2_val, symb2_type = get_symb_value(symb2, context)
-        if symb1_type is None or symb2_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb2: Union[Var, Const] = data.arg3
+        symb1_val: Value = get_symb_value(symb1, context)
+        symb2_val: Value = get_symb_value(symb2, context)
+        if symb1_val is None or symb2_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != symb2_type or symb1_type == 'nil':
+        if type(symb1_val) is not type(symb2_val) or symb1_val is NIL:
             exit_with_code(53, "Error: Wrong types.")
-        store_val_to_var(var, symb1_val < symb2_val, 'bool', context)
+        store_val_to_var(var, symb1_val < symb2_val, context)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 3)
 
 
 class Gt(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].strip().split('@')
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb2: Dict[str, str] = context.operation_list[context.op_cnt]['arg3']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        symb2_val, symb2_type = get_symb_value(symb2, context)
-        if symb1_type is None or symb2_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb2: Union[Var, Const] = data.arg3
+        symb1_val: Value = get_symb_value(symb1, context)
+        symb2_val: Value = get_symb_value(symb2, context)
+        if symb1_val is None or symb2_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != symb2_type or symb1_type == 'nil':
+        if type(symb1_val) is not type(symb2_val) or symb1_val is NIL:
             exit_with_code(53, "Error: Wrong types.")
-        store_val_to_var(var, symb1_val > symb2_val, 'bool', context)
+        store_val_to_var(var, symb1_val > symb2_val, context)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 3)
 
 
 class Eq(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].strip().split('@')
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb2: Dict[str, str] = context.operation_list[context.op_cnt]['arg3']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        symb2_val, symb2_type = get_symb_value(symb2, context)
-        if symb1_type is None or symb2_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb2: Union[Var, Const] = data.arg3
+        symb1_val: Value = get_symb_value(symb1, context)
+        symb2_val: Value = get_symb_value(symb2, context)
+        if symb1_val is None or symb2_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != symb2_type and symb1_type != 'nil' and symb2_type != 'nil':
+        if type(symb1_val) is not type(symb2_val) and symb1_val is not NIL and symb2_val is not NIL:
             exit_with_code(53, "Error: Wrong types.")
-        store_val_to_var(var, symb1_val == symb2_val, 'bool', context)
+        store_val_to_var(var, symb1_val == symb2_val, context)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 3)
 
 
 class And(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].strip().split('@')
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb2: Dict[str, str] = context.operation_list[context.op_cnt]['arg3']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        symb2_val, symb2_type = get_symb_value(symb2, context)
-        if symb1_type is None or symb2_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb2: Union[Var, Const] = data.arg3
+        symb1_val: Value = get_symb_value(symb1, context)
+        symb2_val: Value = get_symb_value(symb2, context)
+        if symb1_val is None or symb2_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != 'bool' or symb2_type != 'bool':
+        if type(symb1_val) is not bool or type(symb2_val) is not bool:
             exit_with_code(53, "Error: Wrong types.")
-        store_val_to_var(var, symb1_val and symb2_val, 'bool', context)
+        store_val_to_var(var, symb1_val and symb2_val, context)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 3)
 
 
 class Or(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].strip().split('@')
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb2: Dict[str, str] = context.operation_list[context.op_cnt]['arg3']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        symb2_val, symb2_type = get_symb_value(symb2, context)
-        if symb1_type is None or symb2_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb2: Union[Var, Const] = data.arg3
+        symb1_val: Value = get_symb_value(symb1, context)
+        symb2_val: Value = get_symb_value(symb2, context)
+        if symb1_val is None or symb2_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != 'bool' or symb2_type != 'bool':
+        if type(symb1_val) is not bool or type(symb2_val) is not bool:
             exit_with_code(53, "Error: Wrong types.")
-        store_val_to_var(var, symb1_val or symb2_val, 'bool', context)
+        store_val_to_var(var, symb1_val or symb2_val, context)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 3)
 
 
 class Not(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].strip().split('@')
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        if symb1_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb1_val: Value = get_symb_value(symb1, context)
+        if symb1_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != 'bool':
+        if type(symb1_val) is not bool:
             exit_with_code(53, "Error: Wrong types.")
-        store_val_to_var(var, not symb1_val, 'bool', context)
+        store_val_to_var(var, not symb1_val, context)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 2)
 
 
 class Int2char(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].strip().split('@')
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        if symb1_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb1_val: Value = get_symb_value(symb1, context)
+        if symb1_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != 'int':
+        if type(symb1_val) is not int:
             exit_with_code(53, "Error: Wrong types.")
         try:
-            store_val_to_var(var, chr(symb1_val), 'string', context)
+            store_val_to_var(var, chr(symb1_val), context)
         except ValueError:
             exit_with_code(58, "Error: Wrong value.")
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 2)
 
 
 class Stri2char(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].strip().split('@')
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb2: Dict[str, str] = context.operation_list[context.op_cnt]['arg3']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        symb2_val, symb2_type = get_symb_value(symb2, context)
-        if symb1_type is None or symb2_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb2: Union[Var, Const] = data.arg3
+        symb1_val: Value = get_symb_value(symb1, context)
+        symb2_val: Value = get_symb_value(symb2, context)
+        if symb1_val is None or symb2_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != 'string' or symb2_type != 'int':
+        if type(symb1_val) is not str or type(symb2_val) is not int:
             exit_with_code(53, "Error: Wrong types.")
         if symb2_val < 0 or symb2_val >= len(symb1_val):
             exit_with_code(58, "Error: Wrong value.")
         try:
-            store_val_to_var(var, ord(symb1_val[symb2_val]), 'int', context)
+            store_val_to_var(var, ord(symb1_val[symb2_val]), context)
         except IndexError:
             exit_with_code(58, "Error: Wrong value.")
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 3)
 
 
 class Read(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].strip().split('@')
-        val_type: str = context.operation_list[context.op_cnt]['arg2']['value']
-        input_val: None = None
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        val_type: str = data.arg2.value
+        input_val: Union[Value, None] = None
         if val_type not in ['int', 'bool', 'string', 'nil']:
             exit_with_code(32, "Error: Wrong type of second operand.")
-        if context.input_path is None:
-            try:
-                input_val: str = input()
-            except EOFError:
-                input_val: str = 'nil'
-                val_type: str = 'nil'
-        else:
-            if context.input_line < len(context.input_lines):
-                input_val: str = context.input_lines[context.input_line]
-                input_val: str = input_val.replace('\n', '')
-                context.input_line += 1
-            else:
-                input_val: str = 'nil'
-                val_type: str = 'nil'
-
-        if val_type == 'int' and input_val is not None:
+        input_val: Union[str, None] = context.input_source.read_line()
+        if input_val is None:
+            val_type: str = 'nil'
+
+        if val_type == 'int':
             try:
-                input_val: int = int(input_val)
+                input_val: Value = int(input_val)
             except ValueError:
-                val_type: str = 'nil'
-                input_val: str = 'nil'
-        elif val_type == 'bool' and input_val is not None:
-            if input_val.lower() == 'true':
-                input_val: bool = True
-            else:
-                input_val: bool = False
-        elif val_type == 'string':
-            input_val: str = str(input_val)
-        store_val_to_var(var, input_val, val_type, context)
-        context.op_cnt += 1
-
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+                input_val: Value = NIL
+        elif val_type == 'bool':
+            input_val: Value = input_val.lower() == 'true'
+        elif val_type == 'nil':
+            input_val: Value = NIL
+        store_val_to_var(var, input_val, context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 2)
 
 
 class Write(Operation):
     def execute(self, context) -> None:
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg1']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        if symb1_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        symb1: Union[Var, Const] = data.arg1
+        symb1_val: Value = get_symb_value(symb1, context)
+        if symb1_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type == 'bool':
-            if symb1_val:
-                string_to_print: str = 'true'
-            else:
-                string_to_print: str = 'false'
-        elif symb1_type == 'nil':
+        if symb1_val is True:
+            string_to_print: str = 'true'
+        elif symb1_val is False:
+            string_to_print: str = 'false'
+        elif symb1_val is NIL:
             string_to_print: str = ''
         else:
-            string_to_print: str = symb1_val
-        print(string_to_print, end='')
+            string_to_print: str = str(symb1_val)
+        context.output.write(string_to_print)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 1)
 
 
 class Concat(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].strip().split('@')
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb2: Dict[str, str] = context.operation_list[context.op_cnt]['arg3']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        symb2_val, symb2_type = get_symb_value(symb2, context)
-        if symb1_type is None or symb2_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb2: Union[Var, Const] = data.arg3
+        symb1_val: Value = get_symb_value(symb1, context)
+        symb2_val: Value = get_symb_value(symb2, context)
+        if symb1_val is None or symb2_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != 'string' or symb2_type != 'string':
+        if type(symb1_val) is not str or type(symb2_val) is not str:
             exit_with_code(53, "Error: Wrong types.")
-        store_val_to_var(var, symb1_val + symb2_val, 'string', context)
+        store_val_to_var(var, symb1_val + symb2_val, context)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 3)
 
 
 class Strlen(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].strip().split('@')
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        if symb1_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb1_val: Value = get_symb_value(symb1, context)
+        if symb1_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type is None:
+        if symb1_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != 'string':
+        if type(symb1_val) is not str:
             exit_with_code(53, "Error: Wrong types.")
-        store_val_to_var(var, len(symb1_val), 'int', context)
+        store_val_to_var(var, len(symb1_val), context)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 2)
 
 
 class Getchar(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].strip().split('@')
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb2: Dict[str, str] = context.operation_list[context.op_cnt]['arg3']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        symb2_val, symb2_type = get_symb_value(symb2, context)
-        if symb1_type is None or symb2_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb2: Union[Var, Const] = data.arg3
+        symb1_val: Value = get_symb_value(symb1, context)
+        symb2_val: Value = get_symb_value(symb2, context)
+        if symb1_val is None or symb2_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != 'string' or symb2_type != 'int':
+        if type(symb1_val) is not str or type(symb2_val) is not int:
             exit_with_code(53, "Error: Wrong types.")
         if symb2_val < 0 or symb2_val >= len(symb1_val):
             exit_with_code(58, "Error: Wrong value.")
         try:
-            store_val_to_var(var, symb1_val[symb2_val], 'string', context)
+            store_val_to_var(var, symb1_val[symb2_val], context)
         except IndexError:
             exit_with_code(58, "Error: Wrong value.")
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 3)
 
 
 class Setchar(Operation):
     def execute(self, context) -> None:
-        var: Dict[str, str] = context.operation_list[context.op_cnt]['arg1']
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb2: Dict[str, str] = context.operation_list[context.op_cnt]['arg3']
-        var_val, var_type = get_symb_value(var, context)
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        symb2_val, symb2_type = get_symb_value(symb2, context)
-        if var_type is None or symb1_type is None or symb2_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb2: Union[Var, Const] = data.arg3
+        var_val: Value = get_symb_value(var, context)
+        symb1_val: Value = get_symb_value(symb1, context)
+        symb2_val: Value = get_symb_value(symb2, context)
+        if var_val is None or symb1_val is None or symb2_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if var_type != 'string' or symb1_type != 'int' or symb2_type != 'string':
+        if type(var_val) is not str or type(symb1_val) is not int or type(symb2_val) is not str:
             exit_with_code(53, "Error: Wrong types.")
         if symb1_val < 0 or symb1_val > len(var_val)-1 or len(symb2_val) == 0:
             exit_with_code(58, "Error: Wrong value.")
         try:
-            store_val_to_var(var['value'].split('@'), f'{var_val[:symb1_val]}{symb2_val[:len(var_val)-symb1_val]}{var_val[symb1_val+len(symb2_val)::]}', 'string', context)
+            store_val_to_var(var, f'{var_val[:symb1_val]}{symb2_val[:len(var_val)-symb1_val]}{var_val[symb1_val+len(symb2_val)::]}', context)
         except IndexError:
             exit_with_code(58, "Error: Wrong value.")
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 3)
 
 
 class Type(Operation):
     def execute(self, context) -> None:
-        var: List[str] = context.operation_list[context.op_cnt]['arg1']['value'].strip().split('@')
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        if symb1_type is None:
-            store_val_to_var(var, '', 'string', context)
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb1_val: Value = get_symb_value(symb1, context)
+        if symb1_val is None:
+            store_val_to_var(var, '', context)
         else:
-            store_val_to_var(var, symb1_type, 'string', context)
+            store_val_to_var(var, type_name(symb1_val), context)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 2)
 
 
@@ -523,104 +520,833 @@ class Label(Operation):
     def execute(self, context) -> None:
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 1)
 
 
 class Jump(Operation):
     def execute(self, context) -> None:
-        label: str = context.operation_list[context.op_cnt]['arg1']['value']
-        if context.label_dict.get(label) is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        label: LabelRef = data.arg1
+        if label.target is None:
             exit_with_code(52, "Error: Label does not exist.")
-        context.op_cnt = context.label_dict[label]
+        context.op_cnt = label.target
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 1)
 
 
 class Jumpifeq(Operation):
     def execute(self, context) -> None:
-        label = context.operation_list[context.op_cnt]['arg1']['value']
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb2: Dict[str, str] = context.operation_list[context.op_cnt]['arg3']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        symb2_val, symb2_type = get_symb_value(symb2, context)
-        if symb1_type is None or symb2_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        label: LabelRef = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb2: Union[Var, Const] = data.arg3
+        symb1_val: Value = get_symb_value(symb1, context)
+        symb2_val: Value = get_symb_value(symb2, context)
+        if symb1_val is None or symb2_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != symb2_type and symb1_type != 'nil' and symb2_type != 'nil':
+        if type(symb1_val) is not type(symb2_val) and symb1_val is not NIL and symb2_val is not NIL:
             exit_with_code(53, "Error: Wrong types.")
-        if context.label_dict.get(label) is None:
+        if label.target is None:
             exit_with_code(52, "Error: Label does not exist.")
         if symb1_val == symb2_val:
-            context.op_cnt = context.label_dict[label]
+            context.op_cnt = label.target
         else:
             context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 3)
 
 
 
 class Jumpifneq(Operation):
     def execute(self, context) -> None:
-        label = context.operation_list[context.op_cnt]['arg1']['value']
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg2']
-        symb2: Dict[str, str] = context.operation_list[context.op_cnt]['arg3']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        symb2_val, symb2_type = get_symb_value(symb2, context)
-        if symb1_type is None or symb2_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        label: LabelRef = data.arg1
+        symb1: Union[Var, Const] = data.arg2
+        symb2: Union[Var, Const] = data.arg3
+        symb1_val: Value = get_symb_value(symb1, context)
+        symb2_val: Value = get_symb_value(symb2, context)
+        if symb1_val is None or symb2_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if symb1_type != symb2_type and symb1_type != 'nil' and symb2_type != 'nil':
+        if type(symb1_val) is not type(symb2_val) and symb1_val is not NIL and symb2_val is not NIL:
             exit_with_code(53, "Error: Wrong types.")
-        if context.label_dict.get(label) is None:
+        if label.target is None:
             exit_with_code(52, "Error: Label does not exist.")
         if symb1_val != symb2_val:
-            context.op_cnt = context.label_dict[label]
+            context.op_cnt = label.target
         else:
             context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 3)
 
 
 class Exit(Operation):
     def execute(self, context) -> None:
-        exit_code: Dict[str, str] = context.operation_list[context.op_cnt]['arg1']
-        val, val_type = get_symb_value(exit_code, context)
-        if val_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        exit_code: Union[Var, Const] = data.arg1
+        val: Value = get_symb_value(exit_code, context)
+        if val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        if val_type != 'int':
+        if type(val) is not int:
             exit_with_code(53, "Error: Invalid exit code type.")
         if val < 0 or val > 49:
             exit_with_code(57, "Error: Invalid exit code.")
-        sys.exit(val)
+        raise ProgramExit(val)
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 1)
 
 
 class Dprint(Operation):
     def execute(self, context) -> None:
-        symb1: Dict[str, str] = context.operation_list[context.op_cnt]['arg1']
-        symb1_val, symb1_type = get_symb_value(symb1, context)
-        if symb1_type is None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        symb1: Union[Var, Const] = data.arg1
+        symb1_val: Value = get_symb_value(symb1, context)
+        if symb1_val is None:
             exit_with_code(56, "Error: Variable uninitialized.")
-        print(symb1_val, file=sys.stderr)
+        context.output.flush()
+        print(symb1_val, file=context.error)
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 1)
 
 
 class Break(Operation):
     def execute(self, context) -> None:
-        print("Instruction counter:", context.op_cnt)
-        print("Data stack:", context.data_stack)
-        print("Call stack:", context.call_stack)
-        print("Actual Local frames:", context.local_frames[-1])
-        print("Global frame:", context.global_frame)
-        print("Temporary frame:", context.temp_frame)
+        context.output.flush()
+        local_frame: Union[Dict, None] = None
+        if len(context.local_frame) != 0:
+            local_frame: Dict = context.local_frame[-1].variables(context.local_names)
+        tmp_frame: Union[Dict, None] = None
+        if context.tmp_frame is not None:
+            tmp_frame: Dict = context.tmp_frame.variables(context.local_names)
+        print("Instruction counter:", context.op_cnt, file=context.error)
+        print("Data stack:", context.stack, file=context.error)
+        print("Call stack:", context.call_stack, file=context.error)
+        print("Actual Local frame:", local_frame, file=context.error)
+        print("Global frame:", context.global_frame.variables(context.global_names), file=context.error)
+        print("Temporary frame:", tmp_frame, file=context.error)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        check_arguments(data, 0)
+
+
+# Operations of the STACK extension, they take their operands from the data stack, the second operand is on the top,
+# and push the result back. The stack holds only initialized values, so only the number of values is checked.
+
+
+class Clears(Operation):
+    def execute(self, context) -> None:
+        # the stack is cleared in place, compiled regions keep a reference to it
+        context.stack.clear()
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        check_arguments(data, 0)
+
+
+class Adds(Operation):
+    def execute(self, context) -> None:
+        stack: List[Value] = context.stack
+        if len(stack) < 2:
+            exit_with_code(56, "Error: No data to pop.")
+        symb2_val: Value = stack.pop()
+        symb1_val: Value = stack[-1]
+        if type(symb1_val) is not int or type(symb2_val) is not int:
+            exit_with_code(53, "Error: Wrong types.")
+        stack[-1] = symb1_val + symb2_val
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        check_arguments(data, 0)
+
+
+class Subs(Operation):
+    def execute(self, context) -> None:
+        stack: List[Value] = context.stack
+        if len(stack) < 2:
+            exit_with_code(56, "Error: No data to pop.")
+        symb2_val: Value = stack.pop()
+        symb1_val: Value = stack[-1]
+        if type(symb1_val) is not int or type(symb2_val) is not int:
+            exit_with_code(53, "Error: Wrong types.")
+        stack[-1] = symb1_val - symb2_val
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        check_arguments(data, 0)
+
+
+class Muls(Operation):
+    def execute(self, context) -> None:
+        stack: List[Value] = context.stack
+        if len(stack) < 2:
+            exit_with_code(56, "Error: No data to pop.")
+        symb2_val: Value = stack.pop()
+        symb1_val: Value = stack[-1]
+        if type(symb1_val) is not int or type(symb2_val) is not int:
+            exit_with_code(53, "Error: Wrong types.")
+        stack[-1] = symb1_val * symb2_val
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        check_arguments(data, 0)
+
+
+class IDivs(Operation):
+    def execute(self, context) -> None:
+        stack: List[Value] = context.stack
+        if len(stack) < 2:
+            exit_with_code(56, "Error: No data to pop.")
+        symb2_val: Value = stack.pop()
+        symb1_val: Value = stack[-1]
+        if type(symb1_val) is not int or type(symb2_val) is not int:
+            exit_with_code(53, "Error: Wrong types.")
+        if symb2_val == 0:
+            exit_with_code(57, "Error: Division by zero.")
+        stack[-1] = symb1_val // symb2_val
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        check_arguments(data, 0)
+
+
+class Lts(Operation):
+    def execute(self, context) -> None:
+        stack: List[Value] = context.stack
+        if len(stack) < 2:
+            exit_with_code(56, "Error: No data to pop.")
+        symb2_val: Value = stack.pop()
+        symb1_val: Value = stack[-1]
+        if type(symb1_val) is not type(symb2_val) or symb1_val is NIL:
+            exit_with_code(53, "Error: Wrong types.")
+        stack[-1] = symb1_val < symb2_val
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        check_arguments(data, 0)
+
+
+class Gts(Operation):
+    def execute(self, context) -> None:
+        stack: List[Value] = context.stack
+        if len(stack) < 2:
+            exit_with_code(56, "Error: No data to pop.")
+        symb2_val: Value = stack.pop()
+        symb1_val: Value = stack[-1]
+        if type(symb1_val) is not type(symb2_val) or symb1_val is NIL:
+            exit_with_code(53, "Error: Wrong types.")
+        stack[-1] = symb1_val > symb2_val
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        check_arguments(data, 0)
+
+
+class Eqs(Operation):
+    def execute(self, context) -> None:
+        stack: List[Value] = context.stack
+        if len(stack) < 2:
+            exit_with_code(56, "Error: No data to pop.")
+        symb2_val: Value = stack.pop()
+        symb1_val: Value = stack[-1]
+        if type(symb1_val) is not type(symb2_val) and symb1_val is not NIL and symb2_val is not NIL:
+            exit_with_code(53, "Error: Wrong types.")
+        stack[-1] = symb1_val == symb2_val
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        check_arguments(data, 0)
+
+
+class Ands(Operation):
+    def execute(self, context) -> None:
+        stack: List[Value] = context.stack
+        if len(stack) < 2:
+            exit_with_code(56, "Error: No data to pop.")
+        symb2_val: Value = stack.pop()
+        symb1_val: Value = stack[-1]
+        if type(symb1_val) is not bool or type(symb2_val) is not bool:
+            exit_with_code(53, "Error: Wrong types.")
+        stack[-1] = symb1_val and symb2_val
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        check_arguments(data, 0)
+
+
+class Ors(Operation):
+    def execute(self, context) -> None:
+        stack: List[Value] = context.stack
+        if len(stack) < 2:
+            exit_with_code(56, "Error: No data to pop.")
+        symb2_val: Value = stack.pop()
+        symb1_val: Value = stack[-1]
+        if type(symb1_val) is not bool or type(symb2_val) is not bool:
+            exit_with_code(53, "Error: Wrong types.")
+        stack[-1] = symb1_val or symb2_val
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        check_arguments(data, 0)
+
+
+class Nots(Operation):
+    def execute(self, context) -> None:
+        stack: List[Value] = context.stack
+        if len(stack) == 0:
+            exit_with_code(56, "Error: No data to pop.")
+        if type(stack[-1]) is not bool:
+            exit_with_code(53, "Error: Wrong types.")
+        stack[-1] = not stack[-1]
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        check_arguments(data, 0)
+
+
+class Int2chars(Operation):
+    def execute(self, context) -> None:
+        stack: List[Value] = context.stack
+        if len(stack) == 0:
+            exit_with_code(56, "Error: No data to pop.")
+        if type(stack[-1]) is not int:
+            exit_with_code(53, "Error: Wrong types.")
+        try:
+            stack[-1] = chr(stack[-1])
+        except ValueError:
+            exit_with_code(58, "Error: Wrong value.")
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        check_arguments(data, 0)
+
+
+class Stri2ints(Operation):
+    def execute(self, context) -> None:
+        stack: List[Value] = context.stack
+        if len(stack) < 2:
+            exit_with_code(56, "Error: No data to pop.")
+        symb2_val: Value = stack.pop()
+        symb1_val: Value = stack[-1]
+        if type(symb1_val) is not str or type(symb2_val) is not int:
+            exit_with_code(53, "Error: Wrong types.")
+        if symb2_val < 0 or symb2_val >= len(symb1_val):
+            exit_with_code(58, "Error: Wrong value.")
+        stack[-1] = ord(symb1_val[symb2_val])
         context.op_cnt += 1
 
-    def check_args(self, data: Dict[str, Dict[str, str]]) -> None:
+    def check_args(self, data: Instruction) -> None:
         check_arguments(data, 0)
+
+
+class Jumpifeqs(Operation):
+    def execute(self, context) -> None:
+        stack: List[Value] = context.stack
+        if len(stack) < 2:
+            exit_with_code(56, "Error: No data to pop.")
+        symb2_val: Value = stack.pop()
+        symb1_val: Value = stack.pop()
+        if type(symb1_val) is not type(symb2_val) and symb1_val is not NIL and symb2_val is not NIL:
+            exit_with_code(53, "Error: Wrong types.")
+        label: LabelRef = context.operation_list[context.op_cnt].arg1
+        if label.target is None:
+            exit_with_code(52, "Error: Label does not exist.")
+        if symb1_val == symb2_val:
+            context.op_cnt = label.target
+        else:
+            context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        check_arguments(data, 1)
+
+
+class Jumpifneqs(Operation):
+    def execute(self, context) -> None:
+        stack: List[Value] = context.stack
+        if len(stack) < 2:
+            exit_with_code(56, "Error: No data to pop.")
+        symb2_val: Value = stack.pop()
+        symb1_val: Value = stack.pop()
+        if type(symb1_val) is not type(symb2_val) and symb1_val is not NIL and symb2_val is not NIL:
+            exit_with_code(53, "Error: Wrong types.")
+        label: LabelRef = context.operation_list[context.op_cnt].arg1
+        if label.target is None:
+            exit_with_code(52, "Error: Label does not exist.")
+        if symb1_val != symb2_val:
+            context.op_cnt = label.target
+        else:
+            context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        check_arguments(data, 1)
+
+
+# Fused operations created by the peephole optimizer (lib/peephole.py) from sequences of the operations above.
+# Every fused operation does the same checks in the same order as the sequence, so the errors stay the same.
+
+
+class LtJumpif(Operation):
+    """
+    LT to a variable followed by JUMPIFEQ/JUMPIFNEQ of the variable and a bool constant.
+    Arg1 is the label, arg2 and arg3 are compared, extra is the variable and the result for which the jump is taken.
+    """
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        symb1_val: Value = get_symb_value(data.arg2, context)
+        symb2_val: Value = get_symb_value(data.arg3, context)
+        if symb1_val is None or symb2_val is None:
+            exit_with_code(56, "Error: Variable uninitialized.")
+        if type(symb1_val) is not type(symb2_val) or symb1_val is NIL:
+            exit_with_code(53, "Error: Wrong types.")
+        result: bool = symb1_val < symb2_val
+        var, jump_when = data.extra
+        store_val_to_var(var, result, context)
+        label: LabelRef = data.arg1
+        if label.target is None:
+            exit_with_code(52, "Error: Label does not exist.")
+        if result is jump_when:
+            context.op_cnt = label.target
+        else:
+            context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class GtJumpif(Operation):
+    """
+    GT to a variable followed by JUMPIFEQ/JUMPIFNEQ of the variable and a bool constant, same operands as LtJumpif.
+    """
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        symb1_val: Value = get_symb_value(data.arg2, context)
+        symb2_val: Value = get_symb_value(data.arg3, context)
+        if symb1_val is None or symb2_val is None:
+            exit_with_code(56, "Error: Variable uninitialized.")
+        if type(symb1_val) is not type(symb2_val) or symb1_val is NIL:
+            exit_with_code(53, "Error: Wrong types.")
+        result: bool = symb1_val > symb2_val
+        var, jump_when = data.extra
+        store_val_to_var(var, result, context)
+        label: LabelRef = data.arg1
+        if label.target is None:
+            exit_with_code(52, "Error: Label does not exist.")
+        if result is jump_when:
+            context.op_cnt = label.target
+        else:
+            context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class EqJumpif(Operation):
+    """
+    EQ to a variable followed by JUMPIFEQ/JUMPIFNEQ of the variable and a bool constant, same operands as LtJumpif.
+    """
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        symb1_val: Value = get_symb_value(data.arg2, context)
+        symb2_val: Value = get_symb_value(data.arg3, context)
+        if symb1_val is None or symb2_val is None:
+            exit_with_code(56, "Error: Variable uninitialized.")
+        if type(symb1_val) is not type(symb2_val) and symb1_val is not NIL and symb2_val is not NIL:
+            exit_with_code(53, "Error: Wrong types.")
+        result: bool = symb1_val == symb2_val
+        var, jump_when = data.extra
+        store_val_to_var(var, result, context)
+        label: LabelRef = data.arg1
+        if label.target is None:
+            exit_with_code(52, "Error: Label does not exist.")
+        if result is jump_when:
+            context.op_cnt = label.target
+        else:
+            context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class DefvarMove(Operation):
+    """
+    DEFVAR of a variable followed by MOVE to it, operands are the operands of MOVE.
+    """
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var: Var = data.arg1
+        if not get_frame(var, context).define(var.slot):
+            exit_with_code(52, "Error: Variable already defined.")
+        val: Value = get_symb_value(data.arg2, context)
+        if val is None:
+            exit_with_code(56, "Error: Variable not initialized.")
+        store_val_to_var(var, val, context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class PushsPops(Operation):
+    """
+    PUSHS followed by POPS, the value is moved without the data stack, arg1 is the variable of POPS and arg2
+    the symbol of PUSHS.
+    """
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        symb_val: Value = get_symb_value(data.arg2, context)
+        if symb_val is None:
+            exit_with_code(56, "Error: Variable uninitialized.")
+        store_val_to_var(data.arg1, symb_val, context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class CreateframeCall(Operation):
+    """
+    CREATEFRAME, PUSHFRAME and CALL, frame size is the one of CREATEFRAME and arg1 is the label of CALL.
+    """
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        frame_pool: FramePool = context.frame_pool
+        frame_pool.release(context.tmp_frame)
+        context.local_frame.append(frame_pool.acquire(data.frame_size))
+        context.tmp_frame = None
+        context.call_stack.append(context.op_cnt)
+        label: LabelRef = data.arg1
+        if label.target is None:
+            exit_with_code(52, "Error: Label does not exist.")
+        context.op_cnt = label.target
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class PushframeCall(Operation):
+    """
+    PUSHFRAME followed by CALL, arg1 is the label of CALL.
+    """
+    def execute(self, context) -> None:
+        if context.tmp_frame is None:
+            exit_with_code(55, "Error: No frame to push.")
+        context.local_frame.append(context.tmp_frame)
+        context.tmp_frame = None
+        context.call_stack.append(context.op_cnt)
+        label: LabelRef = context.operation_list[context.op_cnt].arg1
+        if label.target is None:
+            exit_with_code(52, "Error: Label does not exist.")
+        context.op_cnt = label.target
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+# Typed variants created by the type inference (lib/typeinfer.py) for instructions whose operands are proven to be
+# initialized and of the right types, they skip these checks. Missing variables and frames are still checked
+# when the operands are read.
+
+
+class AddTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        store_val_to_var(data.arg1, get_symb_value(data.arg2, context) + get_symb_value(data.arg3, context), context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class SubTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        store_val_to_var(data.arg1, get_symb_value(data.arg2, context) - get_symb_value(data.arg3, context), context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class MulTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        store_val_to_var(data.arg1, get_symb_value(data.arg2, context) * get_symb_value(data.arg3, context), context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class IDivTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        symb1_val: int = get_symb_value(data.arg2, context)
+        symb2_val: int = get_symb_value(data.arg3, context)
+        if symb2_val == 0:
+            exit_with_code(57, "Error: Division by zero.")
+        store_val_to_var(data.arg1, symb1_val // symb2_val, context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class LtTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        store_val_to_var(data.arg1, get_symb_value(data.arg2, context) < get_symb_value(data.arg3, context), context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class GtTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        store_val_to_var(data.arg1, get_symb_value(data.arg2, context) > get_symb_value(data.arg3, context), context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class EqTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        store_val_to_var(data.arg1, get_symb_value(data.arg2, context) == get_symb_value(data.arg3, context), context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class AndTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        symb1_val: bool = get_symb_value(data.arg2, context)
+        symb2_val: bool = get_symb_value(data.arg3, context)
+        store_val_to_var(data.arg1, symb1_val and symb2_val, context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class OrTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        symb1_val: bool = get_symb_value(data.arg2, context)
+        symb2_val: bool = get_symb_value(data.arg3, context)
+        store_val_to_var(data.arg1, symb1_val or symb2_val, context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class NotTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        store_val_to_var(data.arg1, not get_symb_value(data.arg2, context), context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class ConcatTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        store_val_to_var(data.arg1, get_symb_value(data.arg2, context) + get_symb_value(data.arg3, context), context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class StrlenTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        store_val_to_var(data.arg1, len(get_symb_value(data.arg2, context)), context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class JumpifeqTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        symb1_val: Value = get_symb_value(data.arg2, context)
+        symb2_val: Value = get_symb_value(data.arg3, context)
+        label: LabelRef = data.arg1
+        if label.target is None:
+            exit_with_code(52, "Error: Label does not exist.")
+        if symb1_val == symb2_val:
+            context.op_cnt = label.target
+        else:
+            context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class JumpifneqTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        symb1_val: Value = get_symb_value(data.arg2, context)
+        symb2_val: Value = get_symb_value(data.arg3, context)
+        label: LabelRef = data.arg1
+        if label.target is None:
+            exit_with_code(52, "Error: Label does not exist.")
+        if symb1_val != symb2_val:
+            context.op_cnt = label.target
+        else:
+            context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class LtJumpifTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        result: bool = get_symb_value(data.arg2, context) < get_symb_value(data.arg3, context)
+        var, jump_when = data.extra
+        store_val_to_var(var, result, context)
+        label: LabelRef = data.arg1
+        if label.target is None:
+            exit_with_code(52, "Error: Label does not exist.")
+        if result is jump_when:
+            context.op_cnt = label.target
+        else:
+            context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class GtJumpifTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        result: bool = get_symb_value(data.arg2, context) > get_symb_value(data.arg3, context)
+        var, jump_when = data.extra
+        store_val_to_var(var, result, context)
+        label: LabelRef = data.arg1
+        if label.target is None:
+            exit_with_code(52, "Error: Label does not exist.")
+        if result is jump_when:
+            context.op_cnt = label.target
+        else:
+            context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class EqJumpifTyped(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        result: bool = get_symb_value(data.arg2, context) == get_symb_value(data.arg3, context)
+        var, jump_when = data.extra
+        store_val_to_var(var, result, context)
+        label: LabelRef = data.arg1
+        if label.target is None:
+            exit_with_code(52, "Error: Label does not exist.")
+        if result is jump_when:
+            context.op_cnt = label.target
+        else:
+            context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+# Buffered variants and MATERIALIZE are created by the string buffer pass (lib/buffers.py), the variable in arg1
+# of CONCAT and SETCHAR and the string in arg2 of STRLEN and GETCHAR can be a string buffer, they check the operands
+# the same way as the checked operations.
+
+
+class ConcatBuffered(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        symb1_val: Union[Value, StringBuffer] = get_var_value(data.arg2, context)
+        symb2_val: Value = get_symb_value(data.arg3, context)
+        if symb1_val is None or symb2_val is None:
+            exit_with_code(56, "Error: Variable uninitialized.")
+        if type(symb1_val) is not str and type(symb1_val) is not StringBuffer or type(symb2_val) is not str:
+            exit_with_code(53, "Error: Wrong types.")
+        store_val_to_var(data.arg1, buffer_concat(symb1_val, symb2_val), context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class StrlenBuffered(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        symb1_val: Union[Value, StringBuffer] = get_var_value(data.arg2, context)
+        if symb1_val is None:
+            exit_with_code(56, "Error: Variable uninitialized.")
+        if type(symb1_val) is not str and type(symb1_val) is not StringBuffer:
+            exit_with_code(53, "Error: Wrong types.")
+        store_val_to_var(data.arg1, len(symb1_val), context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class GetcharBuffered(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        symb1_val: Union[Value, StringBuffer] = get_var_value(data.arg2, context)
+        symb2_val: Value = get_symb_value(data.arg3, context)
+        if symb1_val is None or symb2_val is None:
+            exit_with_code(56, "Error: Variable uninitialized.")
+        if type(symb1_val) is not str and type(symb1_val) is not StringBuffer or type(symb2_val) is not int:
+            exit_with_code(53, "Error: Wrong types.")
+        if symb2_val < 0 or symb2_val >= len(symb1_val):
+            exit_with_code(58, "Error: Wrong value.")
+        store_val_to_var(data.arg1, symb1_val[symb2_val], context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class SetcharBuffered(Operation):
+    def execute(self, context) -> None:
+        data: Instruction = context.operation_list[context.op_cnt]
+        var_val: Union[Value, StringBuffer] = get_var_value(data.arg1, context)
+        symb1_val: Value = get_symb_value(data.arg2, context)
+        symb2_val: Value = get_symb_value(data.arg3, context)
+        if var_val is None or symb1_val is None or symb2_val is None:
+            exit_with_code(56, "Error: Variable uninitialized.")
+        if type(var_val) is not str and type(var_val) is not StringBuffer or type(symb1_val) is not int or \
+                type(symb2_val) is not str:
+            exit_with_code(53, "Error: Wrong types.")
+        if symb1_val < 0 or symb1_val > len(var_val)-1 or len(symb2_val) == 0:
+            exit_with_code(58, "Error: Wrong value.")
+        store_val_to_var(data.arg1, buffer_setchar(var_val, symb1_val, symb2_val), context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
+
+
+class Materialize(Operation):
+    def execute(self, context) -> None:
+        materialize_var(context.operation_list[context.op_cnt].arg1, context)
+        context.op_cnt += 1
+
+    def check_args(self, data: Instruction) -> None:
+        pass
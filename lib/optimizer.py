@@ -0,0 +1,85 @@
+from typing import Dict, List, Optional, TextIO, Tuple
+from lib.program import LabelRef, Instruction
+from lib.peephole import Peephole
+from lib.dataflow import Dataflow
+from lib.controlflow import ControlFlow
+from lib.typeinfer import TypeInference
+from lib.buffers import StringBuffers
+
+# optimization levels, 0 runs the program as it was decoded, 3 adds compilation of hot regions (lib/compiler.py)
+DEFAULT_OPT_LEVEL: int = 1
+MAX_OPT_LEVEL: int = 3
+
+
+def relink(instructions: List[Instruction]) -> Tuple[List[Instruction], Dict[str, int]]:
+    """
+    Remove LABELs from the optimized program and point label operands to the instruction following their LABEL.
+    Every label gets a new LabelRef, so the label operands of the decoded program keep their targets.
+    :param instructions: instructions of the optimized program, their label operands are replaced
+    :return: instructions without LABELs and label table of them
+    """
+    stripped: List[Instruction] = []
+    label_dict: Dict[str, int] = {}
+    for instruction in instructions:
+        if instruction.opcode == 'LABEL' and isinstance(instruction.arg1, LabelRef):
+            label_dict[instruction.arg1.name] = len(stripped)
+        else:
+            stripped.append(instruction)
+    labels: Dict[str, LabelRef] = {}
+    for instruction in stripped:
+        for slot in ('arg1', 'arg2', 'arg3'):
+            arg = getattr(instruction, slot)
+            if isinstance(arg, LabelRef):
+                label: Optional[LabelRef] = labels.get(arg.name)
+                if label is None:
+                    label: LabelRef = LabelRef(arg.name)
+                    label.target = label_dict.get(arg.name)
+                    labels[arg.name] = label
+                setattr(instruction, slot, label)
+    return stripped, label_dict
+
+
+class Optimizer:
+    """
+    Passes run on the checked program in the order of this list, a pass is used from its level up:
+    level 2 folds constants, propagates copies and removes dead stores (Dataflow), level 1 cleans up jumps
+    (ControlFlow) and fuses sequences of instructions into superinstructions (Peephole), level 2 replaces operations
+    whose checks of the operand types can't fail by their typed variants (TypeInference), level 1 keeps strings
+    built by CONCAT and SETCHAR in mutable buffers (StringBuffers).
+    Every pass gets a list of copies of the instructions, so the decoded program is never changed. LABELs are
+    removed at the end, when no pass needs them as boundaries of basic blocks, so they don't cost a dispatch.
+    """
+    def __init__(self, operations: Dict, level: int = DEFAULT_OPT_LEVEL):
+        self.passes: List = []
+        if level >= 2:
+            self.passes.append(Dataflow(operations))
+        if level >= 1:
+            self.passes.append(ControlFlow())
+            self.passes.append(Peephole())
+        if level >= 2:
+            self.passes.append(TypeInference())
+        if level >= 1:
+            self.passes.append(StringBuffers())
+
+    def optimize(self, instructions: List[Instruction]) -> Tuple[List[Instruction], Dict[str, int]]:
+        """
+        Run the passes.
+        :param instructions: checked instructions of the decoded program, they are not changed
+        :return: optimized instructions and their label table
+        """
+        optimized: List[Instruction] = [instruction.copy() for instruction in instructions]
+        for optimization in self.passes:
+            optimized: List[Instruction] = optimization.run(optimized)
+        return relink(optimized)
+
+    def write_report(self, stream: TextIO, before: int, after: int) -> None:
+        """
+        Write what the passes changed.
+        :param stream: stream for the report
+        :param before: number of the decoded instructions
+        :param after: number of the optimized instructions
+        """
+        print(f"Optimizer: {before} instructions, {after} after optimization", file=stream)
+        for optimization in self.passes:
+            for name, count in sorted(optimization.counts.items(), key=lambda item: -item[1]):
+                print(f"{optimization.name:<12}{name:<30}{count:>8}", file=stream)
@@ -0,0 +1,39 @@
+from typing import List, TextIO
+
+DEFAULT_BUFFER_SIZE: int = 65536
+
+
+class OutputBuffer:
+    """
+    Buffer for the output of the program, it is written to the stream when it is full or flushed.
+    It doesn't replace sys.stdout, only WRITE goes through it (context.output), print() to sys.stdout is not ordered
+    with it. DPRINT and BREAK flush it before they write to the error output and Interpret flushes it when
+    the program ends, before the error message is printed, so the order of the two streams is kept.
+    """
+    def __init__(self, stream: TextIO, size: int = DEFAULT_BUFFER_SIZE):
+        self.stream: TextIO = stream
+        self.size: int = size
+        self.__chunks: List[str] = []
+        self.__length: int = 0
+
+    def write(self, string: str) -> int:
+        """
+        Append string to the buffer, flush the buffer if it is full.
+        :param string: String to write
+        :return: Number of written characters
+        """
+        self.__chunks.append(string)
+        self.__length += len(string)
+        if self.__length >= self.size:
+            self.flush()
+        return len(string)
+
+    def flush(self) -> None:
+        """
+        Write the buffered output to the stream.
+        """
+        if self.__chunks:
+            self.stream.write(''.join(self.__chunks))
+            self.__chunks = []
+            self.__length = 0
+        self.stream.flush()
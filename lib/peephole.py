@@ -0,0 +1,91 @@
+from typing import Dict, List, Optional, Tuple
+from lib.program import Var, Const, LabelRef, Instruction
+
+COMPARE_JUMPS: Dict[str, str] = {'LT': 'LT+JUMPIF', 'GT': 'GT+JUMPIF', 'EQ': 'EQ+JUMPIF'}
+
+
+def is_symb(arg) -> bool:
+    return isinstance(arg, (Var, Const))
+
+
+class Peephole:
+    """
+    Fuse short sequences of instructions into superinstructions, so one dispatch does the work of several.
+    A sequence never contains a LABEL, so no jump can land inside of it, and the fused operation does the checks
+    of the sequence in the same order, so the output and the errors of the program don't change.
+    Counts are the numbers of the created superinstructions by their opcode.
+    """
+    name: str = 'peephole'
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+
+    def run(self, instructions: List[Instruction]) -> List[Instruction]:
+        """
+        Fuse the instructions.
+        :param instructions: instructions of the program, they are not changed
+        :return: optimized instructions
+        """
+        optimized: List[Instruction] = []
+        op_cnt: int = 0
+        while op_cnt < len(instructions):
+            fused: Optional[Tuple[Instruction, int]] = self.__fuse(instructions, op_cnt)
+            if fused is None:
+                optimized.append(instructions[op_cnt])
+                op_cnt += 1
+                continue
+            instruction, length = fused
+            self.counts[instruction.opcode] = self.counts.get(instruction.opcode, 0) + 1
+            optimized.append(instruction)
+            op_cnt += length
+        return optimized
+
+    def __fuse(self, instructions: List[Instruction], op_cnt: int) -> Optional[Tuple[Instruction, int]]:
+        """
+        Try to fuse the sequence starting at the position.
+        :return: fused instruction and the number of instructions it replaces or None
+        """
+        first: Instruction = instructions[op_cnt]
+        second: Optional[Instruction] = instructions[op_cnt + 1] if op_cnt + 1 < len(instructions) else None
+        if second is None:
+            return None
+        if first.opcode in COMPARE_JUMPS:
+            return self.__fuse_compare_jump(first, second)
+        if first.opcode == 'DEFVAR' and second.opcode == 'MOVE':
+            if isinstance(first.arg1, Var) and second.arg1 is first.arg1 and is_symb(second.arg2):
+                return second.copy('DEFVAR+MOVE'), 2
+        elif first.opcode == 'PUSHS' and second.opcode == 'POPS':
+            if is_symb(first.arg1) and isinstance(second.arg1, Var):
+                fused: Instruction = second.copy('PUSHS+POPS')
+                fused.arg2 = first.arg1
+                return fused, 2
+        elif first.opcode == 'PUSHFRAME' and second.opcode == 'CALL' and isinstance(second.arg1, LabelRef):
+            return second.copy('PUSHFRAME+CALL'), 2
+        elif first.opcode == 'CREATEFRAME' and second.opcode == 'PUSHFRAME' and op_cnt + 2 < len(instructions):
+            third: Instruction = instructions[op_cnt + 2]
+            if third.opcode == 'CALL' and isinstance(third.arg1, LabelRef):
+                fused: Instruction = third.copy('CREATEFRAME+PUSHFRAME+CALL')
+                fused.frame_size = first.frame_size
+                return fused, 3
+        return None
+
+    @staticmethod
+    def __fuse_compare_jump(compare: Instruction, jump: Instruction) -> Optional[Tuple[Instruction, int]]:
+        """
+        Fuse comparison to a variable with conditional jump comparing the variable with a bool constant.
+        """
+        if jump.opcode not in ('JUMPIFEQ', 'JUMPIFNEQ') or not isinstance(jump.arg1, LabelRef):
+            return None
+        var: Var = compare.arg1
+        if not isinstance(var, Var) or not is_symb(compare.arg2) or not is_symb(compare.arg3):
+            return None
+        if jump.arg2 is var and isinstance(jump.arg3, Const) and jump.arg3.type == 'bool':
+            value: bool = jump.arg3.value
+        elif jump.arg3 is var and isinstance(jump.arg2, Const) and jump.arg2.type == 'bool':
+            value: bool = jump.arg2.value
+        else:
+            return None
+        fused: Instruction = compare.copy(COMPARE_JUMPS[compare.opcode])
+        fused.arg1 = jump.arg1
+        fused.extra = (var, value if jump.opcode == 'JUMPIFEQ' else not value)
+        return fused, 2
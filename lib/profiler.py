@@ -0,0 +1,164 @@
+import json
+from typing import Dict, List, Optional, TextIO, Tuple, Union
+from lib.program import Instruction, LabelRef
+from lib.typeinfer import untyped
+
+# jumps of the optimized program as well, fused compare-jumps (lib/peephole.py) end most loops from --opt-level 1
+JUMP_OPCODES: Tuple[str, ...] = ('JUMP', 'JUMPIFEQ', 'JUMPIFNEQ', 'JUMPIFEQS', 'JUMPIFNEQS', 'LT+JUMPIF', 'GT+JUMPIF',
+                                 'EQ+JUMPIF')
+DEFAULT_TOP: int = 20
+# name of the code outside of any called label in call stacks
+ROOT: str = '<main>'
+
+
+class Profiler:
+    """
+    Execution counts and times of instructions, filled by Interpret.execute_operations_profiled().
+    Counts and times are lists parallel to the operation list, edges count transfers of control from an instruction
+    to an instruction which is not after it, backward jumps among them are the loops of the program.
+    Paths are stacks of the called labels, each of them has the time and count of the instructions executed
+    directly in it, calls count the calls of every label.
+    """
+    def __init__(self, operation_list: List[Instruction]):
+        self.operation_list: List[Instruction] = operation_list
+        self.counts: List[int] = [0] * len(operation_list)
+        self.times: List[float] = [0.0] * len(operation_list)
+        self.edges: Dict[Tuple[int, int], int] = {}
+        self.paths: Dict[Tuple[str, ...], List[Union[float, int]]] = {}
+        self.calls: Dict[str, int] = {}
+
+    def path_totals(self, path: Tuple[str, ...]) -> List[Union[float, int]]:
+        """
+        Get totals of the call stack, the profiled loop adds the time and count of every instruction to them.
+        :param path: stack of the called labels
+        :return: list of time and count
+        """
+        totals: Optional[List[Union[float, int]]] = self.paths.get(path)
+        if totals is None:
+            totals: List[Union[float, int]] = [0.0, 0]
+            self.paths[path] = totals
+        return totals
+
+    @staticmethod
+    def call_label(instruction: Instruction) -> str:
+        """
+        Get the label called by the instruction.
+        :param instruction: instruction which pushed to the call stack
+        :return: name of the label
+        """
+        for arg in (instruction.arg1, instruction.arg2, instruction.arg3):
+            if isinstance(arg, LabelRef):
+                return arg.name
+        return instruction.opcode
+
+    def functions(self) -> List[Dict[str, Union[str, int, float]]]:
+        """
+        Inclusive and exclusive totals of every called label, recursive calls are counted in the inclusive totals once.
+        :return: labels sorted by their inclusive time
+        """
+        summary: Dict[str, Dict[str, Union[str, int, float]]] = {}
+        for path, (seconds, count) in self.paths.items():
+            for label in set(path):
+                item: Dict[str, Union[str, int, float]] = summary.setdefault(label, {
+                    'label': label, 'calls': self.calls.get(label, 0), 'inclusive_instructions': 0,
+                    'exclusive_instructions': 0, 'inclusive_seconds': 0.0, 'exclusive_seconds': 0.0})
+                item['inclusive_instructions'] += count
+                item['inclusive_seconds'] += seconds
+            leaf: Dict[str, Union[str, int, float]] = summary[path[-1]]
+            leaf['exclusive_instructions'] += count
+            leaf['exclusive_seconds'] += seconds
+        return sorted(summary.values(), key=lambda item: -item['inclusive_seconds'])
+
+    def write_folded(self, stream: TextIO) -> None:
+        """
+        Write call stacks in the folded format of flame graph tools, the weight is the time in microseconds.
+        :param stream: stream for the stacks
+        """
+        for path, (seconds, _) in sorted(self.paths.items()):
+            weight: int = round(seconds * 1e6)
+            if weight > 0:
+                stream.write(f"{';'.join(path)} {weight}\n")
+
+    def opcodes(self) -> List[Dict[str, Union[str, int, float]]]:
+        """
+        Summary of the execution per opcode.
+        :return: opcodes sorted by their total time
+        """
+        summary: Dict[str, List[Union[int, float]]] = {}
+        for op_cnt, instruction in enumerate(self.operation_list):
+            if self.counts[op_cnt]:
+                totals: List[Union[int, float]] = summary.setdefault(instruction.opcode, [0, 0.0])
+                totals[0] += self.counts[op_cnt]
+                totals[1] += self.times[op_cnt]
+        return sorted(({'opcode': opcode, 'count': count, 'seconds': seconds}
+                       for opcode, (count, seconds) in summary.items()), key=lambda item: -item['seconds'])
+
+    def instructions(self) -> List[Dict[str, Union[str, int, float]]]:
+        """
+        Summary of the execution per instruction.
+        :return: executed instructions sorted by their total time
+        """
+        return sorted(({'order': instruction.order, 'opcode': instruction.opcode, 'count': self.counts[op_cnt],
+                        'seconds': self.times[op_cnt]}
+                       for op_cnt, instruction in enumerate(self.operation_list) if self.counts[op_cnt]),
+                      key=lambda item: -item['seconds'])
+
+    def loops(self) -> List[Dict[str, Union[str, int, float]]]:
+        """
+        Loops of the program found as backward jumps, the body is the range from the target to the jump.
+        :return: loops sorted by the number of iterations
+        """
+        loops: List[Dict[str, Union[str, int, float]]] = []
+        for (source, target), iterations in self.edges.items():
+            jump: Instruction = self.operation_list[source]
+            if untyped(jump.opcode) not in JUMP_OPCODES:
+                continue
+            label: str = jump.arg1.name if isinstance(jump.arg1, LabelRef) else ''
+            loops.append({'label': label, 'from_order': jump.order, 'to_order': self.operation_list[target].order,
+                          'iterations': iterations, 'seconds': sum(self.times[target:source + 1])})
+        return sorted(loops, key=lambda item: -item['iterations'])
+
+    def to_dict(self, top: int = DEFAULT_TOP) -> Dict[str, List[Dict[str, Union[str, int, float]]]]:
+        return {
+            'total_instructions': sum(self.counts),
+            'total_seconds': sum(self.times),
+            'opcodes': self.opcodes(),
+            'instructions': self.instructions()[:top],
+            'loops': self.loops()[:top],
+            'functions': self.functions(),
+        }
+
+    def write_json(self, stream: TextIO, top: int = DEFAULT_TOP) -> None:
+        json.dump(self.to_dict(top), stream, indent=2)
+        stream.write('\n')
+
+    def write_report(self, stream: TextIO, top: int = DEFAULT_TOP) -> None:
+        """
+        Write the report as text tables.
+        :param stream: stream for the report
+        :param top: number of the hot instructions and loops
+        """
+        profile: Dict = self.to_dict(top)
+        total: float = profile['total_seconds'] or 1.0
+        print(f"Profile: {profile['total_instructions']} instructions in {profile['total_seconds']:.3f} s",
+              file=stream)
+        print(f"\n{'opcode':<12}{'count':>12}{'time s':>10}{'time %':>8}{'ns/instr':>10}", file=stream)
+        for item in profile['opcodes']:
+            print(f"{item['opcode']:<12}{item['count']:>12}{item['seconds']:>10.3f}{item['seconds'] / total:>8.1%}"
+                  f"{item['seconds'] / item['count'] * 1e9:>10.0f}", file=stream)
+        print(f"\n{'order':>8}  {'opcode':<12}{'count':>12}{'time s':>10}{'time %':>8}", file=stream)
+        for item in profile['instructions']:
+            print(f"{item['order']:>8}  {item['opcode']:<12}{item['count']:>12}{item['seconds']:>10.3f}"
+                  f"{item['seconds'] / total:>8.1%}", file=stream)
+        if profile['loops']:
+            print(f"\n{'label':<16}{'orders':>16}{'iterations':>12}{'time s':>10}{'time %':>8}", file=stream)
+            for item in profile['loops']:
+                orders: str = f"{item['to_order']}-{item['from_order']}"
+                print(f"{item['label']:<16}{orders:>16}{item['iterations']:>12}{item['seconds']:>10.3f}"
+                      f"{item['seconds'] / total:>8.1%}", file=stream)
+        print(f"\n{'label':<16}{'calls':>10}{'incl instr':>12}{'excl instr':>12}{'incl s':>10}{'excl s':>10}"
+              f"{'incl %':>8}", file=stream)
+        for item in profile['functions']:
+            print(f"{item['label']:<16}{item['calls']:>10}{item['inclusive_instructions']:>12}"
+                  f"{item['exclusive_instructions']:>12}{item['inclusive_seconds']:>10.3f}"
+                  f"{item['exclusive_seconds']:>10.3f}{item['inclusive_seconds'] / total:>8.1%}", file=stream)
@@ -0,0 +1,90 @@
+from typing import Dict, List, Union, Optional
+from lib.values import Value
+
+# version of the decoded program format, it has to be increased whenever the decoded form changes
+PROGRAM_VERSION: int = 3
+
+
+class Var:
+    """
+    Variable operand with frame and name already split.
+    Slot is the index of the variable in the global frame (GF) or in the local and temporary frames (LF, TF).
+    """
+    __slots__ = ('frame', 'name', 'slot')
+
+    def __init__(self, frame: str, name: str, slot: int = -1):
+        self.frame: str = frame
+        self.name: str = name
+        self.slot: int = slot
+
+
+class Const:
+    """
+    Literal operand with value already parsed, also used for the <type> operand of READ.
+    Constants are shared through the constant pool of the program, index is the position in the pool.
+    """
+    __slots__ = ('type', 'value', 'index')
+
+    def __init__(self, const_type: str, value: Union[Value, str], index: int = 0):
+        self.type: str = const_type
+        self.value: Union[Value, str] = value
+        self.index: int = index
+
+
+class LabelRef:
+    """
+    Label operand, target is the index of the LABEL instruction or None if the label does not exist.
+    """
+    __slots__ = ('name', 'target')
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.target: Optional[int] = None
+
+
+class Instruction:
+    """
+    Decoded instruction, operands are stored in slots named the same way as the XML elements.
+    Frame size is used by CREATEFRAME, it is the size of the frame layout defined by following DEFVARs.
+    Extra holds operands of fused instructions created by the optimizer which don't fit to the three arguments.
+    """
+    __slots__ = ('opcode', 'order', 'arg1', 'arg2', 'arg3', 'frame_size', 'extra')
+
+    def __init__(self, opcode: str, order: int):
+        self.opcode: str = opcode
+        self.order: int = order
+        self.frame_size: int = 0
+        self.arg1: Union[Var, Const, LabelRef, None] = None
+        self.arg2: Union[Var, Const, LabelRef, None] = None
+        self.arg3: Union[Var, Const, LabelRef, None] = None
+        self.extra: Optional[tuple] = None
+
+    def copy(self, opcode: Optional[str] = None) -> 'Instruction':
+        """
+        Copy the instruction, instructions of the decoded program are shared by the cache and by repeated runs,
+        so the optimizer changes only copies of them.
+        :param opcode: opcode of the copy, the opcode of the instruction if None
+        :return: new instruction with the same operands
+        """
+        copy: Instruction = Instruction(opcode or self.opcode, self.order)
+        copy.frame_size = self.frame_size
+        copy.arg1 = self.arg1
+        copy.arg2 = self.arg2
+        copy.arg3 = self.arg3
+        copy.extra = self.extra
+        return copy
+
+
+class Program:
+    """
+    Decoded program, list of instructions, label table, constant pool and names of variable slots.
+    """
+    __slots__ = ('instructions', 'label_dict', 'constants', 'global_names', 'local_names')
+
+    def __init__(self, instructions: List[Instruction], label_dict: Dict[str, int], constants: List[Const],
+                 global_names: List[str], local_names: List[str]):
+        self.instructions: List[Instruction] = instructions
+        self.label_dict: Dict[str, int] = label_dict
+        self.constants: List[Const] = constants
+        self.global_names: List[str] = global_names
+        self.local_names: List[str] = local_names
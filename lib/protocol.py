@@ -0,0 +1,68 @@
+"""
+Protocol of the interpreter daemon.
+Every message is a frame made of one byte of kind, four bytes of big endian payload length and the payload.
+The client sends the program and the input, the daemon answers with output frames and ends with the exit code.
+Only builtins are used here, so the client can import this module without slowing down its start.
+"""
+# annotations are not evaluated, so typing doesn't have to be imported
+from __future__ import annotations
+
+PROGRAM: bytes = b'P'
+INPUT: bytes = b'I'
+STDOUT: bytes = b'O'
+STDERR: bytes = b'E'
+EXIT_CODE: bytes = b'X'
+
+HEADER_SIZE: int = 5
+
+
+def encode_frame(kind: bytes, payload: bytes) -> bytes:
+    """
+    Create the frame.
+    :param kind: Kind of the frame, one byte
+    :param payload: Content of the frame
+    :return: Frame ready to be sent
+    """
+    return kind + len(payload).to_bytes(4, 'big') + payload
+
+
+def send_frame(sock, kind: bytes, payload: bytes) -> None:
+    """
+    Send one frame to the socket.
+    :param sock: Connected socket
+    :param kind: Kind of the frame, one byte
+    :param payload: Content of the frame
+    """
+    sock.sendall(encode_frame(kind, payload))
+
+
+def recv_exact(sock, size: int) -> bytes | None:
+    """
+    Receive exactly given number of bytes.
+    :param sock: Connected socket
+    :param size: Number of bytes
+    :return: Received bytes, None if the connection was closed before
+    """
+    chunks: list[bytes] = []
+    while size > 0:
+        chunk: bytes = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_frame(sock) -> tuple[bytes, bytes] | None:
+    """
+    Receive one frame from the socket.
+    :param sock: Connected socket
+    :return: Pair of kind and payload, None if the connection was closed
+    """
+    header: bytes | None = recv_exact(sock, HEADER_SIZE)
+    if header is None:
+        return None
+    payload: bytes | None = recv_exact(sock, int.from_bytes(header[1:], 'big'))
+    if payload is None:
+        return None
+    return header[:1], payload
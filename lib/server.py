@@ -0,0 +1,147 @@
+import gc
+import io
+import os
+import signal
+import socket
+from typing import Dict, Optional, Tuple
+from lib.interpret_class import Interpret, RunResult
+from lib.protocol import PROGRAM, INPUT, STDOUT, STDERR, EXIT_CODE, send_frame, recv_frame
+
+DEFAULT_WORKERS: int = os.cpu_count() or 1
+BACKLOG: int = 128
+
+
+class ServerStop(Exception):
+    """
+    Raised by the signal handler to interrupt the waiting for workers.
+    """
+
+class FrameWriter:
+    """
+    Text stream sending everything written to it as frames of given kind, used as output of the program,
+    so the output is streamed to the client whenever the output buffer is flushed.
+    """
+    def __init__(self, connection: socket.socket, kind: bytes):
+        self.__connection: socket.socket = connection
+        self.__kind: bytes = kind
+
+    def write(self, string: str) -> int:
+        if string:
+            send_frame(self.__connection, self.__kind, string.encode())
+        return len(string)
+
+    def flush(self) -> None:
+        pass
+
+
+class Server:
+    """
+    Interpreter daemon listening on a Unix domain socket.
+    The interpreter is imported and initialized once, then worker processes are forked, all of them accept
+    connections on the same socket and run one program per connection.
+    Workers which die are replaced, the server and its workers end on SIGTERM or SIGINT.
+    """
+    def __init__(self, socket_path: str, workers: int = DEFAULT_WORKERS):
+        self.socket_path: str = socket_path
+        self.workers: int = workers
+        self.__socket: Optional[socket.socket] = None
+        self.__pids: Dict[int, None] = {}
+
+    def serve(self) -> None:
+        """
+        Bind the socket, start the workers and keep them running until the server is stopped.
+        """
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.__socket.bind(self.socket_path)
+        self.__socket.listen(BACKLOG)
+        # everything allocated so far is shared with the workers, freezing it keeps the pages from being copied
+        gc.collect()
+        gc.freeze()
+        signal.signal(signal.SIGTERM, self.__stop)
+        signal.signal(signal.SIGINT, self.__stop)
+        try:
+            for _ in range(self.workers):
+                self.__spawn()
+            while True:
+                pid, _ = os.wait()
+                self.__pids.pop(pid, None)
+                self.__spawn()
+        except ServerStop:
+            pass
+        finally:
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            for pid in self.__pids:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+            for pid in list(self.__pids):
+                try:
+                    os.waitpid(pid, 0)
+                except ChildProcessError:
+                    pass
+            self.__socket.close()
+            os.unlink(self.socket_path)
+
+    @staticmethod
+    def __stop(signum: int, frame) -> None:
+        raise ServerStop()
+
+    def __spawn(self) -> None:
+        pid: int = os.fork()
+        if pid != 0:
+            self.__pids[pid] = None
+            return
+        code: int = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            self.__work()
+        except BaseException:
+            code: int = 1
+        finally:
+            os._exit(code)
+
+    def __work(self) -> None:
+        """
+        Accept connections in a worker, the interpreter instance is reused for all programs.
+        """
+        interpret: Interpret = Interpret()
+        while True:
+            connection, _ = self.__socket.accept()
+            with connection:
+                try:
+                    self.handle(connection, interpret)
+                except OSError:
+                    # the client went away, there is nobody to report to
+                    pass
+
+    @staticmethod
+    def handle(connection: socket.socket, interpret: Interpret) -> None:
+        """
+        Receive the program and its input, run it and send back the output and the exit code.
+        :param connection: Connected client socket
+        :param interpret: Interpreter used for the run
+        """
+        request: Dict[bytes, bytes] = {}
+        while PROGRAM not in request or INPUT not in request:
+            frame: Optional[Tuple[bytes, bytes]] = recv_frame(connection)
+            if frame is None:
+                return
+            request[frame[0]] = frame[1]
+        # input is decoded the same way as a file opened in text mode by the command line interpreter
+        input_data: io.TextIOWrapper = io.TextIOWrapper(io.BytesIO(request[INPUT]))
+        try:
+            result: RunResult = interpret.run(request[PROGRAM], input_data, FrameWriter(connection, STDOUT),
+                                              FrameWriter(connection, STDERR))
+            exit_code: int = result.exit_code
+        except OSError:
+            raise
+        except Exception as error:
+            # internal error of the interpreter must not stop the worker
+            send_frame(connection, STDERR, f"Error: Internal error ({error!r}).\n".encode())
+            exit_code: int = 99
+        send_frame(connection, EXIT_CODE, exit_code.to_bytes(4, 'big', signed=True))
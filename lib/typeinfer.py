@@ -0,0 +1,363 @@
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
+from lib.program import Var, Const, LabelRef, Instruction
+from lib.controlflow import label_of
+
+# possible types of a variable, uninitialized variable exists without a value, missing variable (or its frame)
+# doesn't exist at all
+UNINITIALIZED: str = 'uninitialized'
+MISSING: str = 'missing'
+VALUE_TYPES: FrozenSet[str] = frozenset(('int', 'bool', 'string', 'nil'))
+ANY: FrozenSet[str] = VALUE_TYPES | {UNINITIALIZED, MISSING}
+NOT_DEFINED: FrozenSet[str] = frozenset((MISSING,))
+FRAMES: Tuple[str, ...] = ('GF', 'LF', 'TF')
+# possible types of constants by the type name of the constant
+CONST_TYPES: Dict[str, FrozenSet[str]] = {name: frozenset((name,)) for name in VALUE_TYPES}
+
+# suffix of the opcode of an operation variant without the checks of initialization and types of the operands
+TYPED_SUFFIX: str = ':typed'
+# operations which have the variant
+TYPED: Tuple[str, ...] = ('ADD', 'SUB', 'MUL', 'IDIV', 'LT', 'GT', 'EQ', 'AND', 'OR', 'NOT', 'CONCAT', 'STRLEN',
+                          'JUMPIFEQ', 'JUMPIFNEQ', 'LT+JUMPIF', 'GT+JUMPIF', 'EQ+JUMPIF')
+
+# operations which accept one type of every operand
+OPERAND_TYPES: Dict[str, Tuple[str, ...]] = {
+    'ADD': ('int', 'int'), 'SUB': ('int', 'int'), 'MUL': ('int', 'int'), 'IDIV': ('int', 'int'),
+    'AND': ('bool', 'bool'), 'OR': ('bool', 'bool'), 'NOT': ('bool',), 'INT2CHAR': ('int',),
+    'STRI2INT': ('string', 'int'), 'CONCAT': ('string', 'string'), 'STRLEN': ('string',),
+    'GETCHAR': ('string', 'int'), 'SETCHAR': ('string', 'int', 'string'), 'EXIT': ('int',),
+}
+# comparisons of two values of the same type other than nil
+ORDERINGS: Tuple[str, ...] = ('LT', 'GT', 'LT+JUMPIF', 'GT+JUMPIF')
+# comparisons of two values of the same type or with nil
+EQUALITIES: Tuple[str, ...] = ('EQ', 'JUMPIFEQ', 'JUMPIFNEQ', 'EQ+JUMPIF')
+RESULT_TYPES: Dict[str, str] = {
+    'ADD': 'int', 'SUB': 'int', 'MUL': 'int', 'IDIV': 'int', 'STRLEN': 'int', 'STRI2INT': 'int',
+    'LT': 'bool', 'GT': 'bool', 'EQ': 'bool', 'AND': 'bool', 'OR': 'bool', 'NOT': 'bool',
+    'LT+JUMPIF': 'bool', 'GT+JUMPIF': 'bool', 'EQ+JUMPIF': 'bool',
+    'CONCAT': 'string', 'GETCHAR': 'string', 'INT2CHAR': 'string', 'SETCHAR': 'string', 'TYPE': 'string',
+}
+# operations storing the value of their source operand
+COPIES: Tuple[str, ...] = ('MOVE', 'DEFVAR+MOVE', 'PUSHS+POPS')
+READS_ARG1: Tuple[str, ...] = ('WRITE', 'PUSHS', 'EXIT', 'DPRINT')
+CALLS: Tuple[str, ...] = ('CALL', 'PUSHFRAME+CALL', 'CREATEFRAME+PUSHFRAME+CALL')
+CONDITIONAL_JUMPS: Tuple[str, ...] = ('JUMPIFEQ', 'JUMPIFNEQ', 'LT+JUMPIF', 'GT+JUMPIF', 'EQ+JUMPIF', 'JUMPIFEQS',
+                                      'JUMPIFNEQS')
+
+
+def untyped(opcode: str) -> str:
+    """
+    Get opcode of the operation without the typed variant suffix.
+    :param opcode: opcode of an instruction of the optimized program
+    :return: opcode of the checked operation
+    """
+    return opcode[:-len(TYPED_SUFFIX)] if opcode.endswith(TYPED_SUFFIX) else opcode
+
+
+def operands(instruction: Instruction) -> List[Union[Var, Const]]:
+    """
+    Get operands of the instruction which are read as symbols, in the order in which they are read.
+    """
+    opcode: str = instruction.opcode
+    if opcode == 'SETCHAR':
+        return [instruction.arg1, instruction.arg2, instruction.arg3]
+    if opcode in READS_ARG1:
+        return [instruction.arg1]
+    if opcode in ('READ', 'POPS'):
+        return []
+    if opcode in RESULT_TYPES or opcode in COPIES or opcode in ('JUMPIFEQ', 'JUMPIFNEQ'):
+        return [arg for arg in (instruction.arg2, instruction.arg3) if isinstance(arg, (Var, Const))]
+    return []
+
+
+def destination(instruction: Instruction) -> Optional[Var]:
+    """
+    Get variable to which the instruction stores its result.
+    """
+    opcode: str = instruction.opcode
+    if opcode in ('LT+JUMPIF', 'GT+JUMPIF', 'EQ+JUMPIF'):
+        return instruction.extra[0]
+    if opcode in RESULT_TYPES or opcode in COPIES or opcode in ('READ', 'POPS'):
+        return instruction.arg1
+    return None
+
+
+class TypeState:
+    """
+    Possible types of all variables before an instruction. Types of variables which were not accessed yet are the
+    default types of their frame, the frames are tracked as they are pushed and popped.
+    """
+    __slots__ = ('defaults', 'types')
+
+    def __init__(self, defaults: Dict[str, FrozenSet[str]], types: Dict[str, Dict[str, FrozenSet[str]]]):
+        self.defaults: Dict[str, FrozenSet[str]] = defaults
+        self.types: Dict[str, Dict[str, FrozenSet[str]]] = types
+
+    @classmethod
+    def entry(cls) -> 'TypeState':
+        """
+        State at the start of the program, there are no variables and no local or temporary frame.
+        """
+        return cls({frame: NOT_DEFINED for frame in FRAMES}, {frame: {} for frame in FRAMES})
+
+    def copy(self) -> 'TypeState':
+        return TypeState(dict(self.defaults), {frame: dict(types) for frame, types in self.types.items()})
+
+    def get(self, var: Var) -> FrozenSet[str]:
+        return self.types[var.frame].get(var.name, self.defaults[var.frame])
+
+    def set(self, var: Var, types: FrozenSet[str]) -> None:
+        self.types[var.frame][var.name] = types
+
+    def symbol(self, symb: Union[Var, Const]) -> FrozenSet[str]:
+        """
+        Get possible types of the symbol, the type of a constant is known.
+        """
+        return self.get(symb) if isinstance(symb, Var) else CONST_TYPES[symb.type]
+
+    def move_frame(self, source: Optional[str], target: str) -> None:
+        """
+        Make the frame the same as the source frame, the frame is unknown if the source is None.
+        """
+        if source is None:
+            self.defaults[target] = ANY
+            self.types[target] = {}
+        else:
+            self.defaults[target] = self.defaults[source]
+            self.types[target] = self.types[source]
+
+    def clear_frame(self, frame: str) -> None:
+        """
+        Make the frame empty or missing, no variable of it exists.
+        """
+        self.defaults[frame] = NOT_DEFINED
+        self.types[frame] = {}
+
+    def join(self, other: 'TypeState') -> Optional['TypeState']:
+        """
+        Join the possible types of two states reaching the same instruction.
+        :return: joined state or None if the other state adds no type
+        """
+        joined: TypeState = TypeState({}, {})
+        changed: bool = False
+        for frame in FRAMES:
+            default: FrozenSet[str] = self.defaults[frame] | other.defaults[frame]
+            changed: bool = changed or default != self.defaults[frame]
+            types: Dict[str, FrozenSet[str]] = {}
+            for name in self.types[frame].keys() | other.types[frame].keys():
+                current: FrozenSet[str] = self.types[frame].get(name, self.defaults[frame])
+                types[name] = current | other.types[frame].get(name, other.defaults[frame])
+                changed: bool = changed or types[name] != current
+            joined.defaults[frame] = default
+            joined.types[frame] = types
+        return joined if changed else None
+
+
+class TypeInference:
+    """
+    Inference of the possible types of GF, LF and TF variables before every instruction over the control flow graph.
+    Jumps and calls lead to their labels and RETURN leads after every call. An instruction continues only with the
+    types for which it succeeds, e.g. operands of ADD are ints after it.
+    Operations whose operands are initialized and have the right types on every path are replaced by their typed
+    variant, which skips these checks. The checks stay everywhere they could fail, and the errors of missing
+    variables and frames are always checked, the variants only read the operands without the other checks.
+    """
+    name: str = 'types'
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+
+    def run(self, instructions: List[Instruction]) -> List[Instruction]:
+        """
+        Replace operations by their typed variants where the checks can't fail.
+        :param instructions: copies of the instructions, they are changed in place
+        :return: optimized instructions
+        """
+        states: List[Optional[TypeState]] = self.infer(instructions)
+        for instruction, state in zip(instructions, states):
+            if state is not None and instruction.opcode in TYPED and self.__proven(instruction, state):
+                instruction.opcode += TYPED_SUFFIX
+                self.counts['typed'] = self.counts.get('typed', 0) + 1
+        return instructions
+
+    def diagnose(self, instructions: List[Instruction]) -> List[Tuple[Instruction, str]]:
+        """
+        Find instructions which fail whenever they are executed.
+        :param instructions: instructions of the program
+        :return: failing instructions with the reason, in the order of the program
+        """
+        positions: Dict[str, int] = self.__positions(instructions)
+        failures: List[Tuple[Instruction, str]] = []
+        for instruction, state in zip(instructions, self.infer(instructions)):
+            if state is not None:
+                reason: Optional[str] = self.__failure(instruction, state, positions)
+                if reason is not None:
+                    failures.append((instruction, reason))
+        return failures
+
+    def infer(self, instructions: List[Instruction]) -> List[Optional[TypeState]]:
+        """
+        Compute the possible types before every instruction.
+        :param instructions: instructions of the program
+        :return: state before every instruction, None if the instruction can't be reached
+        """
+        positions: Dict[str, int] = self.__positions(instructions)
+        return_sites: List[int] = [op_cnt + 1 for op_cnt, instruction in enumerate(instructions)
+                                   if instruction.opcode in CALLS and op_cnt + 1 < len(instructions)]
+        states: List[Optional[TypeState]] = [None] * len(instructions)
+        if not instructions:
+            return states
+        states[0] = TypeState.entry()
+        pending: List[int] = [0]
+        while pending:
+            op_cnt: int = pending.pop()
+            instruction: Instruction = instructions[op_cnt]
+            state: Optional[TypeState] = self.__transfer(instruction, states[op_cnt])
+            if state is None:
+                continue
+            for successor in self.__successors(instructions, op_cnt, positions, return_sites):
+                if states[successor] is None:
+                    states[successor] = state
+                else:
+                    joined: Optional[TypeState] = states[successor].join(state)
+                    if joined is None:
+                        continue
+                    states[successor] = joined
+                pending.append(successor)
+        return states
+
+    @staticmethod
+    def __positions(instructions: List[Instruction]) -> Dict[str, int]:
+        positions: Dict[str, int] = {instruction.arg1.name: op_cnt for op_cnt, instruction in enumerate(instructions)
+                                     if instruction.opcode == 'LABEL' and isinstance(instruction.arg1, LabelRef)}
+        # LABELs are removed at the end of the optimization, then labels point to their targets
+        for instruction in instructions:
+            label: Optional[LabelRef] = label_of(instruction)
+            if label is not None and label.name not in positions and label.target is not None:
+                positions[label.name] = label.target
+        return positions
+
+    @staticmethod
+    def __successors(instructions: List[Instruction], op_cnt: int, positions: Dict[str, int],
+                     return_sites: List[int]) -> List[int]:
+        """
+        Get positions which can follow the instruction when it succeeds.
+        """
+        opcode: str = instructions[op_cnt].opcode
+        if opcode == 'RETURN':
+            return return_sites
+        if opcode == 'EXIT':
+            return []
+        following: List[int] = [op_cnt + 1] if op_cnt + 1 < len(instructions) else []
+        label: Optional[LabelRef] = label_of(instructions[op_cnt])
+        if label is None:
+            return following
+        if label.name not in positions or positions[label.name] >= len(instructions):
+            # jump to a missing label always fails, a jump to the end of the program ends it
+            return []
+        if opcode in CONDITIONAL_JUMPS:
+            return [positions[label.name]] + following
+        return [positions[label.name]]
+
+    @staticmethod
+    def __transfer(instruction: Instruction, state: TypeState) -> Optional[TypeState]:
+        """
+        Compute the possible types after the instruction succeeds.
+        :return: state after the instruction or None if it never succeeds
+        """
+        opcode: str = instruction.opcode
+        after: TypeState = state.copy()
+        symbols: List[Union[Var, Const]] = operands(instruction)
+        values: List[FrozenSet[str]] = [state.symbol(symb) - {MISSING} for symb in symbols]
+        if opcode != 'TYPE':
+            values: List[FrozenSet[str]] = [types - {UNINITIALIZED} for types in values]
+        if opcode in OPERAND_TYPES:
+            values: List[FrozenSet[str]] = [types & {expected} for types, expected in
+                                            zip(values, OPERAND_TYPES[opcode])]
+        elif opcode in ORDERINGS:
+            common: FrozenSet[str] = (values[0] & values[1]) - {'nil'}
+            values: List[FrozenSet[str]] = [common, common]
+        if any(not types for types in values):
+            return None
+        for symb, types in zip(symbols, values):
+            if isinstance(symb, Var):
+                after.set(symb, types)
+
+        var: Optional[Var] = destination(instruction)
+        if opcode in ('DEFVAR', 'DEFVAR+MOVE'):
+            if MISSING not in after.get(instruction.arg1):
+                return None
+        elif var is not None and after.get(var) == NOT_DEFINED:
+            return None
+        if opcode == 'DEFVAR':
+            after.set(instruction.arg1, frozenset((UNINITIALIZED,)))
+        elif opcode in COPIES:
+            after.set(var, values[0])
+        elif opcode == 'READ':
+            value_type: str = instruction.arg2.value
+            after.set(var, frozenset((value_type, 'nil')) if value_type in VALUE_TYPES else VALUE_TYPES)
+        elif opcode == 'POPS':
+            after.set(var, VALUE_TYPES)
+        elif var is not None:
+            after.set(var, frozenset((RESULT_TYPES[opcode],)))
+
+        if opcode == 'CREATEFRAME':
+            after.clear_frame('TF')
+        elif opcode in ('PUSHFRAME', 'PUSHFRAME+CALL'):
+            after.move_frame('TF', 'LF')
+            after.clear_frame('TF')
+        elif opcode == 'POPFRAME':
+            after.move_frame('LF', 'TF')
+            after.move_frame(None, 'LF')
+        elif opcode == 'CREATEFRAME+PUSHFRAME+CALL':
+            after.clear_frame('LF')
+            after.clear_frame('TF')
+        return after
+
+    @staticmethod
+    def __proven(instruction: Instruction, state: TypeState) -> bool:
+        """
+        Decide whether the checks of initialization and types of the operands always pass.
+        """
+        values: List[FrozenSet[str]] = [state.symbol(symb) - {MISSING} for symb in operands(instruction)]
+        if any(not types or UNINITIALIZED in types for types in values):
+            return False
+        opcode: str = instruction.opcode
+        if opcode in OPERAND_TYPES:
+            return all(types == {expected} for types, expected in zip(values, OPERAND_TYPES[opcode]))
+        if opcode in ORDERINGS:
+            return len(values[0]) == 1 and values[0] == values[1] and 'nil' not in values[0]
+        return all(type1 == type2 or 'nil' in (type1, type2) for type1 in values[0] for type2 in values[1])
+
+    @staticmethod
+    def __failure(instruction: Instruction, state: TypeState, positions: Dict[str, int]) -> Optional[str]:
+        """
+        Find why the instruction fails whenever it is executed.
+        :return: reason or None if the instruction can succeed
+        """
+        opcode: str = instruction.opcode
+        if opcode in ('DEFVAR', 'DEFVAR+MOVE') and MISSING not in state.get(instruction.arg1):
+            return f"variable {instruction.arg1.frame}@{instruction.arg1.name} is already defined"
+        symbols: List[Union[Var, Const]] = operands(instruction)
+        for symb in symbols:
+            if isinstance(symb, Var) and state.get(symb) == NOT_DEFINED:
+                return f"variable {symb.frame}@{symb.name} doesn't exist"
+        values: List[FrozenSet[str]] = [state.symbol(symb) - {MISSING, UNINITIALIZED} for symb in symbols]
+        if opcode != 'TYPE':
+            for symb, types in zip(symbols, values):
+                if not types:
+                    return f"variable {symb.frame}@{symb.name} is not initialized"
+        if opcode in OPERAND_TYPES and any(expected not in types for types, expected in
+                                           zip(values, OPERAND_TYPES[opcode])) or \
+                opcode in ORDERINGS and not (values[0] & values[1]) - {'nil'} or \
+                opcode in EQUALITIES and not any(type1 == type2 or 'nil' in (type1, type2)
+                                                 for type1 in values[0] for type2 in values[1]):
+            return "wrong types of operands"
+        if opcode == 'IDIV' and isinstance(instruction.arg3, Const) and instruction.arg3.value == 0:
+            return "division by zero"
+        label: Optional[LabelRef] = label_of(instruction)
+        if label is not None and label.name not in positions:
+            return f"label {label.name} does not exist"
+        var: Optional[Var] = destination(instruction)
+        if var is not None and opcode != 'DEFVAR+MOVE' and state.get(var) == NOT_DEFINED:
+            return f"variable {var.frame}@{var.name} doesn't exist"
+        return None
@@ -1,109 +1,117 @@
-import sys
 import re
-from typing import Dict, Union, List
+from typing import Dict, Union, List, Optional
+from lib.program import Var, Const, Instruction
+from lib.frame import Frame, Undefined, UNDEFINED
+from lib.values import Value, NIL, StringBuffer
+from lib.errors import error_for_code
 
 
-def get_symb_value(symb: Dict[str, str], context) -> (Union[str, int, bool], str):
+def get_symb_value(symb: Union[Var, Const], context) -> Union[Value, None]:
     """
-    Get value and type of symbol.
-    :param symb: XML argument
+    Get value of symbol.
+    :param symb: Decoded operand, variable or constant
     :param context:  Interpret class
-    :return: Tuple of value and type
-    """
-    if symb['type'] == 'var':
-        var: List[str] = symb['value'].strip().split('@')
-        var_data: Dict[str, str] = get_var_value(var, context)
-        return var_data['value'], var_data['type']
-    elif symb['type'] == 'int':
-        val: int = 0
-        try:
-            val: int = int(symb['value'])
-        except ValueError:
-            exit_with_code(32, "Error: Wrong type of value.")
-        return val, 'int'
-    elif symb['type'] == 'bool':
-        if symb['value'] == 'true':
-            return True, 'bool'
-        elif symb['value'] == 'false':
-            return False, 'bool'
-    elif symb['type'] == 'string':
-        if symb['value'] is None:
-            return '', 'string'
-        string: str = symb['value'].strip().replace('\n', '')
-        string: str = remove_escape_seq(string)
-        return string, 'string'
-    elif symb['type'] == 'nil':
-        return 'nil', 'nil'
-
-
-def store_val_to_var(var: List[str], val: Union[int, str, bool], val_type: str, context) -> None:
+    :return: Value, None if the variable is not initialized
     """
-    Store value to variable.
-    :param var: Variable frame and name where to store the value
-    :param val: Value to store
-    :param val_type: Type of value
+    if isinstance(symb, Var):
+        return get_var_value(symb, context)
+    return symb.value
+
+
+def get_frame(var: Var, context) -> Frame:
+    """
+    Get frame of variable.
+    :param var: Decoded variable operand
     :param context: Interpret class
-    :return: None
+    :return: Frame where the variable is stored
     """
-    err: bool = True
-    if var[0] == 'GF':
-        if var[1] in context.global_frame.keys():
-            context.global_frame[var[1]] = {'type': val_type, 'value': val}
-            return
-    elif var[0] == 'LF':
+    if var.frame == 'GF':
+        return context.global_frame
+    elif var.frame == 'LF':
         if len(context.local_frame) == 0:
             exit_with_code(55, "Error: No local frame.")
-        if var[1] in context.local_frame[-1].keys():
-            context.local_frame[-1][var[1]] = {'type': val_type, 'value': val}
-            return
-    elif var[0] == 'TF':
+        return context.local_frame[-1]
+    elif var.frame == 'TF':
         if context.tmp_frame is None:
             exit_with_code(55, "Error: No temporary frame.")
-        if var[1] in context.tmp_frame.keys():
-            context.tmp_frame[var[1]] = {'type': val_type, 'value': val}
-            return
-    else:
-        exit_with_code(52, "Error: Wrong variable type.")
+        return context.tmp_frame
+    exit_with_code(52, "Error: Wrong variable type.")
 
-    if err:
+
+def store_val_to_var(var: Var, val: Value, context) -> None:
+    """
+    Store value to variable.
+    :param var: Decoded variable operand where to store the value
+    :param val: Value to store
+    :param context: Interpret class
+    :return: None
+    """
+    if var.frame == 'GF':
+        values: List = context.global_frame.values
+    else:
+        values: List = get_frame(var, context).values
+    slot: int = var.slot
+    try:
+        defined: bool = values[slot] is not UNDEFINED
+    except IndexError:
+        defined: bool = False
+    if not defined:
         exit_with_code(54, "Error: Variable doesn't exist.")
+    values[slot] = val
 
 
-def get_var_value(var: List[str], context) -> Dict[str, str]:
+def get_var_value(var: Var, context) -> Union[Value, None]:
     """
     Get value of variable.
-    :param var: Variable frame and name
+    :param var: Decoded variable operand
     :param context: Interpret class
-    :return: Value of variable
+    :return: Value, None if the variable is not initialized
     """
-    val: None = None
-    if var[0] == 'GF':
-        val: Dict[str, str] = context.global_frame.get(var[1])
-    elif var[0] == 'LF':
-        if len(context.local_frame) == 0:
-            exit_with_code(55, "Error: No local frame.")
-        val: Dict[str, str] = context.local_frame[-1].get(var[1])
-    elif var[0] == 'TF':
-        if context.tmp_frame is None:
-            exit_with_code(55, "Error: No temporary frame.")
-        val: Dict[str, str] = context.tmp_frame.get(var[1])
+    if var.frame == 'GF':
+        values: List = context.global_frame.values
     else:
-        exit_with_code(52, "Error: Wrong variable type.")
-
-    if val is None:
+        values: List = get_frame(var, context).values
+    try:
+        value: Union[Value, None, Undefined] = values[var.slot]
+    except IndexError:
+        value: Union[Value, None, Undefined] = UNDEFINED
+    if value is UNDEFINED:
         exit_with_code(54, "Error: Variable doesn't exist.")
-    return val
+    return value
+
+
+def materialize_var(var: Var, context) -> None:
+    """
+    Replace string buffer in the variable by its string. Missing variable or frame is left to the instruction
+    which reads the variable, it reports the error.
+    :param var: Decoded variable operand
+    :param context: Interpret class
+    :return: None
+    """
+    if var.frame == 'GF':
+        frame: Optional[Frame] = context.global_frame
+    elif var.frame == 'LF':
+        frame: Optional[Frame] = context.local_frame[-1] if context.local_frame else None
+    else:
+        frame: Optional[Frame] = context.tmp_frame
+    if frame is None:
+        return
+    try:
+        value: Union[Value, StringBuffer, None, Undefined] = frame.values[var.slot]
+    except IndexError:
+        return
+    if type(value) is StringBuffer:
+        frame.values[var.slot] = value.materialize()
 
 
 def exit_with_code(code: int, text: str) -> None:
     """
-    Exit with error code and print error message.
+    Stop the interpretation with error code, the error is reported by the caller of the interpreter.
     :param code: Int value of error code
     :param text: Error message
-    :return: None
+    :raise InterpretError: subclass of the error code
     """
-    print(text, file=sys.stderr)
-    sys.exit(code)
+    raise error_for_code(code, text)
 
 
 def remove_escape_seq(string: str) -> str:
@@ -117,17 +125,43 @@ def remove_escape_seq(string: str) -> str:
     return string
 
 
-def check_arguments(args: Dict[str, Dict[str, str]], num_of_args: int) -> None:
+# int literals accepted by parse.php: decimal, octal with a leading zero or 0o prefix and hexadecimal with 0x prefix
+INT_LITERAL: re.Pattern = re.compile(r'([+-]?)(?:([1-9][0-9]*)|0[oO]?([0-7]+)|0[xX]([0-9a-fA-F]+)|(0))')
+
+
+def parse_int(string: Optional[str]) -> int:
+    """
+    Convert int literal to value, the literal has to match the int literal of parse.php, so a number with a leading
+    zero or 0o prefix is octal and a number with 0x prefix is hexadecimal.
+    :param string: Int literal, None for an empty element
+    :return: Value of literal
+    :raise ValueError: literal is not an int literal of parse.php
+    """
+    match: Optional[re.Match] = INT_LITERAL.fullmatch(string.strip()) if string is not None else None
+    if match is None:
+        raise ValueError(string)
+    sign, decimal, octal, hexadecimal, zero = match.groups()
+    if decimal is not None:
+        value: int = int(decimal)
+    elif octal is not None:
+        value: int = int(octal, 8)
+    elif hexadecimal is not None:
+        value: int = int(hexadecimal, 16)
+    else:
+        value: int = int(zero)
+    return -value if sign == '-' else value
+
+
+def check_arguments(instruction: Instruction, num_of_args: int) -> None:
     """
     Check if operation has correct number of arguments.
-    :param args: List of arguments
+    :param instruction: Decoded instruction
     :param num_of_args: Number of operation arguments
     :return: None
     """
-    if len(args)-1 != num_of_args:
+    args: List = [instruction.arg1, instruction.arg2, instruction.arg3]
+    if len(args) - args.count(None) != num_of_args:
         exit_with_code(32, "Error: Wrong number of arguments.")
-    arg_cnt: int = 1
-    for arg in range(1, num_of_args+1):
-        if f"arg{arg_cnt}" not in args.keys():
+    for arg in range(num_of_args):
+        if args[arg] is None:
             exit_with_code(32, "Error: Wrong argument name.")
-        arg_cnt += 1
@@ -0,0 +1,91 @@
+from typing import Dict, List, Union
+
+
+class Nil:
+    """
+    Type of the nil value, there is only one instance NIL.
+    """
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return 'nil'
+
+
+NIL: Nil = Nil()
+
+# values are stored as they are, int, bool, str and NIL, the type of value is given by its class
+Value = Union[int, bool, str, Nil]
+
+# strings shorter than this are copied by CONCAT and SETCHAR, a buffer pays off only for longer ones
+BUFFER_MIN_LENGTH: int = 64
+
+
+class StringBuffer:
+    """
+    Mutable string kept in a variable while it is built by CONCAT or edited by SETCHAR, list of its characters.
+    Only the buffered variants of operations see it, the variable gets the string before anything else reads it.
+    """
+    __slots__ = ('chars',)
+
+    def __init__(self, string: str):
+        self.chars: List[str] = list(string)
+
+    def __len__(self) -> int:
+        return len(self.chars)
+
+    def __getitem__(self, index: int) -> str:
+        return self.chars[index]
+
+    def materialize(self) -> str:
+        return ''.join(self.chars)
+
+
+TYPE_NAMES: Dict[type, str] = {
+    int: 'int',
+    bool: 'bool',
+    str: 'string',
+    Nil: 'nil',
+    StringBuffer: 'string',
+}
+
+
+def type_name(value: Value) -> str:
+    """
+    Get IPPcode23 name of the value type.
+    :param value: Value
+    :return: Name of the type
+    """
+    return TYPE_NAMES[type(value)]
+
+
+def buffer_concat(string: Union[str, StringBuffer], suffix: str) -> Union[str, StringBuffer]:
+    """
+    Append the suffix to the string, a long string is moved to a buffer which is changed in place from then on.
+    :param string: value of the variable, string or its buffer
+    :param suffix: appended string
+    :return: new value of the variable
+    """
+    if type(string) is str:
+        if len(string) < BUFFER_MIN_LENGTH:
+            return string + suffix
+        string: StringBuffer = StringBuffer(string)
+    string.chars.extend(suffix)
+    return string
+
+
+def buffer_setchar(string: Union[str, StringBuffer], index: int, chars: str) -> Union[str, StringBuffer]:
+    """
+    Replace characters of the string from the index by the characters, the length of the string doesn't change.
+    :param string: value of the variable, string or its buffer
+    :param index: index of the first replaced character, it is checked by the caller
+    :param chars: replacing characters, they are cut at the end of the string
+    :return: new value of the variable
+    """
+    length: int = len(string)
+    if type(string) is str:
+        if length < BUFFER_MIN_LENGTH:
+            return f'{string[:index]}{chars[:length - index]}{string[index + len(chars):]}'
+        string: StringBuffer = StringBuffer(string)
+    replaced: str = chars[:length - index]
+    string.chars[index:index + len(replaced)] = replaced
+    return string
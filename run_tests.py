@@ -0,0 +1,32 @@
+from argparse import ArgumentParser
+import sys
+import time
+from typing import List, Optional
+from lib.conformance import DEFAULT_JOBS, DEFAULT_TIMEOUT, discover, run_tests, report
+from lib.optimizer import MAX_OPT_LEVEL
+
+if __name__ == "__main__":
+    arg_parser: ArgumentParser = ArgumentParser(description="Run .src/.in/.out/.rc test cases of the interpreter.")
+    arg_parser.add_argument('directory', type=str, help="Directory with the test cases, searched recursively.")
+    arg_parser.add_argument('--jobs', type=int, metavar='<count>', default=DEFAULT_JOBS,
+                            help="Number of processes running the tests.")
+    arg_parser.add_argument('--slowest', type=int, metavar='<count>', default=10,
+                            help="Number of the slowest tests to report, 0 reports all of them.")
+    arg_parser.add_argument('--timeout', type=float, metavar='<seconds>', default=DEFAULT_TIMEOUT,
+                            help="Time limit of one test, 0 disables the limit.")
+    arg_parser.add_argument('--opt-level', type=str, metavar='<level>',
+                            help=f"Optimization level from 0 to {MAX_OPT_LEVEL}, 'all' runs the tests at every level.")
+    args = arg_parser.parse_args()
+
+    opt_levels: Optional[List[int]] = None
+    if args.opt_level == 'all':
+        opt_levels: List[int] = list(range(MAX_OPT_LEVEL + 1))
+    elif args.opt_level is not None:
+        if not args.opt_level.isdigit() or int(args.opt_level) > MAX_OPT_LEVEL:
+            arg_parser.error(f"optimization level must be from 0 to {MAX_OPT_LEVEL} or 'all'")
+        opt_levels: List[int] = [int(args.opt_level)]
+
+    start: float = time.perf_counter()
+    results = run_tests(discover(args.directory), max(args.jobs, 1), max(args.timeout, 0), opt_levels)
+    passed, total = report(results, time.perf_counter() - start, args.slowest)
+    sys.exit(0 if passed == total else 1)